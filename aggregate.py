@@ -0,0 +1,45 @@
+"""Fold streams of blips into totals without holding on to the blips."""
+from __future__ import annotations
+
+import datetime as dt
+from typing import Dict, Iterable, Tuple
+
+from timeblob import TimeBlip
+
+
+def total_time(blips: Iterable[TimeBlip]) -> dt.timedelta:
+    """Return the summed duration of the blips."""
+    total = dt.timedelta()
+    for blip in blips:
+        total += blip.tdelta
+
+    return total
+
+
+def day_totals(blips: Iterable[TimeBlip]) -> Dict[dt.date, dt.timedelta]:
+    """Return the summed duration of the blips on each date."""
+    totals: Dict[dt.date, dt.timedelta] = dict()
+    for blip in blips:
+        totals[blip.date] = totals.get(blip.date, dt.timedelta()) + blip.tdelta
+
+    return totals
+
+
+def tag_totals(blips: Iterable[TimeBlip]) -> Dict[str, dt.timedelta]:
+    """Return the summed duration of the blips of each tag."""
+    totals: Dict[str, dt.timedelta] = dict()
+    for blip in blips:
+        totals[blip.tag] = totals.get(blip.tag, dt.timedelta()) + blip.tdelta
+
+    return totals
+
+
+def week_totals(blips: Iterable[TimeBlip]
+                ) -> Dict[Tuple[int, int], dt.timedelta]:
+    """Return the summed duration of the blips in each (ISO year, week)."""
+    totals: Dict[Tuple[int, int], dt.timedelta] = dict()
+    for blip in blips:
+        week = tuple(blip.date.isocalendar())[:2]
+        totals[week] = totals.get(week, dt.timedelta()) + blip.tdelta
+
+    return totals
@@ -0,0 +1,197 @@
+"""Compile a year of text logs into one compact, memory-mapped archive.
+
+The text logs stay the source of truth. An archive holds, for every day of
+a year that had a log file, the mtime and size of that file and the blips
+parsed from it; days whose file has changed since are read from the text.
+
+Layout, all little-endian:
+    header      magic, version, year, day, record and string counts
+    days        (date ordinal, mtime, size, first record, record count)
+    records     (start, stop, desc id, tag id), times in microseconds from
+                the midnight of the record's day
+    strings     count + 1 offsets into the UTF-8 string data, then the data
+"""
+from __future__ import annotations
+
+import datetime as dt
+import mmap
+import struct
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from logfile import log_2_blob
+from timeblob import TimeBlip, TimeBlob
+from util import (beget_cache_dir, is_current, is_settled, stat_signature,
+                  write_atomic)
+
+if TYPE_CHECKING:
+    from manifest import LogManifest
+
+ARCHIVE_FILE = 'archive_{year}.bin'
+ARCHIVE_MAGIC = b'DSUMARCH'
+ARCHIVE_VERSION = 1
+NO_STRING = 0xFFFFFFFF  # String id of a missing desc or tag
+
+HEADER = struct.Struct('<8sIIIII')
+DAY = struct.Struct('<iqqII')
+RECORD = struct.Struct('<qqII')
+OFFSET = struct.Struct('<I')
+MICROSECOND = dt.timedelta(microseconds=1)
+
+
+def beget_archive_path(year: int) -> str:
+    """Generate the path of the archive of a year."""
+    return f'{beget_cache_dir()}/{ARCHIVE_FILE.format(year=year)}'
+
+
+def build_archive(year: int,
+                  archive_path: str | None = None,
+                  manifest: LogManifest | None = None) -> int | None:
+    """Compile the settled days of a year; return the day count if written."""
+    if manifest is None:
+        from manifest import LogManifest
+        manifest = LogManifest()
+
+    found = manifest.lookup(dt.date(year, 1, 1), dt.date(year, 12, 31))
+    manifest.save()
+
+    strings: Dict[str | None, int] = {None: NO_STRING}
+    days = bytearray()
+    records = bytearray()
+    record_count = 0
+    for date, (file_path, _, _) in found.items():
+        signature = stat_signature(file_path)
+        if signature is None or not is_settled(date):
+            continue
+        try:
+            blob = log_2_blob(file_path, date)
+        except FileNotFoundError:
+            continue
+
+        midnight = dt.datetime.combine(date, dt.time())
+        days += DAY.pack(date.toordinal(), *signature,
+                         record_count, len(blob.blip_list))
+        for blip in blob.blip_list:
+            records += RECORD.pack(
+                (blip.start - midnight) // MICROSECOND,
+                (blip.stop - midnight) // MICROSECOND,
+                strings.setdefault(blip.desc, len(strings) - 1),
+                strings.setdefault(blip.tag, len(strings) - 1))
+        record_count += len(blob.blip_list)
+
+    encoded = [string.encode() for string in strings if string is not None]
+    offsets = [0]
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+
+    day_count = len(days) // DAY.size
+    data = b''.join([
+        HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, year, day_count,
+                    record_count, len(encoded)),
+        days,
+        records,
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        *encoded,
+    ])
+    if not write_atomic(archive_path or beget_archive_path(year), data):
+        return None
+
+    return day_count
+
+
+class YearArchive():
+    """A read-only, memory-mapped view of the archive of one year.
+
+    An archive that is missing or unreadable behaves as an empty one, so
+    every day falls back to its text file.
+    """
+
+    def __init__(self, year: int, archive_path: str | None = None):
+        """Map the archive file and read its day index."""
+        self.year = year
+        self.archive_path = archive_path or beget_archive_path(year)
+        self.buffer: mmap.mmap | None = None
+        # Date to (mtime, size, first record, record count)
+        self.days: Dict[dt.date, Tuple[int, int, int, int]] = dict()
+        self.strings: Dict[int, str | None] = {NO_STRING: None}
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(self.archive_path, 'rb') as archive_file:
+                self.buffer = mmap.mmap(archive_file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+            self._read_index()
+        except (OSError, ValueError, struct.error):
+            self.close()
+            self.days = dict()
+
+    def _read_index(self):
+        """Read the header and day index, and locate the other sections."""
+        magic, version, year, day_count, record_count, string_count = \
+            HEADER.unpack_from(self.buffer, 0)
+        if (magic, version, year) != (ARCHIVE_MAGIC, ARCHIVE_VERSION,
+                                      self.year):
+            raise ValueError(f'{self.archive_path} is not a usable archive')
+
+        offset = HEADER.size
+        for ordinal, mtime, size, first, count in \
+                DAY.iter_unpack(self.buffer[offset:
+                                            offset + day_count * DAY.size]):
+            self.days[dt.date.fromordinal(ordinal)] = (mtime, size,
+                                                       first, count)
+
+        self.records_at = offset + day_count * DAY.size
+        self.offsets_at = self.records_at + record_count * RECORD.size
+        self.data_at = self.offsets_at + (string_count + 1) * OFFSET.size
+        if len(self.buffer) < self.data_at:
+            raise ValueError(f'{self.archive_path} is truncated')
+
+    def close(self):
+        """Unmap the archive file."""
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def __enter__(self) -> YearArchive:
+        """Use the archive as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Unmap the archive on leaving the context."""
+        self.close()
+
+    def string(self, string_id: int) -> str | None:
+        """Return an entry of the string table, decoding it once."""
+        if string_id not in self.strings:
+            start, end = struct.unpack_from(
+                '<2I', self.buffer, self.offsets_at + string_id * OFFSET.size)
+            string = self.buffer[self.data_at + start:
+                                 self.data_at + end].decode()
+            self.strings[string_id] = string
+
+        return self.strings[string_id]
+
+    def day_blob(self, date: dt.date, file_path: str) -> TimeBlob | None:
+        """Return the archived blob of a day, or None if it is not current."""
+        entry = self.days.get(date)
+        if entry is None or self.buffer is None:
+            self.misses += 1
+            return None
+
+        mtime, size, first, count = entry
+        if not is_current(date, stat_signature(file_path), (mtime, size)):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        midnight = dt.datetime.combine(date, dt.time())
+        blip_list: List[TimeBlip] = list()
+        start = self.records_at + first * RECORD.size
+        for start_us, stop_us, desc_id, tag_id in RECORD.iter_unpack(
+                self.buffer[start:start + count * RECORD.size]):
+            blip_list.append(TimeBlip(midnight + start_us * MICROSECOND,
+                                      midnight + stop_us * MICROSECOND,
+                                      self.string(desc_id),
+                                      self.string(tag_id)))
+
+        return TimeBlob(blip_list)
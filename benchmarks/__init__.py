@@ -0,0 +1,5 @@
+"""Benchmarks for daysum, run from the repository root.
+
+    python -m benchmarks.run             # the suite over a generated tree
+    python -m benchmarks.bench_tokenizer # log line classification
+"""
@@ -0,0 +1,52 @@
+"""Microbenchmark of log line classification, before and after tokenize.
+
+Run from the repository root with `python -m benchmarks.bench_tokenizer`.
+"""
+import re
+import timeit
+
+from logfile import TIME_BLOCK_RE, TIME_ENTRY_RE, tokenize
+from timeblob import STRIP_TAG_RE
+
+# A typical day: time entries and blocks, each followed by its description
+SAMPLE_LINES = [
+    '9-10:30\n', 'backend refactor of the parser\n',
+    '10:30-12\n', 'M+O weekly planning\n',
+    '13-\n', 'frontend review\n',
+    '1.5\n', 'devops pipeline fixes\n',
+    '\n', 'notes without a time\n',
+] * 100
+
+
+def classify_legacy(line: str):
+    """Classify a line the way LogParser.feed did before tokenize."""
+    hour_search = re.match(TIME_ENTRY_RE, line)
+    block_search = re.match(TIME_BLOCK_RE, line)
+    if hour_search:
+        return hour_search.groups()
+    if block_search:
+        return block_search.groups()
+    return line.strip(), re.search(STRIP_TAG_RE, line.strip()).group(0)
+
+
+def lines_per_second(classify, repeat: int = 5, number: int = 20) -> float:
+    """Return the best rate at which classify gets through SAMPLE_LINES."""
+    def run():
+        for line in SAMPLE_LINES:
+            classify(line)
+
+    best = min(timeit.repeat(run, repeat=repeat, number=number))
+    return len(SAMPLE_LINES) * number / best
+
+
+def main():
+    """Print the rate of both classifiers."""
+    before = lines_per_second(classify_legacy)
+    after = lines_per_second(tokenize)
+    print(f'before  {before:>12,.0f} lines/s')
+    print(f'after   {after:>12,.0f} lines/s')
+    print(f'speedup {after / before:>12.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Write synthetic, realistic LOG_PATH trees for the benchmarks."""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import random
+import string
+from typing import List
+
+from util import BACK_COMPAT_FILE, FOLDER_SUFFIX
+
+WORDS = ['review', 'fix', 'sync', 'design', 'tests', 'deploy', 'notes',
+         'planning', 'refactor', 'support', 'docs', 'pairing']
+
+
+def tag_names(count: int) -> List[str]:
+    """Return count distinct tags; letters only, as STRIP_TAG_RE stops at digits."""
+    tags = list()
+    for n in range(count):
+        suffix = ''
+        while True:
+            n, letter = divmod(n, 26)
+            suffix += string.ascii_lowercase[letter]
+            if not n:
+                break
+        tags.append(f'proj{suffix}')
+
+    return tags
+
+
+def beget_tree_path(root: str, date: dt.date) -> str:
+    """Generate the path of a date's log file under root, as util does."""
+    filename = BACK_COMPAT_FILE.format(month=date.month, day=date.day)
+    return f'{root}/{date.strftime(r"%Y/%b")}{FOLDER_SUFFIX}/{filename}'
+
+
+def day_lines(rng: random.Random,
+              tags: List[str],
+              entries: int,
+              open_ended_rate: float,
+              block_rate: float) -> List[str]:
+    """Return the lines of one day's log."""
+    lines = list()
+    minute = 8 * 60
+    for entry in range(entries):
+        tag = rng.choice(tags)
+        desc = f'{tag} {" ".join(rng.sample(WORDS, rng.randint(1, 3)))}'
+        length = rng.choice((15, 30, 45, 60, 90, 120))
+        if rng.random() < block_rate:
+            lines.append(f'{length // 60}.{length % 60 * 100 // 60:02}')
+        elif entry == entries - 1 and rng.random() < open_ended_rate:
+            lines.append(f'{minute // 60}:{minute % 60:02}-')
+        else:
+            stop = min(minute + length, 23 * 60 + 59)
+            lines.append(f'{minute // 60}:{minute % 60:02}-'
+                         f'{stop // 60}:{stop % 60:02}')
+            minute = stop
+        lines.append(desc)
+        if rng.random() < 0.1:
+            lines.append('')  # Stray blank lines, as hand-kept logs have
+
+    return lines
+
+
+def generate_tree(root: str,
+                  start_year: int = 2020,
+                  years: int = 1,
+                  entries_per_day: int = 8,
+                  tag_count: int = 12,
+                  open_ended_rate: float = 0.05,
+                  block_rate: float = 0.05,
+                  seed: int = 0) -> List[dt.date]:
+    """Write the logs of every workday of some years; return their dates."""
+    rng = random.Random(seed)
+    tags = tag_names(tag_count)
+    dates = list()
+    date = dt.date(start_year, 1, 1)
+    while date.year < start_year + years:
+        if date.weekday() < 5:
+            file_path = beget_tree_path(root, date)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as log:
+                lines = day_lines(rng, tags, entries_per_day,
+                                  open_ended_rate, block_rate)
+                log.write('\n'.join(lines) + '\n')
+            dates.append(date)
+        date += dt.timedelta(days=1)
+
+    # Settle each file and folder at the evening of its last day, as an
+    # old tree would be; folders changed just now are always rescanned
+    for date in dates:
+        settle_time = dt.datetime.combine(date, dt.time(18)).timestamp()
+        file_path = beget_tree_path(root, date)
+        for path in (file_path, os.path.dirname(file_path),
+                     os.path.dirname(os.path.dirname(file_path))):
+            os.utime(path, (settle_time, settle_time))
+
+    return dates
@@ -0,0 +1,205 @@
+"""Run the daysum benchmark suite over a generated log tree.
+
+Run from the repository root, for example:
+    python -m benchmarks.run --years 5 --output results.json
+    python -m benchmarks.run --compare results.json
+
+Results are written as JSON: one record per benchmark with its best time
+over the repeats, the number of items it handled and the rate.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import daysum
+import npblob
+import pivot
+import util
+from benchmarks.logtree import beget_tree_path, generate_tree
+from logfile import log_2_blob
+from manifest import LogManifest
+from parsecache import ParseCache
+from timeblob import TimeBlob
+
+RESULTS_VERSION = 1
+SLOWER = 1.25  # Ratio over a previous run reported as a regression
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    """Return the fastest of repeat calls to func, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def quietly(func: Callable, *args, **kwargs):
+    """Call a view with its printed output thrown away."""
+    with contextlib.redirect_stdout(io.StringIO()), \
+            contextlib.redirect_stderr(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def run_suite(root: str,
+              dates: List[dt.date],
+              repeat: int = 5) -> List[Dict]:
+    """Time every benchmark over the tree at root; return their records."""
+    results = list()
+
+    def record(name: str, func: Callable, items: int):
+        seconds = best_time(func, repeat)
+        results.append({'name': name, 'seconds': seconds, 'items': items,
+                        'rate': items / seconds if seconds else None})
+        print(f'{name:<28}{seconds * 1000:>10.2f} ms'
+              f'{items / seconds if seconds else 0:>14,.0f} items/s')
+
+    start_date, end_date = dates[0], dates[-1]
+    paths = [(beget_tree_path(root, date), date) for date in dates]
+
+    # Discovery
+    record('discover_logs', lambda: util.discover_logs(start_date, end_date),
+           len(dates))
+    record('manifest.cold', lambda: LogManifest(f'{root}/.bench/none')
+           .lookup(start_date, end_date), len(dates))
+    manifest = LogManifest(f'{root}/.bench/manifest')
+    manifest.lookup(start_date, end_date)
+    record('manifest.warm', lambda: manifest.lookup(start_date, end_date),
+           len(dates))
+
+    # Parsing
+    line_count = 0
+    for path, _ in paths:
+        with open(path) as log:
+            line_count += sum(1 for _ in log)
+    record('log_2_blob', lambda: [log_2_blob(path, date)
+                                  for path, date in paths], line_count)
+    cache = ParseCache(f'{root}/.bench/cache')
+    daysum.blobify_dates(dates, cache, jobs=1, manifest=manifest)
+    record('blobify_dates.cached', lambda: daysum.blobify_dates(
+        dates, cache, jobs=1, manifest=manifest), len(dates))
+
+    # Aggregation
+    daily_blobs = [log_2_blob(path, date) for path, date in paths]
+    blob = TimeBlob.concat(daily_blobs)
+    blip_count = len(blob.blip_list)
+    record('TimeBlob.concat', lambda: TimeBlob.concat(daily_blobs), blip_count)
+    record('TimeBlob.aggregates', lambda: (
+        TimeBlob(list(blob.blip_list)).blob_total,
+        blob.get_tag_totals(),
+        [blob.sub_blob(date) for date in dates[:50]]), blip_count)
+    record('pivot.week_tables', lambda: pivot.week_tables(blob.blip_list),
+           blip_count)
+    if npblob.np is not None:
+        arrays = npblob.BlobArrays.from_blob(blob)
+        record('npblob.from_blob', lambda: npblob.BlobArrays.from_blob(blob),
+               blip_count)
+        record('npblob.aggregates', lambda: (
+            arrays.blob_total,
+            arrays.tag_totals(),
+            [arrays.sub_blob(date) for date in dates[:50]]), blip_count)
+        record('npblob.week_tables', lambda: npblob.BlobArrays.from_blob(
+            blob).week_tables(), blip_count)
+        record('npblob.week_tables.kept',
+               lambda: npblob.week_tables(blob), blip_count)
+
+    # Views, over the whole tree and over its last week
+    week_blob = blob.sub_blob(daysum.get_week_list(end_date)[0], end_date)
+    record('view.print_probar',
+           lambda: quietly(daysum.print_probar, blob, fd=io.StringIO()),
+           blip_count)
+    record('view.report_view', lambda: quietly(daysum.report_view, blob),
+           blip_count)
+    record('view.daptiv_format',
+           lambda: quietly(daysum.daptiv_format, week_blob, None, 1),
+           len(week_blob.blip_list))
+    record('view.tag_view', lambda: quietly(daysum.tag_view, blob),
+           blip_count)
+    record('view.compact_probar',
+           lambda: daysum.compact_probar(blob, in_tmux=False), blip_count)
+
+    return results
+
+
+def compare(results: List[Dict], previous_path: str) -> int:
+    """Print the change against a previous results file; count regressions."""
+    with open(previous_path) as previous_file:
+        previous = {result['name']: result
+                    for result in json.load(previous_file)['results']}
+
+    regressions = 0
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None or not old['seconds']:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        flag = ''
+        if ratio > SLOWER:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f'{result["name"]:<28}{ratio:>10.2f}x{flag}')
+
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Generate a tree, run the suite and write or compare the results."""
+    parser = argparse.ArgumentParser(prog='benchmarks.run')
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--start-year', type=int, default=2020)
+    parser.add_argument('--entries', type=int, default=8,
+                        help='entries per day')
+    parser.add_argument('--tags', type=int, default=12,
+                        help='number of distinct tags')
+    parser.add_argument('--open-ended', type=float, default=0.05,
+                        help='share of days ending with an open entry')
+    parser.add_argument('--blocks', type=float, default=0.05,
+                        help='share of entries written as time blocks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, metavar='FILE',
+                        help='write the results as JSON to FILE')
+    parser.add_argument('--compare', default=None, metavar='FILE',
+                        help='report the change against a previous results '
+                             'file; exit 1 on a regression')
+    args = parser.parse_args(argv)
+
+    params = {'years': args.years, 'start_year': args.start_year,
+              'entries_per_day': args.entries, 'tag_count': args.tags,
+              'open_ended_rate': args.open_ended,
+              'block_rate': args.blocks, 'seed': args.seed}
+    with tempfile.TemporaryDirectory() as root:
+        dates = generate_tree(root, args.start_year, args.years, args.entries,
+                              args.tags, args.open_ended, args.blocks,
+                              args.seed)
+        util.LOG_PATH = root
+        results = run_suite(root, dates, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'version': RESULTS_VERSION,
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'time': dt.datetime.now().isoformat(),
+                       'params': params,
+                       'results': results}, output, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Index every blip in a local SQLite database for ad-hoc queries."""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sqlite3
+from itertools import groupby
+from typing import TYPE_CHECKING, Callable, Dict, List, Sequence, Tuple
+
+import util
+from util import beget_cache_dir, is_current, stat_signature
+
+if TYPE_CHECKING:
+    from manifest import LogManifest
+    from timeblob import TimeBlip, TimeBlob
+
+DB_FILE = 'blips.sqlite3'
+DB_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS blips (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    start TEXT NOT NULL,
+    stop TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    tag TEXT,
+    desc TEXT
+);
+CREATE INDEX IF NOT EXISTS blips_by_date ON blips (date);
+CREATE INDEX IF NOT EXISTS blips_by_tag ON blips (tag, date);
+CREATE INDEX IF NOT EXISTS blips_by_path ON blips (path);
+'''
+
+# SQL expressions of the groupings offered by `dsum --query`
+GROUP_BY: Dict[str, str] = {
+    'day': 'date',
+    'week': "date(date, '-6 days', 'weekday 1')",  # Monday of the week
+    'month': 'substr(date, 1, 7)',
+    'year': 'substr(date, 1, 4)',
+    'tag': 'tag',
+}
+
+
+def beget_db_path() -> str:
+    """Generate the path of the blip index database."""
+    return f'{beget_cache_dir()}/{DB_FILE}'
+
+
+def first_log_year() -> int | None:
+    """Return the earliest year folder of the log tree, if there is one."""
+    try:
+        years = [int(name) for name in os.listdir(util.LOG_PATH)
+                 if len(name) == 4 and name.isdigit()]
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    return min(years, default=None)
+
+
+class BlipIndex():
+    """A SQLite table of every blip of the log tree, refreshed by file stat.
+
+    Files are keyed by path with their stat_signature, so a refresh only
+    parses the files that changed, and those of days that are not settled.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        """Open the database, creating its tables as needed."""
+        self.db_path = db_path or beget_db_path()
+        try:
+            os.mkdir(os.path.dirname(self.db_path))
+        except FileExistsError:
+            pass
+        except OSError:
+            # Never conjure a missing LOG_PATH; index in memory instead
+            self.db_path = ':memory:'
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.parsed = 0
+
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != DB_VERSION:
+            # An index from another layout is only derived data; rebuild it
+            self.connection.executescript(
+                'DROP TABLE IF EXISTS blips; DROP TABLE IF EXISTS files;')
+            self.connection.execute(f'PRAGMA user_version = {DB_VERSION}')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> BlipIndex:
+        """Use the index as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the database on leaving the context."""
+        self.close()
+
+    def refresh(self,
+                manifest: LogManifest | None = None,
+                load: Callable[[List[dt.date]], TimeBlob] | None = None
+                ) -> int:
+        """Bring the index up to date with the log tree; return files loaded.
+
+        The files that changed are loaded a year at a time with load, by
+        default daysum.blobify_dates, as RollupStore.refresh does.
+        """
+        if manifest is None:
+            from manifest import LogManifest
+            manifest = LogManifest()
+        if load is None:
+            # Imported here since daysum builds on this module
+            from daysum import blobify_dates
+
+            def load(date_list: List[dt.date]) -> TimeBlob:
+                return blobify_dates(date_list, manifest=manifest)
+
+        first_year = first_log_year()
+        found = dict()
+        if first_year is not None:
+            found = manifest.lookup(dt.date(first_year, 1, 1),
+                                    dt.date.today())
+            manifest.save()
+
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.connection.execute(
+                     'SELECT path, mtime_ns, size FROM files')}
+        stale: Dict[dt.date, Tuple[str, Tuple[int, int]]] = dict()
+        for date, (file_path, _, _) in found.items():
+            signature = stat_signature(file_path)
+            if signature is not None \
+                    and not is_current(date, signature, known.get(file_path)):
+                stale[date] = (file_path, signature)
+
+        self.parsed = len(stale)
+        with self.connection:
+            paths = {path for path, _, _ in found.values()}
+            self.connection.executemany(
+                'DELETE FROM files WHERE path = ?',
+                [(path,) for path in known if path not in paths])
+
+            for _, dates in groupby(sorted(stale), key=lambda date: date.year):
+                dates = list(dates)
+                blob = load(dates)
+                for date in dates:
+                    self._index_file(*stale[date], date,
+                                     blob.sub_blob(date).blip_list)
+
+        return self.parsed
+
+    def _index_file(self,
+                    file_path: str,
+                    signature: Tuple[int, int],
+                    date: dt.date,
+                    blip_list: List[TimeBlip]):
+        """Replace the rows of a single log file."""
+        self.connection.execute('DELETE FROM files WHERE path = ?',
+                                (file_path,))
+        self.connection.execute('INSERT INTO files VALUES (?, ?, ?, ?)',
+                                (file_path, date.isoformat(), *signature))
+        self.connection.executemany(
+            'INSERT INTO blips VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(file_path, date.isoformat(), blip.start.isoformat(),
+              blip.stop.isoformat(), blip.tdelta.total_seconds(),
+              blip.tag, blip.desc)
+             for blip in blip_list])
+
+    def query(self,
+              group_by: Sequence[str] = (),
+              tags: Sequence[str] = (),
+              since: dt.date | None = None,
+              until: dt.date | None = None) -> List[tuple]:
+        """Return rows of the group keys and the hours of each group.
+
+        Filters and groupings run in SQL, so only the answer leaves SQLite.
+        """
+        unknown = [group for group in group_by if group not in GROUP_BY]
+        if unknown:
+            raise ValueError(f'Unknown grouping: {", ".join(unknown)} '
+                             f'(choose from {", ".join(GROUP_BY)})')
+
+        where, params = list(), list()
+        if since is not None:
+            where.append('date >= ?')
+            params.append(since.isoformat())
+        if until is not None:
+            where.append('date <= ?')
+            params.append(until.isoformat())
+        if tags:
+            where.append(f'tag IN ({", ".join("?" * len(tags))})')
+            params += tags
+
+        keys = [GROUP_BY[group] for group in group_by]
+        sql = f'SELECT {", ".join(keys + ["SUM(seconds) / 3600.0"])} FROM blips'
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+        if keys:
+            sql += f' GROUP BY {", ".join(keys)} ORDER BY {", ".join(keys)}'
+
+        return [row for row in self.connection.execute(sql, params)
+                if row[-1] is not None]
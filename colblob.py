@@ -0,0 +1,205 @@
+"""A TimeBlob that stores its blips as parallel typed arrays."""
+from __future__ import annotations
+
+import datetime as dt
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from timeblob import (MINUTES_IN_DAY, TAG_TABLE, TimeBlip, TimeBlob,
+                      from_minutes)
+
+
+class ColumnarTimeBlob(TimeBlob):
+    """A TimeBlob kept as columns instead of a list of TimeBlip objects.
+
+    Each blip is a row across four arrays: start in epoch minutes, duration
+    in minutes, date ordinal and an interned tag id. Descriptions live in a
+    plain list. TimeBlips are only built when blip_list is read, and are
+    detached copies; changing one does not change the blob. blip_list is a
+    tuple for that reason, so blips can only be added with add_blip or
+    extend.
+
+    Blips that whole minutes cannot reproduce exactly (open-ended entries
+    stopped at the current second, or spans that wrap past noon) keep their
+    original TimeBlip in `exact`, and their duration column holds zero.
+    """
+
+    def __init__(self,
+                 blip_list: List[TimeBlip] = None,
+                 tag_set: Set[str] = None):
+        """Create empty columns and load any provided blips."""
+        self.starts = array('q')
+        self.durations = array('q')
+        self.ordinals = array('l')
+        self.tag_ids = array('l')
+        self.descs: List[str | None] = list()
+        self.exact: Dict[int, TimeBlip] = dict()
+        self.tag_set: Set[str] = tag_set if tag_set else set()
+        self._recount()
+
+        for blip in blip_list or list():
+            self.add_blip(blip)
+
+    def _recount(self):
+        """Forget the values kept by derived; the columns are the aggregates."""
+        self._derived: Dict = dict()
+        self._counted = self.row_count
+
+    def _validate(self):
+        """Forget the values kept by derived if rows were added since."""
+        if self._counted != self.row_count:
+            self._recount()
+
+    @classmethod
+    def from_blob(cls, blob: TimeBlob) -> ColumnarTimeBlob:
+        """Convert any TimeBlob into columnar storage."""
+        return cls(blob.blip_list, set(blob.tag_set))
+
+    @property
+    def row_count(self) -> int:
+        """Return the number of blips held."""
+        return len(self.starts)
+
+    def blip(self, index: int) -> TimeBlip:
+        """Materialize the blip stored in a single row."""
+        exact = self.exact.get(index)
+        if exact is not None:
+            return TimeBlip(exact.start, exact.stop, exact.desc, exact.tag)
+
+        start = self.starts[index]
+        return TimeBlip(from_minutes(start),
+                        from_minutes(start + self.durations[index]),
+                        self.descs[index],
+                        TAG_TABLE[self.tag_ids[index]])
+
+    @property
+    def blip_list(self) -> Tuple[TimeBlip, ...]:
+        """Return freshly materialized TimeBlips for every row."""
+        return tuple(self.blip(index) for index in range(self.row_count))
+
+    @property
+    def blob_total(self) -> dt.timedelta:
+        """Calculate the total of all blips."""
+        blob_sum = dt.timedelta(minutes=sum(self.durations))
+        for blip in self.exact.values():
+            blob_sum += blip.tdelta
+
+        return blob_sum
+
+    @property
+    def date_set(self) -> Set[dt.date]:
+        """Return a list of all dates represented in blip list."""
+        return {dt.date.fromordinal(ordinal) for ordinal in set(self.ordinals)}
+
+    @property
+    def date_counts(self) -> Dict[dt.date, int]:
+        """Return the number of blips on each date."""
+        return {dt.date.fromordinal(ordinal): count
+                for ordinal, count in Counter(self.ordinals).items()}
+
+    @property
+    def tag_counts(self) -> Dict[str, int]:
+        """Return the number of blips carrying each tag."""
+        return {TAG_TABLE[tag_id]: count
+                for tag_id, count in Counter(self.tag_ids).items()}
+
+    def get_tag_totals(self) -> Dict[str, dt.timedelta]:
+        """Get the totals of each tag."""
+        minutes: Dict[int, int] = Counter()
+        for tag_id, duration in zip(self.tag_ids, self.durations):
+            minutes[tag_id] += duration
+
+        tag_to_total = dict.fromkeys(self.tag_set, dt.timedelta())
+        for tag_id, total in minutes.items():
+            tag_to_total[TAG_TABLE[tag_id]] = dt.timedelta(minutes=total)
+        for blip in self.exact.values():
+            tag_to_total[blip.tag] += blip.tdelta
+        return tag_to_total
+
+    def add_blip(self, blip: TimeBlip):
+        """Append the blip as a new row and perform accounting actions."""
+        self.tag_set.add(blip.tag)
+
+        start = blip.ordinal * MINUTES_IN_DAY + blip.begin
+        span = blip.end - blip.begin
+        if span < 0 or not blip.in_minutes:
+            self.exact[self.row_count] = blip
+            span = 0
+
+        self.starts.append(start)
+        self.durations.append(span)
+        self.ordinals.append(blip.ordinal)
+        self.tag_ids.append(blip.tag_id)
+        self.descs.append(blip.desc)
+
+    def _take(self, rows: Iterable[int]) -> ColumnarTimeBlob:
+        """Return a new blob holding only the selected rows."""
+        taken = ColumnarTimeBlob()
+        for index in rows:
+            exact = self.exact.get(index)
+            if exact is not None:
+                taken.exact[taken.row_count] = exact
+            taken.starts.append(self.starts[index])
+            taken.durations.append(self.durations[index])
+            taken.ordinals.append(self.ordinals[index])
+            taken.tag_ids.append(self.tag_ids[index])
+            taken.descs.append(self.descs[index])
+            taken.tag_set.add(TAG_TABLE[self.tag_ids[index]])
+
+        return taken
+
+    def __add__(self, other_blob):
+        """Allow addition of Blobs."""
+        return ColumnarTimeBlob.concat([self, other_blob])
+
+    def extend(self, blobs: Iterable[TimeBlob]) -> ColumnarTimeBlob:
+        """Append the rows of several blobs in time linear in their size."""
+        for blob in blobs:
+            if not isinstance(blob, ColumnarTimeBlob):
+                for blip in blob.blip_list:
+                    self.add_blip(blip)
+                self.tag_set |= blob.tag_set
+                continue
+
+            offset = self.row_count
+            for index, blip in list(blob.exact.items()):
+                self.exact[offset + index] = blip
+            self.starts.extend(blob.starts)
+            self.durations.extend(blob.durations)
+            self.ordinals.extend(blob.ordinals)
+            self.tag_ids.extend(blob.tag_ids)
+            self.descs.extend(blob.descs)
+            self.tag_set |= blob.tag_set
+
+        return self
+
+    def sub_blob(self,
+                 start_date: dt.date,
+                 end_date: dt.date = None) -> ColumnarTimeBlob:
+        """Return a new blob with only blips in a date range [inclusive]."""
+        # Return a single day's blips if only one arg is given
+        if not end_date:
+            end_date = start_date
+        first, last = start_date.toordinal(), end_date.toordinal()
+
+        # Keep the rows grouped by date like TimeBlob's date buckets
+        rows = [index for index, ordinal in enumerate(self.ordinals)
+                if first <= ordinal <= last]
+        return self._take(sorted(rows, key=self.ordinals.__getitem__))
+
+    def filter_by(self, tags: List[str]) -> ColumnarTimeBlob:
+        """Return a sub blob with only certain tags."""
+        # Check tag_list for desired tags
+        wanted = [TAG_TABLE.intern(tag) for tag in dict.fromkeys(tags)
+                  if tag in self.tag_set]
+        # Return an empty Blob if tags are not present in self
+        if not wanted:
+            return ColumnarTimeBlob()
+
+        # Keep the rows grouped by tag like TimeBlob's tag buckets
+        order = {tag_id: rank for rank, tag_id in enumerate(wanted)}
+        rows = [index for index, tag_id in enumerate(self.tag_ids)
+                if tag_id in order]
+        return self._take(sorted(rows, key=lambda index:
+                                 order[self.tag_ids[index]]))
@@ -5,17 +5,35 @@ from __future__ import annotations
 import argparse
 import datetime as dt
 import os
-from typing import List
-
-from tabulate import tabulate
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
+import timing
 from probar import FIFTEEN_MINUTES, UNITS_PER_DAY, get_expected_time, probar
 from timeblob import TimeBlob, TimeBlip
 from util import beget_filepath, error_handler
-from logfile import log_2_blob
+from logfile import file_date, iter_blips, log_2_blob, mmap_2_blob
+from export import EXPORT_FORMATS, export_blips
+from logtail import tail_2_blob
+from pivot import (PivotTable, apply_tag_groups,  # noqa: F401 (re-exported)
+                   week_tables)
+
+# Views import their heavy dependencies (tabulate, progressbar) themselves
+# so that `dsum -x` only pays for what it renders.
+if TYPE_CHECKING:
+    from archive import YearArchive
+    from manifest import LogManifest
+    from parsecache import ParseCache
+    from rollup import RollupStore
 
 
 TODAY = dt.date.today()
+DEFAULT_JOBS = 4  # Threads used to load log files
+DAPTIV_FORMATS = ('table', 'csv', 'json')
+BACKENDS = ('auto', 'python', 'numpy')  # Who totals the views of a blob
+# Importing NumPy takes as long as totalling a hundred thousand blips in
+# Python, so only then does 'auto' pick npblob
+NUMPY_IMPORT_BLIPS = 100_000
 
 
 def print_delta_line(hr1, min1, hr2, min2, delta):
@@ -39,43 +57,155 @@ def get_week_list(date_contained: dt.date) -> List[dt.date]:
     return date_list
 
 
-def get_week_blob(date_contained: dt.date):
+def get_week_blob(date_contained: dt.date, jobs: int = DEFAULT_JOBS):
     """Place a week's worth of logs into a blob."""
     date_list = get_week_list(date_contained)
 
-    return blobify_dates(date_list)
+    return blobify_dates(date_list, jobs=jobs)
 
 
-def get_since_blob(since_date: dt.date):
+def get_since_blob(since_date: dt.date, jobs: int = DEFAULT_JOBS):
     """Generate a blob from all dates since the since_date."""
     # Get the full list of dates between the since date and today
     date_list: List[dt.date] = list()
     # Use the proleptic Gregorian ordinal number as a range of days
     for o_day in range(since_date.toordinal(), TODAY.toordinal()+1):
-        date_list.append(dt.datetime.fromordinal(o_day))
+        date_list.append(dt.date.fromordinal(o_day))
 
-    return blobify_dates(date_list)
+    return blobify_dates(date_list, jobs=jobs)
 
 
-def blobify_dates(date_list: List[dt.date]) -> TimeBlob:
-    """Return a TimeBlob formed from the specified dates."""
-    blob = TimeBlob()
-    # Place all dates in week into a single blob
-    for date in date_list:
-        file_path = beget_filepath(date)
-        # Only process files that exist
-        if not os.path.isfile(file_path):
-            continue
+def open_archives(years: Iterable[int]) -> Dict[int, YearArchive]:
+    """Map the yearly archives of the provided years, where they exist."""
+    from archive import YearArchive
+    return {year: YearArchive(year) for year in years}
+
+
+def load_day(date: dt.date,
+             file_path: str,
+             cache: ParseCache,
+             archives: Dict[int, YearArchive]) -> TimeBlob:
+    """Return the blob of a day from its archive, else through the cache."""
+    blob = None
+    if date.year in archives:
+        blob = archives[date.year].day_blob(date, file_path)
+    if blob is None:
+        blob = cache.get_blob(file_path, date)
+
+    return blob
+
 
-        daily_blob = log_2_blob(file_path, date)
-        blob += daily_blob
+def blips_of(blob: TimeBlob | Iterable[TimeBlip]) -> Iterable[TimeBlip]:
+    """Return the blips of a blob, or the provided stream of blips."""
+    if isinstance(blob, TimeBlob):
+        return blob.blip_list
 
     return blob
 
 
-def compact_probar(blob: TimeBlob,
+def use_numpy(backend: str, blip_count: int) -> bool:
+    """Return whether a backend totals so many blips with npblob."""
+    if backend == 'auto':
+        return blip_count >= NUMPY_IMPORT_BLIPS
+    return backend == 'numpy'
+
+
+def pivot_of(blob: TimeBlob | PivotTable | Iterable[TimeBlip],
+             groups: List[List[str]] | None = None,
+             backend: str = 'auto') -> PivotTable:
+    """Return the PivotTable of a blob or stream, or a table already built."""
+    if isinstance(blob, PivotTable):
+        return blob
+    if isinstance(blob, TimeBlob) and use_numpy(backend, len(blob.blip_list)):
+        import npblob
+        return npblob.pivot_table(blob, groups)
+
+    return PivotTable.from_blips(blips_of(blob), groups)
+
+
+def rollup_table(date_list: List[dt.date],
+                 groups: List[List[str]] | None = None,
+                 store: RollupStore | None = None,
+                 jobs: int = DEFAULT_JOBS) -> PivotTable:
+    """Return the totals of the dates, loading only days that changed.
+
+    For views that need no more than totals per day and tag. Changed days
+    are loaded by blobify_dates with jobs threads.
+    """
+    from manifest import LogManifest
+    if store is None:
+        from rollup import RollupStore
+        store = RollupStore()
+    manifest = LogManifest()
+
+    def load(changed: List[dt.date]) -> TimeBlob:
+        return blobify_dates(changed, jobs=jobs, manifest=manifest)
+
+    with timing.span('rollup'):
+        if date_list:
+            store.refresh(min(date_list), max(date_list), manifest, load)
+            store.save()
+        timing.count('days loaded', store.parsed)
+
+        return store.table(date_list, groups)
+
+
+def blobify_dates(date_list: List[dt.date],
+                  cache: ParseCache | None = None,
+                  jobs: int = DEFAULT_JOBS,
+                  manifest: LogManifest | None = None) -> TimeBlob:
+    """Return a TimeBlob formed from the specified dates.
+
+    The manifest of the log tree says which files exist, and unchanged log
+    files are read back from the parse cache. With more than one job, files
+    are checked and parsed on a thread pool, which hides the latency of a
+    network LOG_PATH; the blobs are still merged in date_list order, so the
+    result is the same as loading them one by one.
+    """
+    if cache is None:
+        from parsecache import ParseCache
+        cache = ParseCache()
+    if manifest is None:
+        from manifest import LogManifest
+        manifest = LogManifest()
+
+    if not date_list:
+        return TimeBlob()
+
+    # Only process files that exist
+    with timing.span('discovery'):
+        found = manifest.lookup(min(date_list), max(date_list))
+        manifest.save()
+    log_list = [(date, found[date][0]) for date in date_list if date in found]
+
+    archives = open_archives({date.year for date, _ in log_list})
+
+    def load(log: Tuple[dt.date, str]) -> TimeBlob:
+        date, file_path = log
+        return load_day(date, file_path, cache, archives)
+
+    # Place all dates into a single blob
+    with timing.span('load'):
+        if jobs > 1 and len(log_list) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                daily_blobs = list(pool.map(load, log_list))
+        else:
+            daily_blobs = [load(log) for log in log_list]
+
+        for archive in archives.values():
+            archive.close()
+        cache.save()
+    timing.count('cache hits', cache.hits)
+
+    with timing.span('merge'):
+        return TimeBlob.concat(daily_blobs)
+
+
+def compact_probar(blob: TimeBlob | PivotTable,
                    filled: str | None = None,
-                   empty: str | None = None) -> str:
+                   empty: str | None = None,
+                   in_tmux: bool | None = None) -> str:
     """Return an 8-char highlighted string showing hours worked.
 
     The label 'X.XX hrs' (always 8 visible chars) is printed with each
@@ -90,9 +220,10 @@ def compact_probar(blob: TimeBlob,
                 name (e.g. 'blue', 'colour214'). ANSI mode: an ANSI colour
                 code string (e.g. '\\x1b[44m').
         empty:  override the empty-zone colour (same format as filled).
+        in_tmux: force tmux or ANSI styling instead of checking $TMUX.
     """
-    import os
-    in_tmux = bool(os.environ.get('TMUX'))
+    if in_tmux is None:
+        in_tmux = bool(os.environ.get('TMUX'))
 
     if in_tmux:
         filled_bg = filled or 'green'
@@ -116,11 +247,19 @@ def compact_probar(blob: TimeBlob,
     return result + RESET
 
 
-def print_probar(blob: TimeBlob):
-    """Print the progressbar for a given blob."""
+def print_probar(blob: TimeBlob | PivotTable | Iterable[TimeBlip],
+                 fd=None,
+                 today: dt.date | None = None):
+    """Print the progressbar for a given blob, table or stream of blips.
+
+    today defaults to the date daysum started on.
+    """
+    if not isinstance(blob, (TimeBlob, PivotTable)):
+        blob = PivotTable.from_blips(blob)
+
     # Determine time expected to be done
     expected_time = 0
-    if TODAY in blob.date_set:
+    if (today or TODAY) in blob.date_set:
         expected_time = get_expected_time()
         expected_time += 8 * 4 * (len(blob.date_set) - 1)
     else:
@@ -135,148 +274,262 @@ def print_probar(blob: TimeBlob):
     # Print the progressbar with total
     probar(expected_time,
            done_time,
-           total_time)
+           total_time,
+           fd=fd)
 
 
-def report_view(blob: TimeBlob,
+def report_view(blob: TimeBlob | PivotTable | Iterable[TimeBlip],
                 tag_sort: bool = False,
-                verbose: int = 0) -> None:
+                verbose: int = 0,
+                backend: str = 'auto',
+                fd=None) -> None:
     """
-    Generate and display the weekly report.
+    Generate and display the weekly report; the progressbar goes to fd.
 
         TODO: create a tag sort option and verbose option?
     """
-    def print_workday_total(blob: TimeBlob):
-        full_days = int(blob.total_work_days)
-        remainder = blob.blob_total - dt.timedelta(hours=(full_days * 8))
+    def print_workday_total(table: PivotTable):
+        full_days = int(table.total_work_days)
+        remainder = table.blob_total - dt.timedelta(hours=(full_days * 8))
         print(f'\nWeekly Total{full_days:>7} days {remainder}')
 
-    for day in sorted(blob.date_set):
-        daily_total = blob.sub_blob(day).blob_total
+    table = pivot_of(blob, backend=backend)
+
+    for day in sorted(table.col_totals):
+        daily_total = table.col_totals[day]
         if daily_total > dt.timedelta(0):
             print(day.strftime('%a %b %d %Y'), end='')
             print(f'{"":10}{daily_total}')
 
-    print_workday_total(blob)
+    print_workday_total(table)
 
     # Print the progressbar with total
-    print_probar(blob)
+    print_probar(table, fd=fd)
+
+
+def daptiv_labels(table: PivotTable) -> List[str]:
+    """Return the row labels of a daptiv table, M+O first."""
+    tag_groups = table.rows
+    for tg in tag_groups:
+        if "M+O" in tg:
+            tag_groups.remove(tg)
+            tag_groups = [tg] + tag_groups
+            break
+
+    return [tag_list[0] for tag_list in tag_groups]
 
 
-def daptiv_format(blob: TimeBlob,
+def daptiv_weekdays(table: PivotTable) -> List[dt.date]:
+    """Return the Mon-Fri dates of the week a table covers."""
+    return [d for d in get_week_list(min(table.date_set)) if d.weekday() <= 4]
+
+
+def daptiv_format(blob: TimeBlob | Iterable[TimeBlip],
                   groups: List[List[str]] | None = None,
-                  verbose: int = 0) -> None:
+                  verbose: int = 0,
+                  fmt: str = 'table',
+                  backend: str = 'auto') -> None:
     """Display tdeltas and descriptions in a format for transfer to daptiv.
 
-    Assume that the blob only contains dates from a single week (M-Sun).
+    The blips are bucketed by ISO week in a single pass and each week gets
+    its own table, summed by npblob if the backend uses it. fmt 'csv' and
+    'json' give the same hours for batch submission instead.
     """
+    if not verbose and isinstance(blob, TimeBlob) \
+            and use_numpy(backend, len(blob.blip_list)):
+        import npblob
+        tables = npblob.week_tables(blob, groups)
+    else:
+        # The verbose view lists descriptions, which only the blips carry
+        tables = week_tables(blips_of(blob), groups, keep_descs=bool(verbose))
+    if fmt == 'csv':
+        daptiv_csv(tables)
+    elif fmt == 'json':
+        daptiv_json(tables, verbose)
+    else:
+        for n, table in enumerate(tables.values()):
+            if n:
+                print()
+            daptiv_table(table, verbose)
+
+
+def daptiv_table(table: PivotTable, verbose: int = 0) -> None:
+    """Print the daptiv table of a single week."""
+    from tabulate import tabulate
+
     HOURS = dt.timedelta(hours=1)
 
     def to_hours(td: dt.timedelta) -> str:
         """Convert a timedelta to a decimal-hours string. Ex: 6:30:00 -> 6.5"""
         return str(td / HOURS)
 
-    def build_row(label: str, source_blob: TimeBlob, default: str = '') -> List:
+    def build_row(label: str,
+                  cells: Dict[dt.date, dt.timedelta],
+                  total: dt.timedelta,
+                  default: str = '') -> List:
         """Build a tabulate row vector over the precomputed weekdays."""
         vec = [label]
         for date in weekdays:
-            if date in source_blob.date_set:
-                vec.append(to_hours(source_blob.sub_blob(date).blob_total))
+            if date in cells:
+                vec.append(to_hours(cells[date]))
             else:
                 vec.append(default)
-        vec += ['|', to_hours(source_blob.blob_total)]
+        vec += ['|', to_hours(total)]
         return vec
 
-    # Precompute Mon-Fri dates for this blob's week (omitting Sat/Sun)
-    blob_dates = sorted(blob.date_set)
-    weekdays = [d for d in get_week_list(blob_dates[0]) if d.weekday() <= 4]
+    # Precompute Mon-Fri dates for this table's week (omitting Sat/Sun)
+    weekdays = daptiv_weekdays(table)
 
     # Build table headers directly from weekdays — no post-processing needed
     headers = ([''] +
                [d.strftime('%A') + '\n' + d.strftime('%D') for d in weekdays] +
                ['', 'Total'])
 
-    # Apply tag groups and put M+O first
-    tag_groups = apply_tag_groups(list(blob.tag_set.copy()), groups)
-    for tg in tag_groups:
-        if "M+O" in tg:
-            tag_groups.remove(tg)
-            tag_groups = [tg] + tag_groups
-            break
-
     vector_list = list()
 
-    for tag_list in tag_groups:
-        filtered_blob = blob.filter_by(tag_list)
-
+    for label in daptiv_labels(table):
         if verbose:
-            print("\nTag: ", tag_list[0], '----------------')
-            desc_set = {
-                blip.desc[len(blip.tag)+1:]
-                for blip in filtered_blob.blip_list
-                if len(blip.desc) > len(blip.tag)+1
-            }
-            for desc in desc_set:
+            print("\nTag: ", label, '----------------')
+            for desc in table.descs[label]:
                 print(desc)
 
-        vector_list.append(build_row(tag_list[0], filtered_blob))
+        row_cells = {date: table.cells[label, date] for date in weekdays
+                     if (label, date) in table.cells}
+        vector_list.append(build_row(label, row_cells,
+                                     table.row_totals[label]))
 
     # Separator row — length tracks weekdays dynamically
     SEPARATOR = '----------'
     vector_list.append([SEPARATOR] + [SEPARATOR] * len(weekdays) + ['|', SEPARATOR])
 
     # Totals row — use '0.0' for weekdays with no logged time
-    vector_list.append(build_row(f'Σ: {to_hours(blob.blob_total)}', blob, default='0.0'))
+    vector_list.append(build_row(f'Σ: {to_hours(table.blob_total)}',
+                                 table.col_totals, table.blob_total,
+                                 default='0.0'))
 
     print(tabulate(vector_list, headers))
 
 
-def apply_tag_groups(singelton_tags: List[str],
-                     groups: List[List[str]] | None) -> List[List[str]]:
-    """Change a list of tags to a list of grouped tags."""
-    if groups:
-        # Strip tags in groups from singelton list
-        for group in groups:
-            for tag in group:
-                singelton_tags.remove(tag)
-        # Merge singelton and grouped tags for printing structure
-        tag_groups = [[tag] for tag in singelton_tags] + groups
-    else:
-        tag_groups = [[tag] for tag in singelton_tags]
+def daptiv_csv(tables: Dict[Tuple[int, int], PivotTable]) -> None:
+    """Print the hours of each week and label as CSV rows."""
+    import csv
+    import sys
 
-    return sorted(tag_groups)
+    HOURS = dt.timedelta(hours=1)
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(['week', 'tag', 'monday', 'tuesday', 'wednesday',
+                     'thursday', 'friday', 'total'])
+    for (year, week), table in tables.items():
+        weekdays = daptiv_weekdays(table)
+        for label in daptiv_labels(table):
+            writer.writerow(
+                [f'{year}-W{week:02}', label]
+                + [table.cells.get((label, date), dt.timedelta()) / HOURS
+                   for date in weekdays]
+                + [table.row_totals[label] / HOURS])
+
+
+def daptiv_json(tables: Dict[Tuple[int, int], PivotTable],
+                verbose: int = 0) -> None:
+    """Print the hours of each week and label as a JSON list of weeks."""
+    import json
 
+    HOURS = dt.timedelta(hours=1)
+    weeks = list()
+    for (year, week), table in tables.items():
+        weekdays = daptiv_weekdays(table)
+        rows = list()
+        for label in daptiv_labels(table):
+            row = {'tag': label,
+                   'hours': [table.cells.get((label, date), dt.timedelta())
+                             / HOURS for date in weekdays],
+                   'total': table.row_totals[label] / HOURS}
+            if verbose:
+                row['descs'] = sorted(table.descs[label])
+            rows.append(row)
+        weeks.append({'week': f'{year}-W{week:02}',
+                      'dates': [date.isoformat() for date in weekdays],
+                      'rows': rows,
+                      'total': table.blob_total / HOURS})
+
+    print(json.dumps(weeks, indent=2))
+
+
+def tag_view(blob: TimeBlob | PivotTable | Iterable[TimeBlip],
+             groups: List[List[str]] | None = None,
+             backend: str = 'auto'):
+    """Display the blob totals by tag.
+
+    A PivotTable is shown as it is, so it should be built with the groups.
+    """
+    from tabulate import tabulate
 
-def tag_view(blob: TimeBlob, groups: List[List[str]] | None = None):
-    """Display the blob totals by tag."""
-    # Apply tag groups
-    tag_groups = apply_tag_groups(list(blob.tag_set.copy()), groups)
+    table = pivot_of(blob, groups, backend)
 
     vector_list = list()
-    for tag_list in tag_groups:
-        filtered_blob = blob.filter_by(tag_list)
-
-        # Organize the dates in chronological order
-        tag_dates = list(filtered_blob.date_set)
-        tag_dates.sort()
-
+    for tag_list in table.rows:
         # Create the time vector with the tag as the left-most (first) entry
         row_vector = [tag_list[0]]
         # Convert Time-Deltas to Daptiv decimal form
         # Ex: 6:30:00 --> 6.5
-        row_vector.append(str(filtered_blob.blob_total/dt.timedelta(hours=1)))
+        row_vector.append(
+            str(table.row_totals[tag_list[0]]/dt.timedelta(hours=1)))
 
         vector_list.append(row_vector)
 
     # Print the tabulated table
-    dates = list(blob.date_set)
-    dates.sort()
+    dates = sorted(table.date_set)
     headers = {'', f'{dates[0]} --> {dates[-1]}'}
     print(tabulate(vector_list, headers))
 
 
-def driver():
-    """Contain the arg parser and perform main functions."""
+def query_view(groups: str,
+               tags: List[str] | None = None,
+               since: dt.date | None = None,
+               jobs: int = DEFAULT_JOBS):
+    """Display hours from the blip index, grouped by a comma separated list.
+
+    Changed log files are loaded into the index by blobify_dates with jobs
+    threads.
+    """
+    from tabulate import tabulate
+    from blipdb import BlipIndex
+    from manifest import LogManifest
+
+    group_by = [group for group in groups.split(sep=',') if group]
+    manifest = LogManifest()
+    with BlipIndex() as index:
+        index.refresh(manifest, lambda changed: blobify_dates(
+            changed, jobs=jobs, manifest=manifest))
+        rows = index.query(group_by, tags or list(), since)
+
+    print(tabulate(rows, headers=group_by + ['hours']))
+
+
+def export_view(fmt: str,
+                start_date: dt.date,
+                end_date: dt.date,
+                manifest: LogManifest | None = None) -> int:
+    """Stream every blip of a date range [inclusive] to stdout as fmt.
+
+    Files are parsed one at a time straight from disk, skipping the parse
+    cache, so exporting years of logs only holds one file's blips.
+    """
+    if manifest is None:
+        from manifest import LogManifest
+        manifest = LogManifest()
+
+    with timing.span('discovery'):
+        found = manifest.lookup(start_date, end_date)
+        manifest.save()
+
+    with timing.span('export'):
+        return export_blips(iter_blips((path, date) for date, (path, _, _)
+                                       in found.items()), fmt)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the parser of the dsum command line."""
     parser = argparse.ArgumentParser(
         prog='daysum',
         usage='%(prog)s FILENAME\n'
@@ -302,6 +555,9 @@ def driver():
                         help='display in report format')
     parser.add_argument('-d', '--daptiv', action='store_true',
                         help='Display data in daptiv format')
+    parser.add_argument('--format', choices=DAPTIV_FORMATS, default='table',
+                        help='output of the daptiv view: a table per week, or '
+                             'csv or json rows for batch submission')
     parser.add_argument('-g', '--group', action='append', default=None,
                         type=str,
                         help='enter tags to group together in weekly formats')
@@ -313,68 +569,275 @@ def driver():
     parser.add_argument('--empty', default=None, metavar='COLOUR',
                         help='colour for the empty (remaining) zone of the tmux bar '
                              '(tmux colour name or ANSI code)')
+    parser.add_argument('--serve', action='store_true',
+                        help='keep logs in memory and answer dsumc queries '
+                             'over a Unix socket')
+    parser.add_argument('--archive', type=int, default=None, metavar='YEAR',
+                        help='compile the logs of YEAR into a binary archive '
+                             'read by later queries')
+    parser.add_argument('--query', nargs='?', const='', default=None,
+                        metavar='GROUPS',
+                        help='total hours from the SQLite blip index, grouped '
+                             'by any of day,week,month,year,tag')
+    parser.add_argument('--export', choices=EXPORT_FORMATS, default=None,
+                        help='stream every blip of the day, -w weeks or -s '
+                             'range to stdout as JSON lines or CSV')
+    parser.add_argument('--batch', default=None, metavar='FILE',
+                        help='run the dsum arguments on each line of FILE, '
+                             'loading the logs they share only once')
+    parser.add_argument('--tag', action='append', default=None,
+                        help='only count this tag in --query (repeatable)')
+    parser.add_argument('--profile', nargs='?', const='', default=None,
+                        metavar='FILE',
+                        help='print the time spent in each stage to stderr; '
+                             'with FILE, also dump cProfile stats there')
+    parser.add_argument('--backend', choices=BACKENDS, default='auto',
+                        help='total the views of loaded logs in pure Python '
+                             'or with NumPy; auto uses NumPy for '
+                             f'{NUMPY_IMPORT_BLIPS:,} blips or more, and '
+                             'always when serving')
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        metavar='N',
+                        help='number of threads used to load log files '
+                             f'(default: {DEFAULT_JOBS})')
     # Quantifiers
     parser.add_argument('-w', '--week', action='count', default=0,
                         help='quantifier in weeks')
     parser.add_argument('-s', '--since', action='store_true',
                         help='since <date provided> quantifier')
 
-    args = parser.parse_args()
+    return parser
 
-    # Determine the argument types for the gen_sum function
-    gen_args = list()
+
+def driver():
+    """Parse the command line and perform main functions."""
+    args = build_parser().parse_args()
+
+    if args.profile is not None:
+        # Report where the time went once the run is over
+        timing.profile(lambda: summarize(args), args.profile or None)
+    else:
+        summarize(args)
+
+
+def resolve_dates(args: argparse.Namespace
+                  ) -> Tuple[dt.date, str | None, List[dt.date]]:
+    """Return the date in question, any explicit file and quantified dates.
+
+    Without a quantifier the list of dates is empty and views show the date
+    in question alone. An explicit file holds a single day, so it cannot be
+    quantified and raises ValueError with -d, -w or -s.
+    """
+    # Determine the date in question
+    explicit_file = None
     if args.file_or_month is None:
-        gen_args = [TODAY.year, TODAY.month, TODAY.day]
+        d_in_q = TODAY
     elif os.path.isfile(args.file_or_month):
-        # Read an explicitly defined file
-        gen_args.append(args.file_or_month)
+        # Read an explicitly defined file, dated by its name if possible
+        explicit_file = args.file_or_month
+        d_in_q = file_date(os.path.basename(explicit_file), None)
+        if args.daptiv or args.week or args.since:
+            raise ValueError(f'{explicit_file} is a single day; -d, -w and '
+                             '-s only read the log tree')
     else:
         # Default behavior, use month and day to determine filename
-        args.file_or_month = int(args.file_or_month)
-        gen_args = [args.year, args.file_or_month, args.day]
-
-    d_in_q = dt.date(*gen_args)  # date in question
+        d_in_q = dt.date(args.year, int(args.file_or_month), args.day)
 
     # Handle quantifier options
-    # Create the Quantifier Blob
-    q_blob: TimeBlob = TimeBlob()
-
     if args.daptiv and not args.week:
         args.week = 1
 
+    date_list = list()
     if args.week:
         for week in range(0, args.week):
-            day_in_week = d_in_q - dt.timedelta(days=(week * 7))
-            q_blob += get_week_blob(day_in_week)
+            date_list += get_week_list(d_in_q - dt.timedelta(days=(week * 7)))
     elif args.since:
-        q_blob = get_since_blob(d_in_q)
-    else:  # No quantifiers -> use day in question
-        try:
-            q_blob = log_2_blob(beget_filepath(d_in_q))
-        except FileNotFoundError:
-            today = dt.datetime(TODAY.year, TODAY.month, TODAY.day, 0, 0)
-            q_blob = TimeBlob(blip_list=[TimeBlip(today, today)])
+        # Use the proleptic Gregorian ordinal number as a range of days
+        date_list = [dt.date.fromordinal(o_day) for o_day in
+                     range(d_in_q.toordinal(), TODAY.toordinal() + 1)]
 
-    # Handle specifier options
-    # Determine the list of grouped tags
+    return d_in_q, explicit_file, date_list
+
+
+def groups_of(args: argparse.Namespace) -> List[List[str]]:
+    """Return the tag groups given with -g."""
     group_list = list()
     if args.group:
         for g_str in args.group:
             group_list.append(g_str.split(sep=','))
 
+    return group_list
+
+
+def empty_day_blob(today: dt.date | None = None) -> TimeBlob:
+    """Return the stand-in blob of a day without a log file."""
+    today = today or TODAY
+    midnight = dt.datetime(today.year, today.month, today.day, 0, 0)
+    return TimeBlob(blip_list=[TimeBlip(midnight, midnight)])
+
+
+def render(args: argparse.Namespace,
+           q_blob: TimeBlob | PivotTable,
+           group_list: List[List[str]],
+           fd=None):
+    """Display the view the parsed arguments ask for.
+
+    Progressbars go to fd, stderr by default, and the rest to stdout.
+    """
+    with timing.span('render'):
+        if args.tmux:
+            print(compact_probar(q_blob, filled=args.filled, empty=args.empty))
+        elif args.report:
+            report_view(q_blob,
+                        tag_sort=args.tag_sort,
+                        verbose=args.verbose,
+                        backend=args.backend,
+                        fd=fd)
+        elif args.daptiv:
+            daptiv_format(q_blob, group_list, args.verbose, args.format,
+                          args.backend)
+        elif args.tag_sort:
+            tag_view(q_blob, group_list, args.backend)
+        else:
+            print_probar(q_blob, fd=fd)
+
+
+def summarize(args: argparse.Namespace):
+    """Load the logs the parsed arguments ask for and display their view."""
+    if args.serve:
+        # Imported here since the server module builds on this one
+        from dsumd import serve
+        serve(backend=args.backend)
+        return
+
+    if args.archive is not None:
+        from archive import beget_archive_path, build_archive
+        day_count = build_archive(args.archive)
+        if day_count is None:
+            error_handler(f'Could not write {beget_archive_path(args.archive)}')
+        print(f'Archived {day_count} days of {args.archive} to '
+              f'{beget_archive_path(args.archive)}')
+        return
+
+    if args.batch is not None:
+        batch_view(args.batch, args.jobs, args.backend)
+        return
+
+    try:
+        d_in_q, explicit_file, date_list = resolve_dates(args)
+    except ValueError as exc:
+        error_handler(exception=exc)
+
+    if args.query is not None:
+        try:
+            query_view(args.query, args.tag, d_in_q if args.since else None,
+                       args.jobs)
+        except ValueError as exc:
+            error_handler(exception=exc)
+        return
+
+    if args.export:
+        if explicit_file:
+            export_blips(iter_blips([(explicit_file, d_in_q)],
+                                    load=mmap_2_blob), args.export)
+        else:
+            export_view(args.export, min(date_list, default=d_in_q),
+                        max(date_list, default=d_in_q))
+        return
+
+    # Handle specifier options
+    group_list = groups_of(args)
+
+    # Create the Quantifier Blob
+    q_blob: TimeBlob | PivotTable = TimeBlob()
+    if args.daptiv:
+        # The verbose daptiv view lists descriptions, so it needs the blips
+        q_blob = blobify_dates(date_list, jobs=args.jobs)
+    elif args.week or args.since:
+        # The remaining views only need totals per day and tag
+        q_blob = rollup_table(date_list, group_list, jobs=args.jobs)
+    else:  # No quantifiers -> use day in question
+        try:
+            if explicit_file:
+                # Hand-kept files can be large; scan them as one buffer
+                q_blob = mmap_2_blob(explicit_file, d_in_q)
+            elif d_in_q == TODAY:
+                # Status lines refresh today's log often; skip settled lines
+                q_blob = tail_2_blob(beget_filepath(d_in_q), d_in_q)
+            else:
+                q_blob = log_2_blob(beget_filepath(d_in_q), d_in_q)
+        except FileNotFoundError:
+            q_blob = empty_day_blob()
+
     # Handle view options
-    if args.tmux:
-        print(compact_probar(q_blob, filled=args.filled, empty=args.empty))
-    elif args.report:
-        report_view(q_blob,
-                    tag_sort=args.tag_sort,
-                    verbose=args.verbose)
-    elif args.daptiv:
-        daptiv_format(q_blob, group_list, args.verbose)
-    elif args.tag_sort:
-        tag_view(q_blob, group_list)
-    else:
-        print_probar(q_blob)
+    render(args, q_blob, group_list)
+
+
+def batch_view(batch_path: str,
+               jobs: int = DEFAULT_JOBS,
+               backend: str = 'auto'):
+    """Run the dsum arguments on each line of a file over one loaded blob.
+
+    Every line is parsed before anything is loaded, so a bad line stops the
+    batch early. The union of the dates of all lines is loaded once and each
+    view is drawn from the shared blob, under a `==> line <==` header.
+    Blank lines and lines starting with # are skipped. Lines without a
+    --backend of their own use backend, where 'auto' weighs the blips of
+    every view together. Progressbars are drawn to stdout as well, so each
+    view stays inside its header's section.
+    """
+    import shlex
+
+    parser = build_parser()
+    try:
+        with open(batch_path) as batch_file:
+            lines = [line.strip() for line in batch_file]
+    except OSError as exc:
+        error_handler(exception=exc)
+
+    queries = list()
+    for line in lines:
+        if not line or line.startswith('#'):
+            continue
+        args = parser.parse_args(shlex.split(line))
+        if args.serve or args.batch is not None or args.archive is not None \
+                or args.profile is not None:
+            parser.error(f'not allowed in a batch: {line}')
+        try:
+            queries.append((line, args, *resolve_dates(args)))
+        except ValueError as exc:
+            parser.error(f'{exc}: {line}')
+
+    # Every view drawn from the log tree shares a single load
+    shared_dates = set()
+    for _, args, d_in_q, explicit_file, date_list in queries:
+        if args.query is None and args.export is None and not explicit_file:
+            shared_dates.update(date_list or [d_in_q])
+    shared = blobify_dates(sorted(shared_dates), jobs=jobs)
+    if backend == 'auto':
+        backend = 'numpy' if use_numpy(
+            backend, len(shared.blip_list) * len(queries)) else 'python'
+
+    for n, (line, args, d_in_q, explicit_file, date_list) in \
+            enumerate(queries):
+        if n:
+            print()
+        print(f'==> {line} <==')
+        if args.backend == 'auto':
+            args.backend = backend
+        if args.query is not None or args.export is not None:
+            summarize(args)
+            continue
+
+        if date_list:
+            q_blob = shared.sub_blob(min(date_list), max(date_list))
+        elif explicit_file:
+            q_blob = mmap_2_blob(explicit_file, d_in_q)
+        elif os.path.isfile(beget_filepath(d_in_q)):
+            q_blob = shared.sub_blob(d_in_q)
+        else:
+            q_blob = empty_day_blob()
+        render(args, q_blob, groups_of(args), fd=sys.stdout)
 
 
 if __name__ == '__main__':
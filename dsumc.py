@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""Print daysum views from a running `dsum --serve` with minimal startup.
+
+Usage: dsumc [status|day|week|daptiv] [WEEKS] [--filled COLOUR] [--empty COLOUR]
+             [--format table|csv|json]
+"""
+import json
+import os
+import socket
+import sys
+
+from util import beget_socket_path
+
+VIEWS = ('status', 'day', 'week', 'daptiv')
+TIMEOUT = 5.0
+
+
+def build_query(argv):
+    """Turn the command line into a query for the server."""
+    query = {'view': 'status', 'tmux': bool(os.environ.get('TMUX'))}
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg in ('--filled', '--empty', '--format') and args:
+            query[arg[2:]] = args.pop(0)
+        elif arg in VIEWS:
+            query['view'] = arg
+        elif arg.isdigit():
+            query['weeks'] = int(arg)
+        else:
+            raise ValueError(f'unrecognised argument: {arg}')
+
+    return query
+
+
+def ask_server(query, socket_path=None):
+    """Send a query to the server and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(TIMEOUT)
+        conn.connect(socket_path or beget_socket_path())
+        conn.sendall(json.dumps(query).encode() + b'\n')
+        chunks = list()
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    return b''.join(chunks).decode()
+
+
+def answer_locally(query):
+    """Render the status view in-process when no server is running."""
+    import datetime as dt
+
+    import daysum
+    from logtail import tail_2_blob
+    from timeblob import TimeBlob
+    from util import beget_filepath
+
+    today = dt.date.today()
+    try:
+        blob = tail_2_blob(beget_filepath(today), today)
+    except FileNotFoundError:
+        blob = TimeBlob()
+
+    return daysum.compact_probar(blob, filled=query.get('filled'),
+                                 empty=query.get('empty'),
+                                 in_tmux=query['tmux']) + '\n'
+
+
+def main(argv=None):
+    """Print the reply to the query given on the command line."""
+    try:
+        query = build_query(sys.argv[1:] if argv is None else argv)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        print(__doc__[__doc__.index('Usage:'):].strip(), file=sys.stderr)
+        return 2
+
+    try:
+        reply = ask_server(query)
+    except OSError:
+        if query['view'] != 'status':
+            print('dsum server is not running; start it with `dsum --serve`',
+                  file=sys.stderr)
+            return 1
+        reply = answer_locally(query)
+
+    sys.stdout.write(reply)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Serve daysum views from memory over a local Unix socket."""
+from __future__ import annotations
+
+import datetime as dt
+import io
+import json
+import os
+import socket
+import socketserver
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List, Tuple
+
+import daysum
+from logfile import log_2_blob
+from logtail import tail_2_blob
+from timeblob import TimeBlob
+from util import (beget_filepath, beget_socket_path, error_handler, is_settled,
+                  stat_signature)
+
+POLL_INTERVAL = 2.0  # Seconds between stat sweeps of the loaded log files
+MAX_REQUEST = 4096
+
+
+class BlobStore():
+    """Daily blobs kept in memory and dropped when their log file changes."""
+
+    def __init__(self):
+        """Start with no days loaded."""
+        self.days: Dict[dt.date, Tuple[Tuple[int, int] | None, TimeBlob]] = \
+            dict()
+
+    def day_blob(self, date: dt.date) -> TimeBlob:
+        """Return the blob of a single day, parsing its file if needed."""
+        file_path = beget_filepath(date)
+        if not is_settled(date):
+            try:
+                return tail_2_blob(file_path, date)
+            except FileNotFoundError:
+                return TimeBlob()
+
+        entry = self.days.get(date)
+        if entry is None:
+            signature = stat_signature(file_path)
+            blob = TimeBlob()
+            if signature is not None:
+                blob = log_2_blob(file_path, date)
+            entry = (signature, blob)
+            self.days[date] = entry
+
+        return entry[1]
+
+    def get_blob(self, date_list: List[dt.date]) -> TimeBlob:
+        """Return a blob spanning all of the provided dates."""
+        return TimeBlob.concat(self.day_blob(date) for date in date_list)
+
+    def poll(self) -> int:
+        """Forget every day whose log file changed; return how many did."""
+        stale = [date for date, (signature, _) in self.days.items()
+                 if stat_signature(beget_filepath(date)) != signature]
+        for date in stale:
+            del self.days[date]
+
+        return len(stale)
+
+
+def week_dates(date: dt.date, weeks: int) -> List[dt.date]:
+    """Return the dates of a number of weeks, ending with date's week."""
+    date_list = list()
+    for week in reversed(range(0, max(weeks, 1))):
+        date_list += daysum.get_week_list(date - dt.timedelta(days=week * 7))
+
+    return date_list
+
+
+def answer(store: BlobStore, query: dict, backend: str = 'auto') -> str:
+    """Render the view requested by a client query with a daysum backend."""
+    # The server outlives the day it was started on
+    today = dt.date.today()
+
+    view = query.get('view', 'status')
+    date = today
+    if query.get('date'):
+        date = dt.date.fromisoformat(query['date'])
+    weeks = int(query.get('weeks') or 1)
+
+    out = io.StringIO()
+    if view == 'status':
+        blob = store.day_blob(date)
+        out.write(daysum.compact_probar(blob,
+                                        filled=query.get('filled'),
+                                        empty=query.get('empty'),
+                                        in_tmux=bool(query.get('tmux'))))
+        out.write('\n')
+    elif view == 'day':
+        daysum.print_probar(store.get_blob([date]), fd=out,
+                            today=today)
+    elif view == 'week':
+        daysum.print_probar(store.get_blob(week_dates(date, weeks)), fd=out,
+                            today=today)
+    elif view == 'daptiv':
+        groups = [g.split(sep=',') for g in query.get('groups') or list()]
+        with redirect_stdout(out):
+            daysum.daptiv_format(store.get_blob(week_dates(date, weeks)),
+                                 groups, int(query.get('verbose') or 0),
+                                 query.get('format') or 'table', backend)
+    else:
+        out.write(f'Unknown view: {view}\n')
+
+    return out.getvalue()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """Answer a single JSON query line with the rendered text."""
+
+    def handle(self):
+        """Read the query, render it and reply."""
+        line = self.rfile.readline(MAX_REQUEST)
+        try:
+            reply = answer(self.server.store, json.loads(line or '{}'),
+                           self.server.backend)
+        except Exception as exc:  # Keep serving whatever a client sends
+            reply = f'dsum server error: {exc!r}\n'
+        self.wfile.write(reply.encode())
+
+
+class DaysumServer(socketserver.UnixStreamServer):
+    """A Unix socket server that polls the log tree between requests."""
+
+    def __init__(self, socket_path: str, backend: str = 'auto'):
+        """Bind to socket_path with an empty BlobStore."""
+        self.store = BlobStore()
+        self.backend = backend
+        self.last_poll = time.monotonic()
+        super().__init__(socket_path, QueryHandler)
+
+    def service_actions(self):
+        """Poll the stat of loaded files at most every POLL_INTERVAL."""
+        now = time.monotonic()
+        if now - self.last_poll >= POLL_INTERVAL:
+            self.last_poll = now
+            self.store.poll()
+
+
+def clear_stale_socket(socket_path: str):
+    """Remove a socket file left behind by a server that is gone."""
+    if not os.path.exists(socket_path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(socket_path)
+    else:
+        error_handler(f'dsum is already serving on {socket_path}')
+    finally:
+        probe.close()
+
+
+def serve(socket_path: str | None = None, backend: str = 'auto'):
+    """Serve daysum queries until interrupted.
+
+    A server lives long enough to pay for importing NumPy, so the 'auto'
+    backend is 'numpy' here.
+    """
+    if backend == 'auto':
+        backend = 'numpy'
+    if backend == 'numpy':
+        # Import it before the first query rather than during one
+        import npblob  # noqa: F401
+
+    socket_path = socket_path or beget_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    clear_stale_socket(socket_path)
+
+    with DaysumServer(socket_path, backend) as server:
+        try:
+            server.serve_forever(poll_interval=POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
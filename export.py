@@ -0,0 +1,63 @@
+"""Write streams of blips as JSON lines or CSV rows for other programs.
+
+The csv and json modules are imported when an export runs, since daysum
+imports this module for its format names on every start.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from typing import Dict, Iterable
+
+from timeblob import TimeBlip
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+FIELDS = ('date', 'start', 'stop', 'minutes', 'tag', 'desc')
+
+MINUTE = dt.timedelta(minutes=1)
+
+
+def blip_record(blip: TimeBlip) -> Dict:
+    """Return the exported fields of a blip.
+
+    Minutes are whole unless the blip is not (an open-ended entry stopped
+    at the current second).
+    """
+    tdelta = blip.tdelta
+    minutes = tdelta // MINUTE if not tdelta % MINUTE else tdelta / MINUTE
+    return {'date': blip.date.isoformat(),
+            'start': blip.start.isoformat(),
+            'stop': blip.stop.isoformat(),
+            'minutes': minutes,
+            'tag': blip.tag,
+            'desc': blip.desc}
+
+
+def export_blips(blips: Iterable[TimeBlip],
+                 fmt: str = 'jsonl',
+                 fd=None) -> int:
+    """Write each blip as it comes, to stdout by default; return the count.
+
+    Nothing is gathered first, so the memory used does not grow with the
+    number of blips.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {fmt} '
+                         f'(choose from {", ".join(EXPORT_FORMATS)})')
+    fd = fd or sys.stdout
+
+    count = 0
+    if fmt == 'csv':
+        import csv
+        writer = csv.DictWriter(fd, FIELDS, lineterminator='\n')
+        writer.writeheader()
+        for blip in blips:
+            writer.writerow(blip_record(blip))
+            count += 1
+    else:
+        import json
+        for blip in blips:
+            fd.write(json.dumps(blip_record(blip), ensure_ascii=False) + '\n')
+            count += 1
+
+    return count
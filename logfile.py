@@ -3,23 +3,163 @@
 from __future__ import annotations
 
 import datetime as dt
+import io
+import mmap
 import re
 import os
+from typing import Callable, Iterable, Iterator, Tuple
 # import decimal
 
-from timeblob import TimeBlip, TimeBlob
+import timing
+from timeblob import STRIP_TAG_RE, TimeBlip, TimeBlob
 from util import beget_date, error_handler
 
 DUMMY_DATE = (1986, 2, 21)
 TIME_ENTRY_RE = re.compile(r'(\d{1,2}):?(\d{1,2})?-(\d{1,2})?:?(\d{1,2})?')
 TIME_BLOCK_RE = re.compile(r'^(\d{1,2})\.?(\d{1,2})?$')
+# Both time patterns in one, entries first; groups 1-4 entry, 5-6 block
+TIME_LINE_RE = re.compile(f'{TIME_ENTRY_RE.pattern}|{TIME_BLOCK_RE.pattern}')
 
+# The same over a whole bytes buffer, matching only at line starts
+TIME_LINE_BYTES_RE = re.compile(
+    rb'^(\d{1,2}):?(\d{1,2})?-(\d{1,2})?:?(\d{1,2})?'
+    rb'|^(\d{1,2})\.?(\d{1,2})?\r?$', re.MULTILINE)
 
-def log_2_blob(filename: str, date: dt.date | None = None) -> TimeBlob:
-    """Scan a log file and place the data in a TimeBlip."""
-    # Check existence of file
-    blob = None
+# Kinds of log line returned by tokenize
+ENTRY_LINE, BLOCK_LINE, DESC_LINE = range(3)
+
+
+def tokenize(line: str) -> Tuple[int, tuple]:
+    """Classify a log line in one pass and return its kind and fields.
+
+    Time entries give their four time groups, time blocks their two, and
+    any other line its stripped description and tag. Both time patterns
+    start with a digit, so most description lines never reach a regex but
+    the tag one.
+    """
+    if line[:1].isdecimal():
+        time_match = TIME_LINE_RE.match(line)
+        if time_match:
+            groups = time_match.groups()
+            if groups[0] is not None:
+                return ENTRY_LINE, groups[:4]
+            return BLOCK_LINE, groups[4:]
+
+    desc = line.strip()
+    # Same as TimeBlip.strip_tag, as the tag pattern matches at the start
+    return DESC_LINE, (desc, STRIP_TAG_RE.match(desc).group(0))
+
+
+class LogParser():
+    """Turn log lines into TimeBlips, one line at a time.
+
+    The parser only holds the blob built so far and the time entry still
+    waiting for its description, so parsing can stop after any line and be
+    resumed later from the same state.
+    """
+
+    def __init__(self,
+                 date: dt.date,
+                 blob: TimeBlob | None = None,
+                 purgatory_blip: TimeBlip | None = None):
+        """Prepare to parse lines belonging to a single date."""
+        self.date = date
+        # Shared by every blip of the date
+        self.ordinal = date.toordinal()
+        self.blob = blob if blob is not None else TimeBlob()
+        self.purgatory_blip = purgatory_blip
+
+    def feed(self, line: str) -> bool:
+        """Parse one line; return True if it was an open-ended entry."""
+        # Determine what type of info is on line
+        kind, fields = tokenize(line)
+
+        # On lines stating time deltas
+        if kind == ENTRY_LINE:
+            return self.enter_time(fields)
+        elif kind == BLOCK_LINE:
+            self.enter_block(fields)
+        else:  # Description lines
+            self.enter_desc(*fields)
+
+        return False
+
+    def enter_time(self, fields: tuple) -> bool:
+        """Hold the blip of a time entry; return True if it is open-ended.
+
+        Fields are the TIME_ENTRY_RE groups, as str or bytes.
+        """
+        date = self.date
+        open_ended = False
+
+        # Grab start time
+        hour1 = int(fields[0])
+        min1 = 0
+        if fields[1]:
+            min1 = int(fields[1])
+        if fields[2] is not None:
+            hour2 = int(fields[2])
+            min2 = 0
+            if fields[3] is not None:
+                min2 = int(fields[3])
+            if hour1 < 24 and min1 < 60 and hour2 < 24 and min2 < 60:
+                # Clock times on the log's date need no datetimes
+                self.purgatory_blip = TimeBlip.of_minutes(
+                    self.ordinal, hour1 * 60 + min1, hour2 * 60 + min2)
+                return False
+
+        # Out of range times raise here, as datetimes reject them
+        start_time = dt.datetime.combine(date, dt.time(hour1, min1))
+        # Grab end time; if absent, use current time capped so the day total stays <= 8h
+        if fields[2] is not None:
+            end_time = dt.datetime.combine(date, dt.time(hour2, min2))
+        else:
+            open_ended = True
+            remaining = dt.timedelta(hours=8) - self.blob.blob_total
+            if remaining < dt.timedelta(0):
+                remaining = dt.timedelta(0)
+            max_end = start_time + remaining
+            now = dt.datetime.now()
+            end_time = min(now, max_end)
+
+        self.purgatory_blip = TimeBlip(start_time, end_time)
+        return open_ended
+
+    def enter_block(self, fields: tuple):
+        """Hold the blip of a time block, from its TIME_BLOCK_RE groups."""
+        date = self.date
+        # Grab hour value
+        hour_delta = int(fields[0])
+        min_delta = 0
+        if fields[1]:
+            frac_str = fields[1]
+            min_delta = int(frac_str) / (10 ** len(frac_str))
+        minutes = round(min_delta * 60)
+        if hour_delta < 24 and minutes < 60:
+            self.purgatory_blip = TimeBlip.of_minutes(
+                self.ordinal, 0, hour_delta * 60 + minutes)
+            return
+
+        start_time = dt.datetime.combine(date, dt.time(0, 0))
+        # Grab end time
+        end_time = dt.datetime.combine(date, dt.time(hour_delta, minutes))
+
+        self.purgatory_blip = TimeBlip(start_time, end_time)
 
+    def enter_desc(self, desc: str, tag: str):
+        """Describe the held blip, if any, and add it to the blob."""
+        if isinstance(self.purgatory_blip, TimeBlip):
+            self.purgatory_blip.desc = desc
+            self.purgatory_blip.set_tag(tag)
+
+            # Add the Blip to the Blob
+            self.blob.add_blip(self.purgatory_blip)
+            # Reset the purgatory_blip for the next delta,desc pair
+            self.purgatory_blip = None
+
+
+def file_date(filename: str, date: dt.date | None = None) -> dt.date:
+    """Return the date of a log file, from its name if not provided."""
     # Determine the date corresponding to filename
     if not date:
         date = beget_date(filename)
@@ -27,61 +167,82 @@ def log_2_blob(filename: str, date: dt.date | None = None) -> TimeBlob:
         if not date:
             date = dt.date(*DUMMY_DATE)
 
+    return date
+
+
+def log_2_blob(filename: str, date: dt.date | None = None) -> TimeBlob:
+    """Scan a log file and place the data in a TimeBlip."""
+    date = file_date(filename, date)
+
+    with timing.span('read'):
+        with open(filename, 'r') as log:
+            text = log.read()
+    timing.count('files opened')
+
     # Begin transfering text info to TimeBlob data stucture
-    with open(filename, 'r') as log:
-        blob = TimeBlob()
-        purgatory_blip = None
-
-        for line in log:
-            # Determine what type of info is on line
-            hour_search = re.match(TIME_ENTRY_RE, line)
-            block_search = re.match(TIME_BLOCK_RE, line)
-
-            # On lines stating time deltas
-            if hour_search:
-                # Grab start time
-                hour1 = int(hour_search.group(1))
-                min1 = 0
-                if hour_search.group(2):
-                    min1 = int(hour_search.group(2))
-                start_time = dt.datetime.combine(date, dt.time(hour1, min1))
-                # Grab end time; if absent, use current time capped so the day total stays <= 8h
-                if hour_search.group(3) is not None:
-                    hour2 = int(hour_search.group(3))
-                    min2 = 0
-                    if hour_search.group(4) is not None:
-                        min2 = int(hour_search.group(4))
-                    end_time = dt.datetime.combine(date, dt.time(hour2, min2))
-                else:
-                    remaining = dt.timedelta(hours=8) - blob.blob_total
-                    if remaining < dt.timedelta(0):
-                        remaining = dt.timedelta(0)
-                    max_end = start_time + remaining
-                    now = dt.datetime.now()
-                    end_time = min(now, max_end)
-
-                purgatory_blip = TimeBlip(start_time, end_time)
-            elif block_search:
-                # Grab hour value
-                hour_delta = int(block_search.group(1))
-                min_delta = 0
-                if block_search.group(2):
-                    frac_str = block_search.group(2)
-                    min_delta = int(frac_str) / (10 ** len(frac_str))
-                start_time = dt.datetime.combine(date, dt.time(0, 0))
-                # Grab end time
-                end_time = dt.datetime.combine(
-                    date, dt.time(hour_delta, round(min_delta * 60)))
-
-                purgatory_blip = TimeBlip(start_time, end_time)
-
-            else:  # Description lines
-                if isinstance(purgatory_blip, TimeBlip):
-                    purgatory_blip.desc = line.strip()
-                    purgatory_blip.set_tag(TimeBlip.strip_tag(line.strip()))
-
-                    # Add the Blip to the Blob
-                    blob.add_blip(purgatory_blip)
-                    # Reset the purgatory_blip for the next delta,desc pair
-                    purgatory_blip = None
-    return blob
+    with timing.span('parse'):
+        parser = LogParser(date)
+        line_count = 0
+        for line_count, line in enumerate(io.StringIO(text), 1):
+            parser.feed(line)
+    timing.count('lines parsed', line_count)
+    timing.count('blips created', len(parser.blob.blip_list))
+
+    return parser.blob
+
+
+def iter_blips(paths: Iterable[str | Tuple[str, dt.date]],
+               load: Callable[[str, dt.date], TimeBlob] = log_2_blob
+               ) -> Iterator[TimeBlip]:
+    """Yield the blips of many log files, parsing one file at a time.
+
+    Paths may be given with their date as (path, date) pairs; otherwise the
+    date is taken from the file name. Only the file being read is held in
+    memory, so consumers that fold the blips as they come stay small.
+    """
+    for path in paths:
+        date = None
+        if not isinstance(path, str):
+            path, date = path
+        date = file_date(os.path.basename(path), date)
+        yield from load(path, date).blip_list
+
+
+def mmap_2_blob(filename: str, date: dt.date | None = None) -> TimeBlob:
+    """Scan a log file as one memory-mapped buffer; same result as log_2_blob.
+
+    Meant for large hand-kept files: the time lines are found with a single
+    bytes finditer over the whole buffer and only the descriptions that get
+    kept are decoded, rather than building a str for every line. Lines end
+    at LF (a CR before it is dropped), and descriptions are read as UTF-8.
+    """
+    parser = LogParser(file_date(filename, date))
+
+    with open(filename, 'rb') as log:
+        try:
+            buffer = mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return parser.blob
+
+    with buffer:
+        size = len(buffer)
+        for time_match in TIME_LINE_BYTES_RE.finditer(buffer):
+            groups = time_match.groups()
+            if groups[0] is not None:
+                parser.enter_time(groups[:4])
+            else:
+                parser.enter_block(groups[4:])
+
+            # A description is the next line, unless that is a time line too
+            desc_start = buffer.find(b'\n', time_match.end()) + 1
+            if desc_start == 0 or desc_start == size \
+                    or TIME_LINE_BYTES_RE.match(buffer, desc_start):
+                continue
+            desc_end = buffer.find(b'\n', desc_start)
+            if desc_end < 0:
+                desc_end = size
+
+            desc = buffer[desc_start:desc_end].decode().strip()
+            parser.enter_desc(desc, STRIP_TAG_RE.match(desc).group(0))
+
+    return parser.blob
@@ -0,0 +1,119 @@
+"""Resume parsing of a log file from where the previous run stopped."""
+from __future__ import annotations
+
+import datetime as dt
+import zlib
+
+from logfile import LogParser
+from timeblob import TimeBlip, TimeBlob
+from util import beget_cache_dir, load_versioned, save_versioned
+
+TAIL_FILE = 'tail_state.pickle'
+TAIL_VERSION = 1
+
+
+class TailState():
+    """Where a log file was last parsed up to and what was found before it.
+
+    Only the prefix up to `offset` is trusted. It always ends on a complete
+    line and never contains an open-ended entry, whose stop time moves with
+    the clock and so has to be parsed again on every run.
+    """
+
+    def __init__(self,
+                 filename: str,
+                 date: dt.date,
+                 offset: int = 0,
+                 prefix_crc: int = 0,
+                 blips: list | None = None,
+                 purgatory: tuple | None = None):
+        """Record the resume point of a single log file."""
+        self.filename = filename
+        self.date = date
+        self.offset = offset
+        self.prefix_crc = prefix_crc
+        self.blips = blips if blips else list()
+        self.purgatory = purgatory
+
+    def matches(self, filename: str, date: dt.date, data: bytes) -> bool:
+        """Check that the saved prefix is still at the head of the file."""
+        return (self.filename == filename
+                and self.date == date
+                and self.offset <= len(data)
+                and zlib.crc32(data[:self.offset]) == self.prefix_crc)
+
+    def resume(self) -> LogParser:
+        """Rebuild the parser as it was at the saved offset."""
+        blob = TimeBlob([TimeBlip(*fields) for fields in self.blips])
+        purgatory_blip = None
+        if self.purgatory:
+            purgatory_blip = TimeBlip(*self.purgatory)
+
+        return LogParser(self.date, blob, purgatory_blip)
+
+    def checkpoint(self,
+                   data: bytes,
+                   offset: int,
+                   blips: list,
+                   purgatory_blip: TimeBlip | None):
+        """Move the resume point to offset with the parser state found there."""
+        self.offset = offset
+        self.prefix_crc = zlib.crc32(data[:offset])
+        self.blips = [(blip.start, blip.stop, blip.desc, blip.tag)
+                      for blip in blips]
+        self.purgatory = None
+        if purgatory_blip:
+            self.purgatory = (purgatory_blip.start, purgatory_blip.stop)
+
+
+def load_state(state_path: str) -> TailState | None:
+    """Read a saved TailState, or None if there is no usable one."""
+    saved = load_versioned(state_path, TAIL_VERSION)
+    if saved and isinstance(saved[0], TailState):
+        return saved[0]
+    return None
+
+
+def tail_2_blob(filename: str,
+                date: dt.date,
+                state_path: str | None = None) -> TimeBlob:
+    """Scan a log file, only parsing lines appended since the last call.
+
+    Falls back to a full parse whenever the previously parsed prefix of the
+    file has been edited.
+    """
+    state_path = state_path or f'{beget_cache_dir()}/{TAIL_FILE}'
+
+    with open(filename, 'rb') as log:
+        data = log.read()
+
+    state = load_state(state_path)
+    if state is None or not state.matches(filename, date, data):
+        state = TailState(filename, date)
+    parser = state.resume()
+
+    # Parse the tail, remembering the last line boundary that is settled
+    safe = True
+    offset = state.offset
+    safe_offset = state.offset
+    safe_count = len(parser.blob.blip_list)
+    safe_purgatory = parser.purgatory_blip
+    for raw_line in data[state.offset:].splitlines(keepends=True):
+        offset += len(raw_line)
+        complete = raw_line.endswith(b'\n')
+        # Mirror the universal newlines of text mode used by log_2_blob
+        line = raw_line.decode().rstrip('\r\n') + ('\n' if complete else '')
+
+        if parser.feed(line):
+            safe = False
+        if safe and complete:
+            safe_offset = offset
+            safe_count = len(parser.blob.blip_list)
+            safe_purgatory = parser.purgatory_blip
+
+    if safe_offset != state.offset:
+        state.checkpoint(data, safe_offset,
+                         parser.blob.blip_list[:safe_count], safe_purgatory)
+        save_versioned(state_path, TAIL_VERSION, state)
+
+    return parser.blob
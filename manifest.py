@@ -0,0 +1,114 @@
+"""Remember which log files exist so that queries need not list the tree."""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import time
+from typing import Dict, Tuple
+
+from util import (beget_cache_dir, beget_folder, load_versioned, month_range,
+                  save_versioned, scan_folder)
+
+MANIFEST_FILE = 'log_manifest.pickle'
+MANIFEST_VERSION = 1
+RACY_SECONDS = 2  # Folders changed this recently may change again unseen
+
+
+def folder_mtime(folder: str) -> int | None:
+    """Return the mtime of a folder, or None if it does not exist."""
+    try:
+        return os.stat(folder).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+class LogManifest():
+    """A map of date to log file path, mtime and size, kept on disk.
+
+    Creating, removing or renaming a log file changes the mtime of its month
+    folder, and adding a month folder changes the mtime of its year folder,
+    so only folders whose mtime moved are listed again. Editing a log file
+    in place does not, which is why readers still stat the files they parse.
+    """
+
+    def __init__(self, manifest_path: str | None = None):
+        """Load any existing manifest file from disk."""
+        self.manifest_path = \
+            manifest_path or f'{beget_cache_dir()}/{MANIFEST_FILE}'
+        # Folder path to its mtime when last listed, None if it was missing
+        self.folders: Dict[str, int | None] = dict()
+        self.logs: Dict[dt.date, Tuple[str, int, int]] = dict()
+        self.dirty = False
+        self.rescans = 0
+
+        self.load()
+
+    def load(self):
+        """Read the manifest file, silently starting fresh if it is unusable."""
+        saved = load_versioned(self.manifest_path, MANIFEST_VERSION)
+        if saved and len(saved) == 2 \
+                and all(isinstance(part, dict) for part in saved):
+            self.folders, self.logs = saved
+
+    def save(self) -> bool:
+        """Write the manifest back to disk if anything changed."""
+        if not self.dirty:
+            return True
+
+        saved = save_versioned(self.manifest_path, MANIFEST_VERSION,
+                               self.folders, self.logs)
+        self.dirty = not saved
+        return saved
+
+    def changed(self, folder: str) -> bool:
+        """Return whether a folder differs from when it was last listed."""
+        mtime = folder_mtime(folder)
+        if folder in self.folders and self.folders[folder] == mtime:
+            return False
+
+        if mtime is not None and mtime > time.time_ns() - RACY_SECONDS * 10**9:
+            # Listed too soon after a change to trust the mtime next time
+            self.folders.pop(folder, None)
+        else:
+            self.folders[folder] = mtime
+        self.dirty = True
+        return True
+
+    def rescan(self, month_date: dt.date):
+        """List a month folder again, replacing what was known of it."""
+        self.rescans += 1
+        for date in [date for date in self.logs
+                     if (date.year, date.month) ==
+                     (month_date.year, month_date.month)]:
+            del self.logs[date]
+
+        for date, entry in scan_folder(month_date).items():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            self.logs[date] = (entry.path, stat.st_mtime_ns, stat.st_size)
+
+    def lookup(self,
+               start_date: dt.date,
+               end_date: dt.date) -> Dict[dt.date, Tuple[str, int, int]]:
+        """Return the known log files in a date range [inclusive].
+
+        Costs one stat per year folder and per existing month folder in the
+        range; month folders missing from an unchanged year are not checked.
+        """
+        year_changed: Dict[int, bool] = dict()
+        for month_date in month_range(start_date, end_date):
+            folder = beget_folder(month_date)
+            if month_date.year not in year_changed:
+                year_changed[month_date.year] = \
+                    self.changed(os.path.dirname(folder))
+
+            if not year_changed[month_date.year] \
+                    and folder in self.folders and self.folders[folder] is None:
+                continue
+            if self.changed(folder):
+                self.rescan(month_date)
+
+        return {date: log for date, log in sorted(self.logs.items())
+                if start_date <= date <= end_date}
@@ -0,0 +1,289 @@
+"""Total the blips of a blob with vectorized NumPy, when it is installed.
+
+NumPy is an optional extra. Without it every function here answers through
+the pure Python aggregators, so callers need not care which backend runs.
+The columns of a TimeBlob are built once and kept with the blob until its
+blips change, so repeated totals and views over one load share them.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from operator import attrgetter
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+import aggregate
+import pivot
+from pivot import PivotTable
+from timeblob import MINUTES_IN_DAY, TAG_TABLE, TimeBlob
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MICROSECOND = dt.timedelta(microseconds=1)
+MICROS_IN_MINUTE = 60 * 1000 * 1000
+
+
+class BlobArrays():
+    """The blips of a blob as parallel int64 NumPy arrays.
+
+    Each blip is a row across start and stop in epoch minutes, date ordinal,
+    TAG_TABLE tag id and duration in microseconds. Durations follow
+    TimeBlip.tdelta, wrapping spans past noon the same way, and blips that
+    whole minutes cannot hold (open-ended entries stopped at the current
+    second) take their duration from the blip itself, so totals stay exact.
+    """
+
+    def __init__(self, starts, stops, ordinals, tag_ids, micros):
+        """Hold already built columns; see from_blob."""
+        self.starts = starts
+        self.stops = stops
+        self.ordinals = ordinals
+        self.tag_ids = tag_ids
+        self.micros = micros
+
+    @classmethod
+    def from_blob(cls, blob: TimeBlob) -> BlobArrays:
+        """Convert the blips of any TimeBlob into columns."""
+        blips = blob.blip_list
+        count = len(blips)
+
+        def column(name: str):
+            return np.fromiter(map(attrgetter(name), blips), np.int64, count)
+
+        ordinals = column('ordinal')
+        midnights = ordinals * MINUTES_IN_DAY
+        starts = midnights + column('begin')
+        stops = midnights + column('end')
+        spans = stops - starts
+        # Spans running backwards are read on a 12 hour clock, as tdelta does
+        spans = np.where(spans < 0,
+                         spans % MINUTES_IN_DAY - MINUTES_IN_DAY // 2, spans)
+        micros = spans * MICROS_IN_MINUTE
+        exact = {row: blip.tdelta // MICROSECOND
+                 for row, blip in enumerate(blips) if not blip.in_minutes}
+        if exact:
+            micros[list(exact)] = list(exact.values())
+
+        return cls(starts, stops, ordinals, column('tag_id'), micros)
+
+    def __len__(self) -> int:
+        """Return the number of blips held."""
+        return len(self.micros)
+
+    def _take(self, mask) -> BlobArrays:
+        """Return the rows selected by a boolean mask."""
+        return BlobArrays(self.starts[mask], self.stops[mask],
+                          self.ordinals[mask], self.tag_ids[mask],
+                          self.micros[mask])
+
+    def _sum_by(self, codes, group_count: int, micros=None) -> List[int]:
+        """Sum the durations of each group code; return microseconds."""
+        sums = np.zeros(group_count, dtype=np.int64)
+        np.add.at(sums, codes, self.micros if micros is None else micros)
+        return sums.tolist()
+
+    @property
+    def blob_total(self) -> dt.timedelta:
+        """Return the total of all blips."""
+        return dt.timedelta(microseconds=int(self.micros.sum()))
+
+    @property
+    def date_set(self) -> Set[dt.date]:
+        """Return the set of dates with at least one blip."""
+        return {dt.date.fromordinal(ordinal)
+                for ordinal in np.unique(self.ordinals).tolist()}
+
+    def filter_by(self, tags: List[str]) -> BlobArrays:
+        """Return the rows of only certain tags."""
+        wanted = [TAG_TABLE.ids[tag] for tag in tags if tag in TAG_TABLE.ids]
+        return self._take(np.isin(self.tag_ids, wanted))
+
+    def sub_blob(self,
+                 start_date: dt.date,
+                 end_date: dt.date = None) -> BlobArrays:
+        """Return the rows in a date range [inclusive]."""
+        # Return a single day's rows if only one arg is given
+        end_date = end_date or start_date
+        return self._take((self.ordinals >= start_date.toordinal())
+                          & (self.ordinals <= end_date.toordinal()))
+
+    def day_totals(self) -> Dict[dt.date, dt.timedelta]:
+        """Return the summed duration of the blips on each date."""
+        ordinals, codes = np.unique(self.ordinals, return_inverse=True)
+        return {dt.date.fromordinal(ordinal): dt.timedelta(microseconds=total)
+                for ordinal, total in zip(ordinals.tolist(),
+                                          self._sum_by(codes, len(ordinals)))}
+
+    def tag_totals(self) -> Dict[str, dt.timedelta]:
+        """Return the summed duration of the blips of each tag."""
+        counts = np.bincount(self.tag_ids).tolist()
+        return {TAG_TABLE[tag_id]: dt.timedelta(microseconds=total)
+                for tag_id, total in enumerate(self._sum_by(self.tag_ids,
+                                                            len(counts)))
+                if counts[tag_id]}
+
+    def week_totals(self) -> Dict[Tuple[int, int], dt.timedelta]:
+        """Return the summed duration of the blips in each (ISO year, week)."""
+        ordinals, codes = np.unique(self.ordinals, return_inverse=True)
+        # Only the distinct dates need a calendar lookup
+        weeks: Dict[Tuple[int, int], int] = dict()
+        week_codes = np.array(
+            [weeks.setdefault(tuple(dt.date.fromordinal(ordinal)
+                                    .isocalendar())[:2], len(weeks))
+             for ordinal in ordinals.tolist()], dtype=np.int64)
+        return {week: dt.timedelta(microseconds=total)
+                for week, total in zip(weeks, self._sum_by(week_codes[codes],
+                                                           len(weeks)))}
+
+    def pivot(self, groups: List[List[str]] | None = None) -> PivotTable:
+        """Return a PivotTable built from the totals per (date, tag)."""
+        tables = self._tables(groups, lambda date: None)
+        return tables[None] if tables else PivotTable(groups)
+
+    def week_tables(self, groups: List[List[str]] | None = None
+                    ) -> Dict[Tuple[int, int], PivotTable]:
+        """Return a PivotTable per (ISO year, week), as pivot.week_tables."""
+        return self._tables(groups,
+                            lambda date: tuple(date.isocalendar())[:2])
+
+    def _tables(self,
+                groups: List[List[str]] | None,
+                key_of: Callable[[dt.date], Hashable]
+                ) -> Dict[Hashable, PivotTable]:
+        """Fill a PivotTable per key of the dates, in date order.
+
+        Every cell, row, column and table total is summed in NumPy, so
+        Python only touches each distinct total once.
+        """
+        ordinals, date_codes = np.unique(self.ordinals, return_inverse=True)
+        dates = [dt.date.fromordinal(ordinal) for ordinal in ordinals.tolist()]
+        keys = [key_of(date) for date in dates]
+        tables = {key: PivotTable(groups) for key in keys}
+        if not tables:
+            return tables
+        key_index = {key: code for code, key in enumerate(tables)}
+        key_codes = np.array([key_index[key] for key in keys], dtype=np.int64)
+        tables_by_code = list(tables.values())
+
+        # Tags become the labels of their groups before any summing
+        label_of = tables_by_code[0].label_of
+        tag_ids, tag_codes = np.unique(self.tag_ids, return_inverse=True)
+        tags = [TAG_TABLE[tag_id] for tag_id in tag_ids.tolist()]
+        labels = list(dict.fromkeys(label_of.get(tag, tag) for tag in tags))
+        label_index = {label: code for code, label in enumerate(labels)}
+        label_codes = np.array([label_index[label_of.get(tag, tag)]
+                                for tag in tags], dtype=np.int64)[tag_codes]
+
+        # Totals per (date, label) cell, then per table row from the cells
+        cells, cell_codes = np.unique(date_codes * len(labels) + label_codes,
+                                      return_inverse=True)
+        cell_sums = np.zeros(len(cells), dtype=np.int64)
+        np.add.at(cell_sums, cell_codes, self.micros)
+        cell_dates, cell_labels = np.divmod(cells, len(labels))
+        rows, row_codes = np.unique(key_codes[cell_dates] * len(labels)
+                                    + cell_labels, return_inverse=True)
+        row_sums = self._sum_by(row_codes, len(rows), cell_sums)
+        date_sums = self._sum_by(date_codes, len(dates))
+        key_sums = self._sum_by(key_codes, len(tables), np.array(date_sums))
+        cell_sums = cell_sums.tolist()
+        table_of_date = [tables_by_code[code] for code in key_codes.tolist()]
+
+        spans = {micros: dt.timedelta(microseconds=micros)
+                 for micros in {*cell_sums, *row_sums, *date_sums, *key_sums}}
+        for date_code, label_code, micros in zip(cell_dates.tolist(),
+                                                 cell_labels.tolist(),
+                                                 cell_sums):
+            table_of_date[date_code].cells[
+                labels[label_code], dates[date_code]] = spans[micros]
+        for row, micros in zip(rows.tolist(), row_sums):
+            key_code, label_code = divmod(row, len(labels))
+            tables_by_code[key_code].row_totals[labels[label_code]] = \
+                spans[micros]
+        for table, date, micros in zip(table_of_date, dates, date_sums):
+            table.col_totals[date] = spans[micros]
+        for table, micros in zip(tables_by_code, key_sums):
+            table.blob_total = spans[micros]
+        for tag_row in np.unique(key_codes[date_codes] * len(tags)
+                                 + tag_codes).tolist():
+            key_code, tag_code = divmod(tag_row, len(tags))
+            tables_by_code[key_code].tag_set.add(tags[tag_code])
+
+        return tables
+
+
+def blob_arrays(blob: TimeBlob | BlobArrays) -> BlobArrays:
+    """Return the columns of a blob, kept with it until its blips change."""
+    if isinstance(blob, BlobArrays):
+        return blob
+
+    return blob.derived(BlobArrays.from_blob)
+
+
+def _blips(blob: TimeBlob, tags: List[str] | None):
+    """Return the blips of a blob, of only certain tags if provided."""
+    return (blob.filter_by(tags) if tags else blob).blip_list
+
+
+def _arrays(blob: TimeBlob | BlobArrays,
+            tags: List[str] | None) -> BlobArrays:
+    """Return the columns of a blob, of only certain tags if provided."""
+    arrays = blob_arrays(blob)
+    return arrays.filter_by(tags) if tags else arrays
+
+
+def total_time(blob: TimeBlob | BlobArrays,
+               tags: List[str] | None = None) -> dt.timedelta:
+    """Return the summed duration of a blob's blips."""
+    if np is None:
+        return aggregate.total_time(_blips(blob, tags))
+
+    return _arrays(blob, tags).blob_total
+
+
+def day_totals(blob: TimeBlob | BlobArrays,
+               tags: List[str] | None = None) -> Dict[dt.date, dt.timedelta]:
+    """Return the summed duration of a blob's blips on each date."""
+    if np is None:
+        return aggregate.day_totals(_blips(blob, tags))
+
+    return _arrays(blob, tags).day_totals()
+
+
+def tag_totals(blob: TimeBlob | BlobArrays,
+               tags: List[str] | None = None) -> Dict[str, dt.timedelta]:
+    """Return the summed duration of a blob's blips of each tag."""
+    if np is None:
+        return aggregate.tag_totals(_blips(blob, tags))
+
+    return _arrays(blob, tags).tag_totals()
+
+
+def week_totals(blob: TimeBlob | BlobArrays,
+                tags: List[str] | None = None
+                ) -> Dict[Tuple[int, int], dt.timedelta]:
+    """Return the summed duration of a blob's blips in each ISO week."""
+    if np is None:
+        return aggregate.week_totals(_blips(blob, tags))
+
+    return _arrays(blob, tags).week_totals()
+
+
+def pivot_table(blob: TimeBlob | BlobArrays,
+                groups: List[List[str]] | None = None) -> PivotTable:
+    """Return the PivotTable of a blob, as the daptiv views print it."""
+    if np is None:
+        return PivotTable.from_blips(blob.blip_list, groups)
+
+    return blob_arrays(blob).pivot(groups)
+
+
+def week_tables(blob: TimeBlob | BlobArrays,
+                groups: List[List[str]] | None = None
+                ) -> Dict[Tuple[int, int], PivotTable]:
+    """Return a PivotTable per ISO week of a blob, as daptiv_format does."""
+    if np is None:
+        return pivot.week_tables(blob.blip_list, groups)
+
+    return blob_arrays(blob).week_tables(groups)
@@ -0,0 +1,138 @@
+"""Persist parsed log files between runs of daysum."""
+from __future__ import annotations
+
+import datetime as dt
+import errno
+import os
+import threading
+from typing import Dict, Set
+
+from logfile import log_2_blob
+from timeblob import TimeBlip, TimeBlob
+from util import (beget_cache_dir, is_current, is_settled, load_versioned,
+                  save_versioned, stat_signature)
+
+CACHE_FOLDER = 'parse_cache'
+CACHE_VERSION = 3
+MAX_SHARDS = 192  # About sixteen years of months
+
+
+class ParseCache():
+    """A cache of parsed log files, keyed by path, mtime and size.
+
+    Entries are kept in one shard file per month of log dates, read only
+    when a file of that month is asked for and written back only when it
+    changed, so a query pays for the months it covers rather than for the
+    whole cache. The least recently used shards are dropped past
+    max_shards.
+
+    Entries hold plain (start, stop, desc, tag) tuples rather than TimeBlips
+    so the cache files do not depend on the layout of the blob classes.
+    Only files of settled dates are stored.
+    """
+
+    def __init__(self,
+                 cache_dir: str | None = None,
+                 max_shards: int = MAX_SHARDS):
+        """Point at a cache folder; shards are loaded as they are needed."""
+        self.cache_dir = cache_dir or f'{beget_cache_dir()}/{CACHE_FOLDER}'
+        self.max_shards = max_shards
+        self.shards: Dict[str, Dict] = dict()
+        self.dirty: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        # get_blob may be called from several loader threads at once
+        self.lock = threading.Lock()
+
+    def shard_path(self, shard: str) -> str:
+        """Generate the path of a month's shard file."""
+        return f'{self.cache_dir}/{shard}.pickle'
+
+    def load(self, shard: str) -> Dict:
+        """Read a shard file, silently starting it fresh if it is unusable."""
+        saved = load_versioned(self.shard_path(shard), CACHE_VERSION)
+        if saved and isinstance(saved[0], dict):
+            return saved[0]
+        return dict()
+
+    def save(self) -> bool:
+        """Write back the shards that changed and refresh the ones used."""
+        with self.lock:
+            # Copied so loader threads may keep adding entries while saving
+            dirty = {shard: dict(self.shards[shard]) for shard in self.dirty}
+            used = set(self.shards) - set(dirty)
+
+        if dirty:
+            # write_atomic only makes the shard folder, so make its parent
+            # too; a missing LOG_PATH still makes this fail
+            try:
+                os.mkdir(os.path.dirname(self.cache_dir))
+            except OSError:
+                pass
+
+        saved = True
+        for shard, entries in dirty.items():
+            if save_versioned(self.shard_path(shard), CACHE_VERSION, entries):
+                self.dirty.discard(shard)
+            else:
+                saved = False
+
+        # Shards read from are touched, so mtimes order them by last use
+        for shard in used:
+            try:
+                os.utime(self.shard_path(shard))
+            except OSError:
+                pass
+
+        if dirty and saved:
+            self.evict()
+        return saved
+
+    def evict(self):
+        """Delete the least recently used shards to honor the size bound."""
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                shards = [(entry.stat().st_mtime_ns, entry.path)
+                          for entry in entries
+                          if entry.name.endswith('.pickle')]
+        except OSError:
+            return
+
+        shards.sort()
+        for _, path in shards[:max(len(shards) - self.max_shards, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_blob(self, file_path: str, date: dt.date) -> TimeBlob:
+        """Return the blob for a log file, parsing it only if it changed."""
+        signature = stat_signature(file_path)
+        if signature is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT),
+                                    file_path)
+        shard = f'{date.year}-{date.month:02}'
+
+        with self.lock:
+            entries = self.shards.get(shard)
+            if entries is None:
+                entries = self.shards[shard] = self.load(shard)
+            entry = entries.get(file_path)
+            hit = entry is not None and entry[1] == date \
+                and is_current(date, signature, entry[0])
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            return TimeBlob([TimeBlip(*fields) for fields in entry[2]])
+
+        blob = log_2_blob(file_path, date)
+        if is_settled(date):
+            fields = [(blip.start, blip.stop, blip.desc, blip.tag)
+                      for blip in blob.blip_list]
+            with self.lock:
+                entries[file_path] = (signature, date, fields)
+                self.dirty.add(shard)
+
+        return blob
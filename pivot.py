@@ -0,0 +1,128 @@
+"""Aggregate blips into a tag group by date table in a single pass."""
+from __future__ import annotations
+
+import datetime as dt
+from typing import Dict, Iterable, List, Set, Tuple
+
+from timeblob import HOURS_IN_WDAY, SECONDS_IN_HOUR, TimeBlip
+
+
+def apply_tag_groups(singelton_tags: List[str],
+                     groups: List[List[str]] | None) -> List[List[str]]:
+    """Change a list of tags to a list of grouped tags."""
+    if groups:
+        # Strip tags in groups from singelton list
+        for group in groups:
+            for tag in group:
+                if tag in singelton_tags:
+                    singelton_tags.remove(tag)
+        # Merge singelton and grouped tags for printing structure
+        tag_groups = [[tag] for tag in singelton_tags] + groups
+    else:
+        tag_groups = [[tag] for tag in singelton_tags]
+
+    return sorted(tag_groups)
+
+
+class PivotTable():
+    """Durations of each tag group on each date, with row and column totals.
+
+    Rows are labelled by the first tag of their group, as the views print
+    them. A cell exists for every (label, date) that has at least one blip,
+    even if the blips add up to zero.
+    """
+
+    def __init__(self,
+                 groups: List[List[str]] | None = None,
+                 keep_descs: bool = False):
+        """Create an empty table for the provided tag groups."""
+        self.groups = groups if groups else list()
+        self.label_of: Dict[str, str] = {tag: group[0]
+                                         for group in self.groups
+                                         for tag in group}
+        self.cells: Dict[Tuple[str, dt.date], dt.timedelta] = dict()
+        self.row_totals: Dict[str, dt.timedelta] = dict()
+        self.col_totals: Dict[dt.date, dt.timedelta] = dict()
+        self.blob_total = dt.timedelta()
+        self.tag_set: Set[str] = set()
+        self.descs: Dict[str, Set[str]] | None = \
+            dict() if keep_descs else None
+
+    @classmethod
+    def from_blips(cls,
+                   blips: Iterable[TimeBlip],
+                   groups: List[List[str]] | None = None,
+                   keep_descs: bool = False) -> PivotTable:
+        """Build a table from one pass over the blips."""
+        table = cls(groups, keep_descs)
+        for blip in blips:
+            table.add(blip)
+
+        return table
+
+    def add(self, blip: TimeBlip):
+        """Fold a single blip into the table."""
+        label = self.add_total(blip.date, blip.tag, blip.tdelta)
+
+        if self.descs is not None:
+            # Keep the text after the tag, as the verbose daptiv view shows
+            descs = self.descs.setdefault(label, set())
+            if len(blip.desc) > len(blip.tag) + 1:
+                descs.add(blip.desc[len(blip.tag) + 1:])
+
+    def add_total(self, date: dt.date, tag: str, tdelta: dt.timedelta) -> str:
+        """Fold time of one tag on one date into the table; return its label."""
+        label = self.label_of.get(tag, tag)
+
+        self.tag_set.add(tag)
+        self.cells[label, date] = \
+            self.cells.get((label, date), dt.timedelta()) + tdelta
+        self.row_totals[label] = \
+            self.row_totals.get(label, dt.timedelta()) + tdelta
+        self.col_totals[date] = \
+            self.col_totals.get(date, dt.timedelta()) + tdelta
+        self.blob_total += tdelta
+
+        return label
+
+    @property
+    def date_set(self) -> Set[dt.date]:
+        """Return the set of dates with at least one blip."""
+        return set(self.col_totals)
+
+    @property
+    def total_work_days(self) -> float:
+        """Return the blob_total in work days."""
+        return (self.blob_total.total_seconds() / SECONDS_IN_HOUR) \
+            / HOURS_IN_WDAY
+
+    @property
+    def rows(self) -> List[List[str]]:
+        """Return the tag groups of the table, sorted as the views print them.
+
+        Groups without a blip in the table get no row, so a week missing
+        every tag of a group still prints.
+        """
+        groups = [group for group in self.groups
+                  if not self.tag_set.isdisjoint(group)]
+        return apply_tag_groups(list(self.tag_set), groups)
+
+
+def week_tables(blips: Iterable[TimeBlip],
+                groups: List[List[str]] | None = None,
+                keep_descs: bool = False
+                ) -> Dict[Tuple[int, int], PivotTable]:
+    """Split blips into a table per (ISO year, week) in one pass; in order."""
+    tables: Dict[Tuple[int, int], PivotTable] = dict()
+    week_of: Dict[dt.date, Tuple[int, int]] = dict()
+    for blip in blips:
+        date = blip.date
+        week = week_of.get(date)
+        if week is None:
+            week = week_of[date] = tuple(date.isocalendar())[:2]
+        table = tables.get(week)
+        if table is None:
+            table = tables[week] = PivotTable(groups, keep_descs)
+        table.add(blip)
+
+    return dict(sorted(tables.items()))
@@ -8,8 +8,6 @@ import datetime as dt
 import shutil
 import sys
 
-import progressbar
-
 PHOENIX_TZ = dt.timezone(dt.timedelta(hours=-7), name='Phoenix')
 START_OF_DAY = [9, 30, 0, 0, PHOENIX_TZ]
 
@@ -20,8 +18,15 @@ UNITS_PER_DAY = 8 * 4
 ENCLOSING_BAR_CHARS = 2
 
 
-def probar(expected, done, total):
-    """Print a progress bar denoting work done, expected, and total hours."""
+def probar(expected, done, total, fd=None):
+    """Print a progress bar denoting work done, expected, and total hours.
+
+    The bar goes to stderr unless another stream is given in fd, which is
+    then treated as a terminal.
+    """
+    # Only the full bar needs progressbar; keep it off the import path
+    import progressbar
+
     expected = int(expected)
     done = int(done)
     total = int(total)
@@ -57,9 +62,13 @@ def probar(expected, done, total):
 
     bar_width = terminal_width if bar_width > terminal_width else bar_width
 
+    stream_args = dict()
+    if fd is not None:
+        stream_args = dict(fd=fd, is_terminal=True)
+
     p_bar = progressbar.ProgressBar(widgets=widgets, max_value=10,
                                     term_width=bar_width,
-                                    suffix=suffix).start()
+                                    suffix=suffix, **stream_args).start()
     p_bar.update(amounts=amounts, force=True)
 
 
@@ -0,0 +1,139 @@
+"""Keep per-day, per-tag totals of the log tree so views can skip parsing."""
+from __future__ import annotations
+
+import datetime as dt
+from itertools import groupby
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
+
+from pivot import PivotTable
+from util import (beget_cache_dir, is_current, load_versioned, save_versioned,
+                  stat_signature)
+
+if TYPE_CHECKING:
+    from manifest import LogManifest
+    from timeblob import TimeBlob
+
+ROLLUP_FILE = 'rollups.pickle'
+ROLLUP_VERSION = 1
+
+
+class RollupStore():
+    """Totals per (date, tag), refreshed only for days whose file changed.
+
+    Each day keeps the stat_signature of its log file with its totals, and
+    days that are not settled are totalled again on every refresh. ISO week
+    and month totals are derived from the days.
+    """
+
+    def __init__(self, rollup_path: str | None = None):
+        """Load any existing rollup file from disk."""
+        self.rollup_path = rollup_path or f'{beget_cache_dir()}/{ROLLUP_FILE}'
+        self.days: Dict[dt.date,
+                        Tuple[Tuple[int, int], Dict[str, dt.timedelta]]] = \
+            dict()
+        self.dirty = False
+        self.parsed = 0
+
+        self.load()
+
+    def load(self):
+        """Read the rollup file, silently starting fresh if it is unusable."""
+        saved = load_versioned(self.rollup_path, ROLLUP_VERSION)
+        if saved and isinstance(saved[0], dict):
+            self.days = saved[0]
+
+    def save(self) -> bool:
+        """Write the rollups back to disk if anything changed."""
+        if not self.dirty:
+            return True
+
+        saved = save_versioned(self.rollup_path, ROLLUP_VERSION, self.days)
+        self.dirty = not saved
+        return saved
+
+    def refresh(self,
+                start_date: dt.date,
+                end_date: dt.date,
+                manifest: LogManifest | None = None,
+                load: Callable[[List[dt.date]], TimeBlob] | None = None
+                ) -> int:
+        """Bring a date range [inclusive] up to date; return days loaded.
+
+        The days that changed are loaded a year at a time with load, by
+        default daysum.blobify_dates, so they come from the yearly archives
+        and parse cache where those are current and are parsed on its
+        thread pool otherwise.
+        """
+        if manifest is None:
+            from manifest import LogManifest
+            manifest = LogManifest()
+        if load is None:
+            # Imported here since daysum builds on this module
+            from daysum import blobify_dates
+
+            def load(date_list: List[dt.date]) -> TimeBlob:
+                return blobify_dates(date_list, manifest=manifest)
+
+        found = manifest.lookup(start_date, end_date)
+        manifest.save()
+
+        for date in [date for date in self.days
+                     if start_date <= date <= end_date and date not in found]:
+            del self.days[date]
+            self.dirty = True
+
+        stale: Dict[dt.date, Tuple[int, int]] = dict()
+        for date, (file_path, _, _) in found.items():
+            signature = stat_signature(file_path)
+            if signature is None:
+                self.days.pop(date, None)
+                self.dirty = True
+                continue
+            entry = self.days.get(date)
+            if entry is None or not is_current(date, signature, entry[0]):
+                stale[date] = signature
+
+        self.parsed = len(stale)
+        for _, dates in groupby(sorted(stale), key=lambda date: date.year):
+            days: Dict[dt.date, Dict[str, dt.timedelta]] = dict()
+            for date in dates:
+                days[date] = dict()
+            for blip in load(list(days)).blip_list:
+                totals = days[blip.date]
+                totals[blip.tag] = \
+                    totals.get(blip.tag, dt.timedelta()) + blip.tdelta
+            for date, totals in days.items():
+                self.days[date] = (stale[date], totals)
+            self.dirty = True
+
+        return self.parsed
+
+    def table(self,
+              date_list: Iterable[dt.date],
+              groups: List[List[str]] | None = None) -> PivotTable:
+        """Return a PivotTable of the provided dates, built from the totals."""
+        table = PivotTable(groups)
+        for date in sorted(set(date_list)):
+            if date in self.days:
+                for tag, tdelta in self.days[date][1].items():
+                    table.add_total(date, tag, tdelta)
+
+        return table
+
+    def week_totals(self) -> Dict[Tuple[int, int], Dict[str, dt.timedelta]]:
+        """Return the totals per tag of each (ISO year, week)."""
+        return self._fold(lambda date: tuple(date.isocalendar())[:2])
+
+    def month_totals(self) -> Dict[Tuple[int, int], Dict[str, dt.timedelta]]:
+        """Return the totals per tag of each (year, month)."""
+        return self._fold(lambda date: (date.year, date.month))
+
+    def _fold(self, period_of) -> Dict[tuple, Dict[str, dt.timedelta]]:
+        """Sum the day totals of each tag into the periods of their dates."""
+        periods: Dict[tuple, Dict[str, dt.timedelta]] = dict()
+        for date, (_, totals) in sorted(self.days.items()):
+            period = periods.setdefault(period_of(date), dict())
+            for tag, tdelta in totals.items():
+                period[tag] = period.get(tag, dt.timedelta()) + tdelta
+
+        return periods
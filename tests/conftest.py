@@ -8,6 +8,8 @@ import pytest
 # Make the repo root importable so tests can import daylog modules directly
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import util  # noqa: E402
+
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
 SAMPLE_LOG = os.path.join(FIXTURES_DIR, 'sample.txt')
 
@@ -23,3 +25,29 @@ def sample_log_path():
 @pytest.fixture
 def sample_date():
     return SAMPLE_DATE
+
+
+@pytest.fixture
+def log_root(tmp_path, monkeypatch):
+    """Point LOG_PATH at an empty temporary log tree.
+
+    Modules that need logs in it override this fixture, asking for it and
+    for write_log.
+    """
+    monkeypatch.setattr(util, 'LOG_PATH', str(tmp_path))
+    return tmp_path
+
+
+def _write_log(date, content='9-10\nbackend work\n'):
+    """Write the log file of a date under LOG_PATH; return its path."""
+    path = util.beget_filepath(date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as log:
+        log.write(content)
+    return path
+
+
+@pytest.fixture
+def write_log():
+    """Return a function writing the log file of a date, used with log_root."""
+    return _write_log
@@ -0,0 +1,107 @@
+"""Tests for streaming blips through iter_blips and the aggregators."""
+import datetime as dt
+import pytest
+
+import daysum
+import util
+from aggregate import day_totals, tag_totals, total_time, week_totals
+from logfile import iter_blips, log_2_blob
+from parsecache import ParseCache
+
+
+DATES = [dt.date(2024, 3, 1) + dt.timedelta(days=n) for n in range(14)]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for n, date in enumerate(DATES):
+        write_log(date, f'9-{10 + n % 3}\nbackend work\n13-14\nM+O sync\n')
+    return log_root
+
+
+@pytest.fixture
+def blob(log_root):
+    return daysum.blobify_dates(DATES, ParseCache(), jobs=1)
+
+
+def log_paths():
+    return [(util.beget_filepath(date), date) for date in DATES]
+
+
+# ---------------------------------------------------------------------------
+# iter_blips
+# ---------------------------------------------------------------------------
+
+class TestIterBlips:
+    def test_matches_blob(self, blob):
+        streamed = [(b.start, b.stop, b.desc, b.tag)
+                    for b in iter_blips(log_paths())]
+        assert streamed == [(b.start, b.stop, b.desc, b.tag)
+                            for b in blob.blip_list]
+
+    def test_is_lazy(self, log_root):
+        loaded = list()
+
+        def load(path, date):
+            loaded.append(date)
+            return log_2_blob(path, date)
+
+        blips = iter_blips(log_paths(), load=load)
+        next(blips)
+        assert loaded == [DATES[0]]
+
+    def test_dates_from_file_names(self, log_root, tmp_path):
+        path = tmp_path / '2024-03-05.txt'
+        path.write_text('9-10\nbackend work\n')
+        assert [b.date for b in iter_blips([str(path)])] == \
+            [dt.date(2024, 3, 5)]
+
+
+# ---------------------------------------------------------------------------
+# Aggregators
+# ---------------------------------------------------------------------------
+
+class TestAggregators:
+    def test_total(self, blob):
+        assert total_time(iter_blips(log_paths())) == blob.blob_total
+
+    def test_days(self, blob):
+        totals = day_totals(iter_blips(log_paths()))
+        assert totals == {date: blob.sub_blob(date).blob_total
+                          for date in blob.date_set}
+
+    def test_tags(self, blob):
+        assert tag_totals(iter_blips(log_paths())) == blob.get_tag_totals()
+
+    def test_weeks(self, blob):
+        totals = week_totals(iter_blips(log_paths()))
+        assert sorted(totals) == [(2024, 9), (2024, 10), (2024, 11)]
+        assert sum(totals.values(), dt.timedelta()) == blob.blob_total
+
+    def test_empty_stream(self):
+        assert total_time(iter([])) == dt.timedelta()
+        assert week_totals(iter([])) == {}
+
+
+# ---------------------------------------------------------------------------
+# Views over a stream
+# ---------------------------------------------------------------------------
+
+class TestStreamedViews:
+    def test_report_view_same_output(self, blob, capsys, monkeypatch):
+        monkeypatch.setattr(daysum, 'TODAY', DATES[-1])
+        # Compare what reaches the progress bar rather than its rendering
+        bars = list()
+        monkeypatch.setattr(daysum, 'probar',
+                            lambda *amounts, fd=None: bars.append(amounts))
+        daysum.report_view(blob)
+        from_blob = capsys.readouterr()
+        daysum.report_view(iter_blips(log_paths()))
+        assert capsys.readouterr() == from_blob
+        assert bars[0] == bars[1]
+
+    def test_tag_view_same_output(self, blob, capsys):
+        daysum.tag_view(blob, [['backend', 'M+O']])
+        from_blob = capsys.readouterr()
+        daysum.tag_view(iter_blips(log_paths()), [['backend', 'M+O']])
+        assert capsys.readouterr() == from_blob
@@ -0,0 +1,87 @@
+"""Tests for the yearly binary archive and its use by blobify_dates."""
+import datetime as dt
+import os
+import pytest
+
+import util
+from archive import YearArchive, beget_archive_path, build_archive
+from daysum import blobify_dates
+from logfile import log_2_blob
+from parsecache import ParseCache
+
+
+YEAR = 2023
+DATES = [dt.date(YEAR, 1, 2) + dt.timedelta(days=n) for n in range(0, 60, 3)]
+
+
+def fields(blob):
+    return [(b.start, b.stop, b.desc, b.tag) for b in blob.blip_list]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for n, date in enumerate(DATES):
+        write_log(date, f'9-{10 + n % 3}:15\nbackend work {n}\n'
+                        '1.5\nM+O sync\n13-\ncafé chat\n')
+    return log_root
+
+
+# ---------------------------------------------------------------------------
+# build_archive / YearArchive
+# ---------------------------------------------------------------------------
+
+class TestYearArchive:
+    def test_round_trip(self, log_root):
+        assert build_archive(YEAR) == len(DATES)
+        with YearArchive(YEAR) as archive:
+            for date in DATES:
+                path = util.beget_filepath(date)
+                assert fields(archive.day_blob(date, path)) == \
+                    fields(log_2_blob(path, date))
+            assert archive.hits == len(DATES)
+
+    def test_changed_source_is_stale(self, log_root, write_log):
+        build_archive(YEAR)
+        path = write_log(DATES[1], '9-17\nrewritten day\n')
+        with YearArchive(YEAR) as archive:
+            assert archive.day_blob(DATES[1], path) is None
+            assert archive.day_blob(DATES[2], util.beget_filepath(DATES[2]))
+
+    def test_unknown_day(self, log_root, write_log):
+        build_archive(YEAR)
+        date = dt.date(YEAR, 12, 1)
+        path = write_log(date, '9-10\nlate entry\n')
+        with YearArchive(YEAR) as archive:
+            assert archive.day_blob(date, path) is None
+
+    def test_missing_or_corrupt_archive(self, log_root):
+        path = util.beget_filepath(DATES[0])
+        assert YearArchive(YEAR).day_blob(DATES[0], path) is None
+
+        build_archive(YEAR)
+        with open(beget_archive_path(YEAR), 'r+b') as archive_file:
+            archive_file.truncate(40)
+        assert YearArchive(YEAR).day_blob(DATES[0], path) is None
+
+    def test_wrong_year(self, log_root):
+        build_archive(YEAR)
+        os.replace(beget_archive_path(YEAR), beget_archive_path(YEAR + 1))
+        assert YearArchive(YEAR + 1).days == {}
+
+
+# ---------------------------------------------------------------------------
+# blobify_dates
+# ---------------------------------------------------------------------------
+
+class TestBlobifyDatesArchive:
+    def test_archive_replaces_parsing(self, log_root, write_log):
+        expected = fields(blobify_dates(DATES, ParseCache(str(log_root / 'a')),
+                                        jobs=1))
+        build_archive(YEAR)
+        write_log(DATES[0], '9-12\nchanged since archiving\n')
+
+        cache = ParseCache(str(log_root / 'b'))
+        blob = blobify_dates(DATES, cache, jobs=4)
+        assert cache.misses == 1
+        assert fields(blob)[0][2] == 'changed since archiving'
+        assert fields(blob)[1:] == expected[3:]
@@ -0,0 +1,99 @@
+"""Tests for the SQLite blip index behind `dsum --query`."""
+import datetime as dt
+import os
+import pytest
+
+import util
+from blipdb import BlipIndex
+from daysum import blobify_dates
+from parsecache import ParseCache
+
+
+DATES = [dt.date(2023, 12, 25) + dt.timedelta(days=n) for n in range(14)]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for n, date in enumerate(DATES):
+        write_log(date, f'9-{10 + n % 3}\nbackend work\n13-14:30\nM+O sync\n')
+    return log_root
+
+
+@pytest.fixture
+def index(log_root):
+    with BlipIndex() as index:
+        index.refresh()
+        yield index
+
+
+# ---------------------------------------------------------------------------
+# refresh
+# ---------------------------------------------------------------------------
+
+class TestRefresh:
+    def test_only_changed_files_are_parsed(self, index, write_log):
+        assert index.refresh() == 0
+        write_log(DATES[3], '9-17\nfrontend work\n')
+        assert index.refresh() == 1
+        assert index.query(['tag'], since=DATES[3], until=DATES[3]) == \
+            [('frontend', 8.0)]
+
+    def test_changed_files_come_from_the_parse_cache(self, log_root,
+                                                     monkeypatch):
+        import parsecache
+        blobify_dates(DATES, jobs=1)
+
+        def parse(*args):
+            raise AssertionError('parsed a cached file')
+        monkeypatch.setattr(parsecache, 'log_2_blob', parse)
+        with BlipIndex() as index:
+            assert index.refresh() == len(DATES)
+            assert index.query(['day'])[0] == (DATES[0].isoformat(), 2.5)
+
+    def test_removed_files_are_dropped(self, index):
+        os.remove(util.beget_filepath(DATES[0]))
+        index.refresh()
+        assert index.query(['day'])[0][0] == DATES[1].isoformat()
+
+    def test_persists_between_runs(self, index):
+        with BlipIndex() as reopened:
+            assert reopened.refresh() == 0
+            assert reopened.query() == index.query()
+
+    def test_missing_log_path_is_not_created(self, tmp_path, monkeypatch):
+        missing = tmp_path / 'nowhere'
+        monkeypatch.setattr(util, 'LOG_PATH', str(missing))
+        with BlipIndex() as index:
+            assert index.refresh() == 0
+            assert index.query() == []
+        assert not missing.exists()
+
+
+# ---------------------------------------------------------------------------
+# query
+# ---------------------------------------------------------------------------
+
+class TestQuery:
+    def test_total_matches_blob(self, index):
+        blob = blobify_dates(DATES, ParseCache(), jobs=1)
+        [(hours,)] = index.query()
+        assert hours == blob.blob_total / dt.timedelta(hours=1)
+
+    def test_group_by_month_and_tag(self, index):
+        rows = index.query(['month', 'tag'])
+        assert [row[:2] for row in rows] == [
+            ('2023-12', 'M+O'), ('2023-12', 'backend'),
+            ('2024-01', 'M+O'), ('2024-01', 'backend')]
+        assert rows[0][2] == 7 * 1.5
+
+    def test_group_by_week_starts_monday(self, index):
+        weeks = [row[0] for row in index.query(['week'])]
+        assert weeks == ['2023-12-25', '2024-01-01']
+
+    def test_tag_and_date_filters(self, index):
+        [(hours,)] = index.query(tags=['M+O'], since=DATES[7])
+        assert hours == 7 * 1.5
+
+    def test_unknown_grouping(self, index):
+        with pytest.raises(ValueError):
+            index.query(['fortnight'])
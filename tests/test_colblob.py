@@ -0,0 +1,126 @@
+"""Tests that ColumnarTimeBlob behaves exactly like the list-backed TimeBlob."""
+import datetime as dt
+import pytest
+
+from colblob import ColumnarTimeBlob
+from logfile import log_2_blob
+from timeblob import TimeBlip, TimeBlob
+
+
+D1 = dt.date(2024, 3, 11)
+D2 = dt.date(2024, 3, 12)
+D3 = dt.date(2024, 3, 13)
+
+
+def make_blip(date, start, stop, desc):
+    """Build a tagged blip from (hour, minute[, second]) tuples."""
+    blip = TimeBlip(dt.datetime.combine(date, dt.time(*start)),
+                    dt.datetime.combine(date, dt.time(*stop)), desc)
+    blip.set_tag(TimeBlip.strip_tag(desc))
+    return blip
+
+
+def reference_blips():
+    return [
+        make_blip(D1, (9, 0), (10, 30), 'backend refactor'),
+        make_blip(D1, (11, 0), (1, 0), 'M+O wraps past noon'),
+        make_blip(D2, (9, 15), (9, 45, 30), 'frontend open ended'),
+        make_blip(D2, (13, 0), (15, 0), 'backend tests'),
+        make_blip(D3, (0, 0), (1, 30), 'code_review block'),
+    ]
+
+
+def summarize(blob):
+    return [(b.start, b.stop, b.desc, b.tag, b.tdelta, b.date)
+            for b in blob.blip_list]
+
+
+@pytest.fixture
+def pair():
+    """The same blips loaded into both storage engines."""
+    return TimeBlob(reference_blips()), ColumnarTimeBlob(reference_blips())
+
+
+class TestColumnarMatchesReference:
+    def test_blips_round_trip(self, pair):
+        ref, col = pair
+        assert summarize(col) == summarize(ref)
+
+    def test_aggregates(self, pair):
+        ref, col = pair
+        assert col.blob_total == ref.blob_total
+        assert col.total_work_days == ref.total_work_days
+        assert col.date_set == ref.date_set
+        assert col.tag_set == ref.tag_set
+        assert col.date_counts == ref.date_counts
+        assert col.tag_counts == ref.tag_counts
+
+    def test_sub_blob(self, pair):
+        ref, col = pair
+        for args in [(D1,), (D2,), (D1, D2), (D2, D3), (D3 + dt.timedelta(1),)]:
+            assert summarize(col.sub_blob(*args)) == \
+                summarize(ref.sub_blob(*args))
+            assert col.sub_blob(*args).tag_set == ref.sub_blob(*args).tag_set
+
+    def test_filter_by(self, pair):
+        ref, col = pair
+        for tags in [['backend'], ['backend', 'M+O'], ['absent']]:
+            assert summarize(col.filter_by(list(tags))) == \
+                summarize(ref.filter_by(list(tags)))
+
+    def test_addition(self, pair):
+        ref, col = pair
+        assert summarize(col + col) == summarize(ref + ref)
+        assert summarize(col + ref) == summarize(ref + ref)
+        assert isinstance(col + ref, ColumnarTimeBlob)
+
+    def test_sample_log(self, sample_log_path, sample_date):
+        ref = log_2_blob(sample_log_path, sample_date)
+        col = ColumnarTimeBlob.from_blob(ref)
+        assert summarize(col) == summarize(ref)
+        assert col.blob_total == ref.blob_total
+
+
+class TestColumnarStorage:
+    def test_whole_minute_blips_are_columns_only(self):
+        col = ColumnarTimeBlob([make_blip(D1, (9, 0), (10, 30), 'backend')])
+        assert not col.exact
+        assert list(col.durations) == [90]
+        assert list(col.ordinals) == [D1.toordinal()]
+
+    def test_inexact_blips_kept_verbatim(self, pair):
+        _, col = pair
+        assert sorted(col.exact) == [1, 2]
+
+    def test_views_are_detached(self, pair):
+        _, col = pair
+        col.blip_list[0].desc = 'changed'
+        assert col.blip_list[0].desc == 'backend refactor'
+
+    def test_empty_blob(self):
+        col = ColumnarTimeBlob()
+        assert col.blob_total == dt.timedelta(0)
+        assert col.date_set == set()
+        assert col.blip_list == ()
+
+    def test_blip_list_is_read_only(self, pair):
+        _, col = pair
+        with pytest.raises(AttributeError):
+            col.blip_list.append(make_blip(D3, (9, 0), (10, 0), 'late'))
+        col.add_blip(make_blip(D3, (9, 0), (10, 0), 'late'))
+        assert col.blip_list[-1].desc == 'late'
+
+    def test_inherited_methods_find_base_state(self, pair):
+        ref, col = pair
+        builds = list()
+
+        def rows(blob):
+            builds.append(blob.row_count)
+            return blob.row_count
+        assert col.derived(rows) == col.derived(rows) == len(ref.blip_list)
+        col.add_blip(make_blip(D3, (9, 0), (10, 0), 'late'))
+        assert col.derived(rows) == len(ref.blip_list) + 1
+        assert builds == [len(ref.blip_list), len(ref.blip_list) + 1]
+        assert col.get_tag_totals() == \
+            (ref + ColumnarTimeBlob([make_blip(D3, (9, 0), (10, 0), 'late')])
+             ).get_tag_totals()
@@ -1,6 +1,7 @@
 """Tests for daptiv mode — apply_tag_groups and daptiv_format output."""
 import datetime as dt
 import io
+import json
 from contextlib import redirect_stdout
 import pytest
 
@@ -140,3 +141,82 @@ class TestDaptivFormat:
         import re
         # At least one decimal hour value should appear
         assert re.search(r'\d+\.\d+', output)
+
+
+# ---------------------------------------------------------------------------
+# daptiv_format  —  several weeks, csv and json
+# ---------------------------------------------------------------------------
+
+class TestDaptivWeeks:
+    @pytest.fixture
+    def weeks_blob(self):
+        return make_blob_for_week([
+            (MON - dt.timedelta(days=7), 9, 12, 'backend refactor'),
+            (MON, 9, 11, 'backend tests'),
+            (MON, 13, 15, 'M+O planning'),
+            (FRI, 9, 10, 'frontend review'),
+        ])
+
+    def render(self, blob, **kwargs):
+        f = io.StringIO()
+        with redirect_stdout(f):
+            daptiv_format(blob, **kwargs)
+        return f.getvalue()
+
+    def test_one_table_per_week(self, weeks_blob):
+        output = self.render(weeks_blob)
+        assert output.count('Σ') == 2
+        assert '03/04/24' in output
+        assert '03/11/24' in output
+        # Oldest week first
+        assert output.index('03/04/24') < output.index('03/11/24')
+
+    def test_week_totals_kept_apart(self, weeks_blob):
+        output = self.render(weeks_blob)
+        assert 'Σ: 3.0' in output
+        assert 'Σ: 5.0' in output
+
+    def test_no_blips_no_tables(self):
+        assert self.render(TimeBlob()) == ''
+
+    def test_csv(self, weeks_blob):
+        lines = self.render(weeks_blob, fmt='csv').splitlines()
+        assert lines[0] == ('week,tag,monday,tuesday,wednesday,thursday,'
+                            'friday,total')
+        assert lines[1:] == [
+            '2024-W10,backend,3.0,0.0,0.0,0.0,0.0,3.0',
+            '2024-W11,M+O,2.0,0.0,0.0,0.0,0.0,2.0',
+            '2024-W11,backend,2.0,0.0,0.0,0.0,0.0,2.0',
+            '2024-W11,frontend,0.0,0.0,0.0,0.0,1.0,1.0',
+        ]
+
+    def test_json(self, weeks_blob):
+        weeks = json.loads(self.render(weeks_blob, fmt='json'))
+        assert [week['week'] for week in weeks] == ['2024-W10', '2024-W11']
+        assert weeks[1]['dates'][0] == MON.isoformat()
+        assert weeks[1]['total'] == 5.0
+        assert weeks[1]['rows'][0] == {'tag': 'M+O',
+                                       'hours': [2.0, 0.0, 0.0, 0.0, 0.0],
+                                       'total': 2.0}
+
+    def test_json_verbose_lists_descriptions(self, weeks_blob):
+        weeks = json.loads(self.render(weeks_blob, fmt='json', verbose=1))
+        assert weeks[0]['rows'][0]['descs'] == ['refactor']
+
+    @pytest.mark.parametrize('fmt', ['table', 'csv', 'json'])
+    def test_group_missing_from_a_week(self, weeks_blob, fmt):
+        # The first week has backend but no frontend, and no M+O at all
+        groups = [['backend', 'frontend'], ['M+O', 'devops']]
+        output = self.render(weeks_blob, groups=groups, fmt=fmt)
+        if fmt == 'csv':
+            assert output.splitlines()[1:] == [
+                '2024-W10,backend,3.0,0.0,0.0,0.0,0.0,3.0',
+                '2024-W11,M+O,2.0,0.0,0.0,0.0,0.0,2.0',
+                '2024-W11,backend,2.0,0.0,0.0,0.0,1.0,3.0',
+            ]
+        elif fmt == 'json':
+            weeks = json.loads(output)
+            assert [[row['tag'] for row in week['rows']]
+                    for week in weeks] == [['backend'], ['M+O', 'backend']]
+        else:
+            assert output.count('Σ') == 2
@@ -0,0 +1,178 @@
+"""Tests for the dsum command line: parsing, date resolution and --batch."""
+import datetime as dt
+import io
+import re
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+import pytest
+
+import daysum
+from daysum import batch_view, build_parser, resolve_dates, summarize
+
+
+MON = dt.date(2024, 3, 11)
+DATES = [MON - dt.timedelta(days=n) for n in range(21)]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for n, date in enumerate(DATES):
+        write_log(date, f'9-{10 + n % 3}\nbackend work\n13-14:30\nM+O sync\n'
+                        '15-15:45\nfrontend review\n')
+    return log_root
+
+
+@pytest.fixture
+def bars(monkeypatch):
+    """Print the arguments of progress bars instead of drawing them."""
+    monkeypatch.setattr(daysum, 'probar',
+                        lambda *bar, fd=None: print(f'probar{bar}'))
+
+
+def run(line):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        summarize(build_parser().parse_args(line.split()))
+    return out.getvalue()
+
+
+def sections(output):
+    """Split batch output into {query line: view output}."""
+    parts = re.split(r'^==> (.*) <==\n', output, flags=re.MULTILINE)
+    return {line: text.rstrip('\n') + '\n'
+            for line, text in zip(parts[1::2], parts[2::2])}
+
+
+# ---------------------------------------------------------------------------
+# build_parser / resolve_dates
+# ---------------------------------------------------------------------------
+
+class TestResolveDates:
+    def test_month_and_day(self):
+        args = build_parser().parse_args(['3', '11', '2024'])
+        assert resolve_dates(args) == (MON, None, [])
+
+    def test_weeks(self):
+        args = build_parser().parse_args(['3', '11', '2024', '-ww'])
+        d_in_q, _, date_list = resolve_dates(args)
+        assert d_in_q == MON
+        assert len(date_list) == 14
+        assert min(date_list) == MON - dt.timedelta(days=7)
+
+    def test_daptiv_implies_a_week(self):
+        args = build_parser().parse_args(['3', '11', '2024', '-d'])
+        assert len(resolve_dates(args)[2]) == 7
+
+    def test_explicit_file(self, tmp_path):
+        log = tmp_path / '2024-03-11.txt'
+        log.write_text('9-10\nbackend work\n')
+        args = build_parser().parse_args([str(log)])
+        assert resolve_dates(args) == (MON, str(log), [])
+
+    @pytest.mark.parametrize('flag', ['-d', '-w', '-s'])
+    def test_explicit_file_is_not_quantified(self, tmp_path, flag):
+        log = tmp_path / '2021-03-11.txt'
+        log.write_text('9-10\nbackend work\n')
+        args = build_parser().parse_args([str(log), flag])
+        with pytest.raises(ValueError, match='single day'):
+            resolve_dates(args)
+
+    def test_resolving_twice_agrees(self):
+        args = build_parser().parse_args(['3', '11', '2024', '-w'])
+        assert resolve_dates(args) == resolve_dates(args)
+
+
+# ---------------------------------------------------------------------------
+# batch_view
+# ---------------------------------------------------------------------------
+
+BATCH = '''# Weekly reporting
+3 11 2024 -r
+3 11 2024 -ww -t -g backend,frontend
+3 11 2024 -d -ww
+3 11 2024 -www
+
+3 11 2024 -x
+3 4 2024 -t
+3 10 2024 -s -t
+3 11 2024 --export jsonl
+'''
+
+
+class TestBatchView:
+    @pytest.fixture
+    def batch_file(self, tmp_path):
+        path = tmp_path / 'batch.txt'
+        path.write_text(BATCH)
+        return str(path)
+
+    def test_views_match_single_runs(self, log_root, bars, batch_file):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            batch_view(batch_file, jobs=1)
+        views = sections(out.getvalue())
+
+        lines = [line for line in BATCH.splitlines()
+                 if line and not line.startswith('#')]
+        assert list(views) == lines
+        for line in lines:
+            assert views[line] == run(line), line
+
+    def test_logs_loaded_once(self, log_root, bars, batch_file, monkeypatch):
+        loads = list()
+        blobify_dates = daysum.blobify_dates
+
+        def counting(date_list, *args, **kwargs):
+            loads.append(date_list)
+            return blobify_dates(date_list, *args, **kwargs)
+
+        monkeypatch.setattr(daysum, 'blobify_dates', counting)
+        with redirect_stdout(io.StringIO()):
+            batch_view(batch_file, jobs=1)
+        assert len(loads) == 1
+        assert min(loads[0]) == MON - dt.timedelta(days=14)
+
+    def test_bars_stay_in_their_sections(self, log_root, tmp_path,
+                                         monkeypatch):
+        monkeypatch.setattr(daysum, 'probar', lambda *bar, fd=None: print(
+            f'probar{bar}', file=fd or sys.stderr))
+        path = tmp_path / 'batch.txt'
+        path.write_text('3 11 2024\n3 11 2024 -r -w\n')
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            batch_view(str(path), jobs=1)
+        assert not err.getvalue()
+        for view in sections(out.getvalue()).values():
+            assert view.rstrip('\n').splitlines()[-1].startswith('probar(')
+
+    def test_missing_day_shows_empty_bar(self, log_root, bars, tmp_path):
+        path = tmp_path / 'batch.txt'
+        path.write_text('1 2 2024\n')
+        out = io.StringIO()
+        with redirect_stdout(out):
+            batch_view(str(path), jobs=1)
+        assert sections(out.getvalue())['1 2 2024'] == run('1 2 2024')
+
+    def test_quantified_file_stops_before_loading(self, log_root, tmp_path,
+                                                  monkeypatch):
+        log = tmp_path / '2024-03-11.txt'
+        log.write_text('9-10\nbackend work\n')
+        path = tmp_path / 'batch.txt'
+        path.write_text(f'3 11 2024 -r\n{log} -w\n')
+        monkeypatch.setattr(daysum, 'blobify_dates', None)
+        with pytest.raises(SystemExit):
+            batch_view(str(path))
+
+    def test_bad_line_stops_before_loading(self, log_root, tmp_path,
+                                           monkeypatch):
+        path = tmp_path / 'batch.txt'
+        path.write_text('3 11 2024 -r\n--bogus\n')
+        monkeypatch.setattr(daysum, 'blobify_dates', None)
+        with pytest.raises(SystemExit):
+            batch_view(str(path))
+
+    def test_nested_batch_refused(self, log_root, tmp_path):
+        path = tmp_path / 'batch.txt'
+        path.write_text(f'--batch {path}\n')
+        with pytest.raises(SystemExit):
+            batch_view(str(path))
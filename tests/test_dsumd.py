@@ -0,0 +1,151 @@
+"""Tests for the dsum server (dsumd) and its thin client (dsumc)."""
+import datetime as dt
+import re
+import threading
+import pytest
+
+import daysum
+from dsumc import ask_server, build_query, main
+from dsumd import BlobStore, DaysumServer, answer
+
+
+PAST_DATE = dt.date(2024, 3, 11)  # Monday
+
+_STYLE_RE = re.compile(r'\x1b\[[0-9;]*m|#\[[^\]]*\]')
+
+
+# ---------------------------------------------------------------------------
+# BlobStore
+# ---------------------------------------------------------------------------
+
+class TestBlobStore:
+    def test_day_is_parsed_once(self, log_root, write_log):
+        write_log(PAST_DATE, '9-11\nbackend work\n')
+        store = BlobStore()
+        assert store.day_blob(PAST_DATE) is store.day_blob(PAST_DATE)
+
+    def test_poll_drops_changed_days(self, log_root, write_log):
+        path = write_log(PAST_DATE, '9-11\nbackend work\n')
+        store = BlobStore()
+        assert store.day_blob(PAST_DATE).blob_total == dt.timedelta(hours=2)
+
+        with open(path, 'a') as log:
+            log.write('11-12\nfrontend work\n')
+        assert store.poll() == 1
+        assert store.day_blob(PAST_DATE).blob_total == dt.timedelta(hours=3)
+
+    def test_poll_notices_new_files(self, log_root, write_log):
+        store = BlobStore()
+        assert store.day_blob(PAST_DATE).blob_total == dt.timedelta(0)
+        write_log(PAST_DATE, '9-11\nbackend work\n')
+        assert store.poll() == 1
+
+    def test_missing_today_is_empty(self, log_root):
+        assert BlobStore().day_blob(dt.date.today()).blip_list == []
+
+
+# ---------------------------------------------------------------------------
+# answer
+# ---------------------------------------------------------------------------
+
+class TestAnswer:
+    def test_status_for_date(self, log_root, write_log):
+        write_log(PAST_DATE, '9-13:30\nbackend work\n')
+        reply = answer(BlobStore(), {'view': 'status',
+                                     'date': PAST_DATE.isoformat()})
+        assert _STYLE_RE.sub('', reply) == '4.50 hrs\n'
+
+    def test_status_honours_tmux_flag(self, log_root):
+        reply = answer(BlobStore(), {'view': 'status', 'tmux': True})
+        assert '#[' in reply
+
+    def test_daptiv_view(self, log_root, write_log):
+        write_log(PAST_DATE, '9-11\nbackend work\n')
+        reply = answer(BlobStore(), {'view': 'daptiv',
+                                     'date': PAST_DATE.isoformat()})
+        assert 'Monday' in reply
+        assert 'backend' in reply
+
+    def test_daptiv_csv(self, log_root, write_log):
+        write_log(PAST_DATE, '9-11\nbackend work\n')
+        reply = answer(BlobStore(), {'view': 'daptiv', 'format': 'csv',
+                                     'date': PAST_DATE.isoformat()})
+        assert reply.startswith('week,tag,')
+        assert ',backend,' in reply
+
+    def test_daptiv_backends_agree(self, log_root, write_log):
+        write_log(PAST_DATE, '9-11\nbackend work\n13-14\nM+O sync\n')
+        query = {'view': 'daptiv', 'format': 'json',
+                 'date': PAST_DATE.isoformat()}
+        assert answer(BlobStore(), query, 'numpy') == \
+            answer(BlobStore(), query, 'python')
+
+    def test_week_view(self, log_root, write_log):
+        write_log(PAST_DATE, '9-11\nbackend work\n')
+        reply = answer(BlobStore(), {'view': 'week',
+                                     'date': PAST_DATE.isoformat()})
+        assert '2.0' in reply
+
+    def test_today_follows_the_clock(self, log_root, monkeypatch, write_log):
+        stale = dt.date.today() - dt.timedelta(days=1)
+        monkeypatch.setattr(daysum, 'TODAY', stale)
+        monkeypatch.setattr(daysum, 'get_expected_time', lambda: 7)
+        bars = list()
+        monkeypatch.setattr(daysum, 'probar',
+                            lambda *bar, fd=None: bars.append(bar))
+        write_log(dt.date.today(), '9-10\nbackend work\n')
+        answer(BlobStore(), {'view': 'day'})
+        assert bars[0][0] == 7
+        assert daysum.TODAY == stale
+
+    def test_unknown_view(self, log_root):
+        assert 'Unknown view' in answer(BlobStore(), {'view': 'bogus'})
+
+
+# ---------------------------------------------------------------------------
+# Client / server round trip
+# ---------------------------------------------------------------------------
+
+class TestRoundTrip:
+    def test_client_reads_server_reply(self, log_root, write_log):
+        write_log(PAST_DATE, '9-10\nbackend work\n')
+        socket_path = str(log_root / 's.sock')
+        server = DaysumServer(socket_path)
+        thread = threading.Thread(target=server.serve_forever,
+                                  kwargs={'poll_interval': 0.05})
+        thread.start()
+        try:
+            query = build_query(['status'])
+            query['date'] = PAST_DATE.isoformat()
+            reply = ask_server(query, socket_path)
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+        assert _STYLE_RE.sub('', reply) == '1.00 hrs\n'
+
+
+class TestBuildQuery:
+    def test_defaults_to_status(self, monkeypatch):
+        monkeypatch.delenv('TMUX', raising=False)
+        assert build_query([]) == {'view': 'status', 'tmux': False}
+
+    def test_week_count_and_colours(self):
+        query = build_query(['week', '3', '--filled', 'blue'])
+        assert query['view'] == 'week'
+        assert query['weeks'] == 3
+        assert query['filled'] == 'blue'
+
+    def test_format(self):
+        assert build_query(['daptiv', '--format', 'json'])['format'] == 'json'
+
+    def test_rejects_unknown_argument(self):
+        with pytest.raises(ValueError):
+            build_query(['--bogus'])
+
+    def test_unknown_argument_prints_whole_usage(self, capsys):
+        assert main(['bogus']) == 2
+        err = capsys.readouterr().err.splitlines()
+        assert err[0] == 'unrecognised argument: bogus'
+        assert err[1].startswith('Usage: dsumc [status|day|week|daptiv]')
+        assert err[2].strip() == '[--format table|csv|json]'
@@ -0,0 +1,109 @@
+"""Tests for streaming blips out as JSON lines and CSV."""
+import csv
+import datetime as dt
+import io
+import json
+import pytest
+
+import daysum
+from export import blip_record, export_blips
+from manifest import LogManifest
+from timeblob import TimeBlip
+
+
+DATES = [dt.date(2024, 3, 4) + dt.timedelta(days=n) for n in range(10)]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for date in DATES:
+        write_log(date, '9-10:30\nbackend work\n13-14\nM+O sync, "weekly"\n')
+    return log_root
+
+
+def make_blip(start, stop, desc):
+    return TimeBlip(start, stop, desc, TimeBlip.strip_tag(desc))
+
+
+BLIP = make_blip(dt.datetime(2024, 3, 4, 9), dt.datetime(2024, 3, 4, 10, 30),
+                 'backend work')
+
+
+# ---------------------------------------------------------------------------
+# blip_record / export_blips
+# ---------------------------------------------------------------------------
+
+class TestExportBlips:
+    def test_record(self):
+        assert blip_record(BLIP) == {'date': '2024-03-04',
+                                     'start': '2024-03-04T09:00:00',
+                                     'stop': '2024-03-04T10:30:00',
+                                     'minutes': 90,
+                                     'tag': 'backend',
+                                     'desc': 'backend work'}
+
+    def test_partial_minutes(self):
+        blip = make_blip(dt.datetime(2024, 3, 4, 9),
+                         dt.datetime(2024, 3, 4, 9, 1, 30), 'devops')
+        assert blip_record(blip)['minutes'] == 1.5
+
+    def test_jsonl(self):
+        out = io.StringIO()
+        assert export_blips([BLIP, BLIP], 'jsonl', fd=out) == 2
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == blip_record(BLIP)
+
+    def test_csv(self):
+        out = io.StringIO()
+        assert export_blips(iter([BLIP]), 'csv', fd=out) == 1
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        assert rows == [['date', 'start', 'stop', 'minutes', 'tag', 'desc'],
+                        ['2024-03-04', '2024-03-04T09:00:00',
+                         '2024-03-04T10:30:00', '90', 'backend',
+                         'backend work']]
+
+    def test_writes_as_blips_arrive(self):
+        out = io.StringIO()
+
+        def blips():
+            yield BLIP
+            # The first blip is out before the second is made
+            assert out.getvalue().count('\n') == 1
+            yield BLIP
+
+        assert export_blips(blips(), 'jsonl', fd=out) == 2
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            export_blips([BLIP], 'xml')
+
+
+# ---------------------------------------------------------------------------
+# export_view
+# ---------------------------------------------------------------------------
+
+class TestExportView:
+    def test_range_in_date_order(self, log_root, capsys):
+        count = daysum.export_view('jsonl', DATES[2], DATES[5],
+                                   LogManifest(str(log_root / 'manifest')))
+        records = [json.loads(line)
+                   for line in capsys.readouterr().out.splitlines()]
+        assert count == len(records) == 8
+        assert [r['date'] for r in records[::2]] == \
+            [date.isoformat() for date in DATES[2:6]]
+        assert records[1]['tag'] == 'M+O'
+
+    def test_csv_quotes_descriptions(self, log_root, capsys):
+        daysum.export_view('csv', DATES[0], DATES[0],
+                           LogManifest(str(log_root / 'manifest')))
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert [row['desc'] for row in rows] == ['backend work',
+                                                 'M+O sync, "weekly"']
+        assert rows[0]['minutes'] == '90'
+
+    def test_no_logs(self, log_root, capsys):
+        assert daysum.export_view('jsonl', dt.date(2020, 1, 1),
+                                  dt.date(2020, 1, 31),
+                                  LogManifest(str(log_root / 'manifest'))) == 0
+        assert capsys.readouterr().out == ''
@@ -3,8 +3,10 @@ import datetime as dt
 import os
 import pytest
 
-from logfile import log_2_blob
-from util import beget_date, beget_filepath
+from logfile import (BLOCK_LINE, DESC_LINE, ENTRY_LINE, TIME_BLOCK_RE,
+                     TIME_ENTRY_RE, log_2_blob, mmap_2_blob, tokenize)
+from timeblob import TimeBlip
+from util import beget_date, beget_filepath, discover_logs
 
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
@@ -47,6 +49,83 @@ class TestBegetFilepath:
         assert 'log03_11.txt' in path
 
 
+# ---------------------------------------------------------------------------
+# discover_logs
+# ---------------------------------------------------------------------------
+
+class TestDiscoverLogs:
+    @staticmethod
+    def touch(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+        return path
+
+    def test_finds_both_name_formats(self, log_root):
+        mm_dd = self.touch(beget_filepath(dt.date(2024, 3, 11)))
+        folder = os.path.dirname(mm_dd)
+        iso = self.touch(f'{folder}/log2024-03-12.txt')
+        self.touch(f'{folder}/notes.txt')
+        assert discover_logs(dt.date(2024, 3, 1), dt.date(2024, 3, 31)) == {
+            dt.date(2024, 3, 11): mm_dd,
+            dt.date(2024, 3, 12): iso,
+        }
+
+    def test_matches_per_day_probing(self, log_root):
+        start, end = dt.date(2023, 12, 20), dt.date(2024, 2, 10)
+        for offset in range(0, 60, 3):
+            self.touch(beget_filepath(start + dt.timedelta(days=offset)))
+        probed = dict()
+        for o_day in range(start.toordinal(), end.toordinal() + 1):
+            date = dt.date.fromordinal(o_day)
+            if os.path.isfile(beget_filepath(date)):
+                probed[date] = beget_filepath(date)
+        assert discover_logs(start, end) == probed
+
+    def test_back_compat_name_wins(self, log_root):
+        mm_dd = self.touch(beget_filepath(dt.date(2024, 3, 11)))
+        self.touch(f'{os.path.dirname(mm_dd)}/log2024-03-11.txt')
+        found = discover_logs(dt.date(2024, 3, 11), dt.date(2024, 3, 11))
+        assert found == {dt.date(2024, 3, 11): mm_dd}
+
+    def test_ignores_other_months_and_bad_dates(self, log_root):
+        folder = os.path.dirname(beget_filepath(dt.date(2024, 2, 1)))
+        self.touch(f'{folder}/log03_01.txt')
+        self.touch(f'{folder}/log02_30.txt')
+        self.touch(f'{folder}/log2024-03-02.txt')
+        os.makedirs(f'{folder}/log02_03.txt')
+        assert discover_logs(dt.date(2024, 1, 1), dt.date(2024, 3, 31)) == {}
+
+    def test_missing_log_path(self, log_root):
+        assert discover_logs(dt.date(2024, 1, 1), dt.date(2024, 12, 31)) == {}
+
+
+# ---------------------------------------------------------------------------
+# tokenize
+# ---------------------------------------------------------------------------
+
+class TestTokenize:
+    @pytest.mark.parametrize('line', [
+        '9-10\n', '9:30-17:00\n', '13-\n', '9:00-', '7.5\n', '8', '10\n',
+        'backend work\n', '  M+O planning  \n', '\n', '', '3 hours\n',
+        '930\n', '12.34.5\n', '\u0663-4\n', 'snake_case thing\r\n',
+    ])
+    def test_matches_separate_patterns(self, line):
+        kind, fields = tokenize(line)
+        entry = TIME_ENTRY_RE.match(line)
+        block = TIME_BLOCK_RE.match(line)
+        if entry:
+            assert (kind, fields) == (ENTRY_LINE, entry.groups())
+        elif block:
+            assert (kind, fields) == (BLOCK_LINE, block.groups())
+        else:
+            desc = line.strip()
+            assert (kind, fields) == (DESC_LINE,
+                                      (desc, TimeBlip.strip_tag(desc)))
+
+    def test_description_fields(self):
+        assert tokenize('M+O sync\n') == (DESC_LINE, ('M+O sync', 'M+O'))
+
+
 # ---------------------------------------------------------------------------
 # log_2_blob  —  round-trip parse of the sample fixture
 # ---------------------------------------------------------------------------
@@ -76,6 +155,38 @@ class TestLog2Blob:
         assert blob.date_set == {sample_date}
 
 
+# ---------------------------------------------------------------------------
+# mmap_2_blob  —  must agree with log_2_blob
+# ---------------------------------------------------------------------------
+
+class TestMmap2Blob:
+    @staticmethod
+    def fields(blob):
+        return [(b.start, b.stop, b.desc, b.tag) for b in blob.blip_list]
+
+    @pytest.mark.parametrize('content', [
+        '9-10\nbackend work\n10:30-12\nM+O sync\n',
+        '9-10\r\nbackend work\r\n1.5\r\nfrontend\r\n',
+        '9-10\nbackend work',
+        '9-10\n10-11\nsecond wins\n',
+        '9-10\n\n11-12\n  padded desc  \n',
+        'stray note\n9-10 trailing\n3 hours of review\n12-\n',
+        '7.5\nblock\n7.5x\nnot a block\n9-10\n',
+        '9-10\nnaïve café work\n',
+        '',
+    ])
+    def test_matches_log_2_blob(self, tmp_path, content):
+        path = tmp_path / 'log.txt'
+        path.write_bytes(content.encode())
+        date = dt.date(2024, 3, 11)
+        assert self.fields(mmap_2_blob(str(path), date)) == \
+            self.fields(log_2_blob(str(path), date))
+
+    def test_sample_fixture(self, sample_log_path, sample_date):
+        assert self.fields(mmap_2_blob(sample_log_path, sample_date)) == \
+            self.fields(log_2_blob(sample_log_path, sample_date))
+
+
 # ---------------------------------------------------------------------------
 # Open-ended entry  (the  "HH-"  syntax)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,106 @@
+"""Tests for resumable tail parsing of a growing log file."""
+import datetime as dt
+import pytest
+
+from logfile import LogParser, log_2_blob
+from logtail import load_state, tail_2_blob
+
+
+DATE = dt.date(2024, 3, 11)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return tmp_path / 'log03_11.txt'
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / 'tail_state.pickle')
+
+
+@pytest.fixture
+def fed_lines(monkeypatch):
+    """Record every line handed to LogParser.feed."""
+    lines = []
+    original_feed = LogParser.feed
+
+    def feed(self, line):
+        lines.append(line)
+        return original_feed(self, line)
+
+    monkeypatch.setattr(LogParser, 'feed', feed)
+    return lines
+
+
+def summarize(blob):
+    return [(b.start, b.stop, b.desc, b.tag) for b in blob.blip_list]
+
+
+class TestTail2Blob:
+    def test_first_run_matches_full_parse(self, log_file, state_path):
+        log_file.write_text('9-10\nM+O standup\n10-12\nbackend work\n')
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+        assert summarize(blob) == summarize(log_2_blob(str(log_file), DATE))
+
+    def test_only_appended_lines_are_parsed(self, log_file, state_path,
+                                            fed_lines):
+        log_file.write_text('9-10\nM+O standup\n')
+        tail_2_blob(str(log_file), DATE, state_path)
+
+        with open(log_file, 'a') as log:
+            log.write('10-12\nbackend work\n')
+        fed_lines.clear()
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+
+        assert fed_lines == ['10-12\n', 'backend work\n']
+        assert blob.blob_total == dt.timedelta(hours=3)
+        assert summarize(blob) == summarize(log_2_blob(str(log_file), DATE))
+
+    def test_pending_entry_survives_between_runs(self, log_file, state_path):
+        log_file.write_text('9-10\nM+O standup\n10-11:30\n')
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+        assert len(blob.blip_list) == 1
+        assert load_state(state_path).purgatory is not None
+
+        with open(log_file, 'a') as log:
+            log.write('backend work\n')
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+        assert blob.blob_total == dt.timedelta(hours=2, minutes=30)
+        assert blob.tag_set == {'M+O', 'backend'}
+
+    def test_edited_prefix_forces_full_parse(self, log_file, state_path,
+                                             fed_lines):
+        log_file.write_text('9-10\nM+O standup\n10-12\nbackend work\n')
+        tail_2_blob(str(log_file), DATE, state_path)
+
+        log_file.write_text('9-11\nM+O standup\n10-12\nbackend work\n')
+        fed_lines.clear()
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+
+        assert len(fed_lines) == 4
+        assert blob.blob_total == dt.timedelta(hours=4)
+
+    def test_open_ended_entry_is_never_checkpointed(self, log_file,
+                                                    state_path):
+        settled = '9-10\nM+O standup\n'
+        log_file.write_text(settled + '10-\nbackend work\n')
+        tail_2_blob(str(log_file), dt.date.today(), state_path)
+        assert load_state(state_path).offset == len(settled)
+
+    def test_partial_last_line_is_parsed_but_not_checkpointed(
+            self, log_file, state_path):
+        log_file.write_text('9-10\nM+O standup\n10-12\nbackend')
+        blob = tail_2_blob(str(log_file), DATE, state_path)
+        assert blob.blob_total == dt.timedelta(hours=3)
+        assert load_state(state_path).offset == len('9-10\nM+O standup\n10-12\n')
+
+    def test_other_file_does_not_reuse_state(self, tmp_path, log_file,
+                                             state_path):
+        log_file.write_text('9-10\nM+O standup\n')
+        tail_2_blob(str(log_file), DATE, state_path)
+
+        other = tmp_path / 'log03_12.txt'
+        other.write_text('9-10\nM+O standup\n')
+        blob = tail_2_blob(str(other), DATE + dt.timedelta(days=1), state_path)
+        assert blob.date_set == {DATE + dt.timedelta(days=1)}
@@ -0,0 +1,38 @@
+"""Tests for the synthetic log tree generator used by the benchmarks."""
+import datetime as dt
+
+import util
+from benchmarks.logtree import generate_tree, tag_names
+from daysum import blobify_dates
+from parsecache import ParseCache
+
+
+class TestTagNames:
+    def test_distinct_and_strippable(self):
+        tags = tag_names(60)
+        assert len(set(tags)) == 60
+        assert all(tag.isalpha() for tag in tags)
+
+
+class TestGenerateTree:
+    def test_tree_parses(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(util, 'LOG_PATH', str(tmp_path))
+        dates = generate_tree(str(tmp_path), 2021, years=1, entries_per_day=6,
+                              tag_count=5, open_ended_rate=0.5,
+                              block_rate=0.2)
+        assert len(dates) == 261  # Workdays of 2021
+        assert util.discover_logs(dt.date(2021, 1, 1),
+                                  dt.date(2021, 12, 31)) \
+            .keys() == set(dates)
+
+        blob = blobify_dates(dates, ParseCache(), jobs=1)
+        assert len(blob.tag_set) == 5
+        assert blob.date_set == set(dates)
+
+    def test_same_seed_same_tree(self, tmp_path):
+        first = generate_tree(str(tmp_path / 'a'), 2021, years=1, seed=3)
+        second = generate_tree(str(tmp_path / 'b'), 2021, years=1, seed=3)
+        path = f'{first[10]:%Y/%b}{util.FOLDER_SUFFIX}/log{first[10]:%m_%d}.txt'
+        assert first == second
+        assert (tmp_path / 'a' / path).read_text() == \
+            (tmp_path / 'b' / path).read_text()
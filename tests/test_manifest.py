@@ -0,0 +1,108 @@
+"""Tests for the log tree manifest and its folder-mtime revalidation."""
+import datetime as dt
+import os
+import pytest
+
+import util
+from daysum import blobify_dates
+from manifest import LogManifest
+from parsecache import ParseCache
+
+
+START = dt.date(2023, 11, 1)
+END = dt.date(2024, 2, 29)
+
+
+def settle(root):
+    """Backdate every folder so its mtime is trusted by the manifest."""
+    for folder, _, _ in os.walk(root):
+        os.utime(folder, ns=(10**18, 10**18))
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for date in (dt.date(2023, 11, 6), dt.date(2024, 1, 8),
+                 dt.date(2024, 1, 9)):
+        write_log(date)
+    settle(log_root)
+    return log_root
+
+
+# ---------------------------------------------------------------------------
+# LogManifest
+# ---------------------------------------------------------------------------
+
+class TestLogManifest:
+    def test_matches_directory_scan(self, log_root):
+        found = LogManifest().lookup(START, END)
+        assert {date: log[0] for date, log in found.items()} == \
+            util.discover_logs(START, END)
+
+    def test_records_mtime_and_size(self, log_root):
+        path, mtime, size = LogManifest().lookup(START, END)[
+            dt.date(2024, 1, 8)]
+        stat = os.stat(path)
+        assert (mtime, size) == (stat.st_mtime_ns, stat.st_size)
+
+    def test_unchanged_tree_is_not_listed_again(self, log_root):
+        manifest = LogManifest()
+        manifest.lookup(START, END)
+        assert manifest.save()
+
+        manifest = LogManifest()
+        found = manifest.lookup(START, END)
+        assert manifest.rescans == 0
+        assert len(found) == 3
+
+    def test_only_changed_month_is_rescanned(self, log_root, write_log):
+        manifest = LogManifest()
+        manifest.lookup(START, END)
+        manifest.save()
+
+        write_log(dt.date(2024, 1, 10))
+        manifest = LogManifest()
+        found = manifest.lookup(START, END)
+        assert manifest.rescans == 1
+        assert dt.date(2024, 1, 10) in found
+
+    def test_new_month_folder_is_found(self, log_root, write_log):
+        manifest = LogManifest()
+        manifest.lookup(START, END)
+        manifest.save()
+
+        write_log(dt.date(2024, 2, 5))
+        found = LogManifest().lookup(START, END)
+        assert dt.date(2024, 2, 5) in found
+
+    def test_removed_file_is_dropped(self, log_root):
+        manifest = LogManifest()
+        manifest.lookup(START, END)
+        manifest.save()
+
+        os.remove(util.beget_filepath(dt.date(2024, 1, 9)))
+        assert dt.date(2024, 1, 9) not in LogManifest().lookup(START, END)
+
+    def test_missing_log_path_is_not_created(self, tmp_path, monkeypatch):
+        missing = tmp_path / 'nowhere'
+        monkeypatch.setattr(util, 'LOG_PATH', str(missing))
+        manifest = LogManifest()
+        assert manifest.lookup(START, END) == {}
+        assert not manifest.save()
+        assert not missing.exists()
+
+
+# ---------------------------------------------------------------------------
+# blobify_dates
+# ---------------------------------------------------------------------------
+
+class TestBlobifyDatesManifest:
+    def test_no_per_day_probes(self, log_root, monkeypatch):
+        def probe(path):
+            raise AssertionError(f'probed {path}')
+        monkeypatch.setattr(os.path, 'isfile', probe)
+        monkeypatch.setattr(os.path, 'exists', probe)
+
+        dates = [dt.date.fromordinal(o_day) for o_day in
+                 range(START.toordinal(), END.toordinal() + 1)]
+        blob = blobify_dates(dates, ParseCache(), jobs=1)
+        assert blob.blob_total == dt.timedelta(hours=3)
@@ -0,0 +1,225 @@
+"""Tests for the optional NumPy totals backend and its pure Python fallback."""
+import datetime as dt
+import pytest
+
+import io
+from contextlib import redirect_stdout
+
+import aggregate
+import daysum
+import npblob
+import pivot
+from benchmarks.logtree import generate_tree
+from daysum import blobify_dates
+from parsecache import ParseCache
+from pivot import PivotTable
+from timeblob import TimeBlip, TimeBlob
+
+
+def moment(day, hour, minute=0, second=0):
+    return dt.datetime(2024, 3, day, hour, minute, second)
+
+
+@pytest.fixture
+def blob():
+    return TimeBlob([
+        TimeBlip(moment(4, 9), moment(4, 10, 30), 'backend work', 'backend'),
+        TimeBlip(moment(4, 13), moment(4, 14), 'M+O sync', 'M+O'),
+        # A span past noon read on a 12 hour clock
+        TimeBlip(moment(5, 11), moment(5, 1), 'backend late', 'backend'),
+        # An open-ended entry stopped at the current second
+        TimeBlip(moment(5, 14), moment(5, 15, 20, 7), 'devops', 'devops'),
+        TimeBlip(moment(5, 15), moment(5, 15), 'devops zero', 'devops'),
+        TimeBlip(moment(11, 9), moment(11, 17), 'M+O all day', 'M+O'),
+    ])
+
+
+@pytest.fixture
+def tree_blob(log_root):
+    dates = generate_tree(str(log_root), 2023, entries_per_day=6,
+                          open_ended_rate=0.3)
+    return blobify_dates(dates, ParseCache(str(log_root / 'cache')), jobs=1)
+
+
+def reference(blob, tags=None):
+    blips = (blob.filter_by(tags) if tags else blob).blip_list
+    return (aggregate.total_time(blips), aggregate.day_totals(blips),
+            aggregate.tag_totals(blips), aggregate.week_totals(blips))
+
+
+def backend(blob, tags=None):
+    return (npblob.total_time(blob, tags), npblob.day_totals(blob, tags),
+            npblob.tag_totals(blob, tags), npblob.week_totals(blob, tags))
+
+
+def same_table(table, other):
+    return (table.cells == other.cells
+            and table.row_totals == other.row_totals
+            and table.col_totals == other.col_totals
+            and table.blob_total == other.blob_total
+            and table.rows == other.rows)
+
+
+# ---------------------------------------------------------------------------
+# BlobArrays
+# ---------------------------------------------------------------------------
+
+class TestBlobArrays:
+    @pytest.fixture(autouse=True)
+    def needs_numpy(self):
+        pytest.importorskip('numpy')
+
+    def test_columns(self, blob):
+        arrays = npblob.BlobArrays.from_blob(blob)
+        assert len(arrays) == 6
+        assert arrays.ordinals[0] == dt.date(2024, 3, 4).toordinal()
+        assert str(arrays.starts.dtype) == 'int64'
+        assert arrays.stops[0] - arrays.starts[0] == 90
+
+    def test_durations_match_tdelta(self, blob):
+        arrays = npblob.BlobArrays.from_blob(blob)
+        assert arrays.micros.tolist() == [
+            b.tdelta // npblob.MICROSECOND for b in blob.blip_list]
+
+    def test_totals_match_reference(self, blob):
+        assert backend(blob) == reference(blob)
+
+    @pytest.mark.parametrize('tags', [['M+O'], ['devops', 'backend'],
+                                      ['nope'], ['M+O', 'M+O']])
+    def test_filtered_totals_match_reference(self, blob, tags):
+        assert backend(blob, tags) == reference(blob, tags)
+
+    def test_date_set(self, blob):
+        assert npblob.BlobArrays.from_blob(blob).date_set == blob.date_set
+
+    def test_sub_blob(self, blob):
+        arrays = npblob.BlobArrays.from_blob(blob)
+        start, end = dt.date(2024, 3, 5), dt.date(2024, 3, 11)
+        assert arrays.sub_blob(start, end).blob_total == \
+            blob.sub_blob(start, end).blob_total
+        assert arrays.sub_blob(start).blob_total == \
+            blob.sub_blob(start).blob_total
+
+    def test_empty(self):
+        assert backend(TimeBlob()) == reference(TimeBlob())
+
+    @pytest.mark.parametrize('groups', [None, [['backend', 'devops']]])
+    def test_pivot_matches_reference(self, blob, groups):
+        assert same_table(npblob.pivot_table(blob, groups),
+                          PivotTable.from_blips(blob.blip_list, groups))
+
+    @pytest.mark.parametrize('groups', [None, [['M+O', 'devops']],
+                                        [['devops', 'backend']]])
+    def test_week_tables_match_reference(self, blob, groups):
+        tables = npblob.week_tables(blob, groups)
+        reference_tables = pivot.week_tables(blob.blip_list, groups)
+        assert list(tables) == list(reference_tables) == [(2024, 10),
+                                                          (2024, 11)]
+        for week, table in tables.items():
+            assert same_table(table, reference_tables[week])
+            assert table.tag_set == reference_tables[week].tag_set
+
+    def test_week_tables_of_empty_blob(self):
+        assert npblob.week_tables(TimeBlob()) == {}
+        assert same_table(npblob.pivot_table(TimeBlob()), PivotTable())
+
+    def test_arrays_kept_until_blips_change(self, blob):
+        arrays = npblob.blob_arrays(blob)
+        assert npblob.blob_arrays(blob) is arrays
+
+        blob.add_blip(TimeBlip(moment(12, 9), moment(12, 10), 'M+O', 'M+O'))
+        assert len(npblob.blob_arrays(blob)) == 7
+        arrays = npblob.blob_arrays(blob)
+        blob.blip_list[0].stop = moment(4, 11)
+        assert npblob.blob_arrays(blob) is not arrays
+        assert npblob.total_time(blob) == blob.blob_total
+
+    def test_columnar_arrays_kept_until_rows_change(self, blob):
+        from colblob import ColumnarTimeBlob
+        col = ColumnarTimeBlob.from_blob(blob)
+        arrays = npblob.blob_arrays(col)
+        assert npblob.blob_arrays(col) is arrays
+        assert backend(col) == reference(blob)
+
+        col.add_blip(TimeBlip(moment(12, 9), moment(12, 10), 'M+O', 'M+O'))
+        assert len(npblob.blob_arrays(col)) == 7
+
+    def test_generated_tree_matches_reference(self, tree_blob):
+        arrays = npblob.BlobArrays.from_blob(tree_blob)
+        assert backend(arrays) == reference(tree_blob)
+        assert backend(arrays, ['proja', 'projc']) == \
+            reference(tree_blob, ['proja', 'projc'])
+        assert same_table(arrays.pivot(),
+                          PivotTable.from_blips(tree_blob.blip_list))
+
+
+# ---------------------------------------------------------------------------
+# Pure Python fallback
+# ---------------------------------------------------------------------------
+
+class TestFallback:
+    @pytest.fixture(autouse=True)
+    def without_numpy(self, monkeypatch):
+        monkeypatch.setattr(npblob, 'np', None)
+
+    def test_totals_match_reference(self, blob):
+        assert backend(blob) == reference(blob)
+        assert backend(blob, ['M+O']) == reference(blob, ['M+O'])
+
+    def test_pivot_matches_reference(self, blob):
+        assert same_table(npblob.pivot_table(blob, [['backend', 'devops']]),
+                          PivotTable.from_blips(blob.blip_list,
+                                                [['backend', 'devops']]))
+
+
+# ---------------------------------------------------------------------------
+# Views routed through npblob
+# ---------------------------------------------------------------------------
+
+class TestRouting:
+    @pytest.fixture(params=['numpy', 'python'])
+    def backend(self, request):
+        """Send every blob through npblob, or none."""
+        if request.param == 'numpy':
+            pytest.importorskip('numpy')
+        return request.param
+
+    def render(self, view, *args):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            view(*args)
+        return out.getvalue()
+
+    def test_arrays_built_only_for_numpy(self, blob, backend, monkeypatch):
+        called = list()
+        build = npblob.BlobArrays.from_blob
+
+        def counting(source):
+            called.append(source)
+            return build(source)
+
+        monkeypatch.setattr(npblob.BlobArrays, 'from_blob', counting)
+        daysum.pivot_of(blob, backend=backend)
+        daysum.pivot_of(blob, backend=backend)
+        assert len(called) == (1 if backend == 'numpy' else 0)
+
+    def test_auto_goes_by_blip_count_alone(self):
+        # Even with NumPy already imported
+        pytest.importorskip('numpy')
+        assert not daysum.use_numpy('auto', 1000)
+        assert daysum.use_numpy('auto', daysum.NUMPY_IMPORT_BLIPS)
+        assert not daysum.use_numpy('python', daysum.NUMPY_IMPORT_BLIPS)
+        assert daysum.use_numpy('numpy', 1)
+
+    def test_views_agree(self, tree_blob, backend):
+        groups = [['proja', 'projb']]
+        assert [self.render(daysum.daptiv_format, tree_blob, groups, 0, fmt,
+                            backend)
+                for fmt in ('csv', 'json')] == \
+            [self.render(daysum.daptiv_format,
+                         iter(tree_blob.blip_list), groups, 0, fmt)
+             for fmt in ('csv', 'json')]
+        assert self.render(daysum.tag_view, tree_blob, groups, backend) == \
+            self.render(daysum.tag_view, iter(tree_blob.blip_list), groups)
+        assert tree_blob.get_tag_totals() == \
+            aggregate.tag_totals(tree_blob.blip_list)
@@ -0,0 +1,152 @@
+"""Tests for the on-disk parse cache and its use by blobify_dates."""
+import datetime as dt
+import os
+
+import util
+from daysum import blobify_dates
+from parsecache import ParseCache
+
+
+PAST_DATE = dt.date(2024, 3, 11)
+
+
+# ---------------------------------------------------------------------------
+# ParseCache
+# ---------------------------------------------------------------------------
+
+class TestParseCache:
+    def test_miss_then_hit_across_instances(self, log_root, write_log):
+        path = write_log(PAST_DATE, '9-10\nbackend work\n')
+        cache = ParseCache()
+        first = cache.get_blob(path, PAST_DATE)
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert cache.save()
+
+        cache = ParseCache()
+        second = cache.get_blob(path, PAST_DATE)
+        assert (cache.hits, cache.misses) == (1, 0)
+        assert second.blob_total == first.blob_total
+        assert [b.desc for b in second.blip_list] == ['backend work']
+        assert second.tag_set == {'backend'}
+
+    def test_changed_file_is_reparsed(self, log_root, write_log):
+        path = write_log(PAST_DATE, '9-10\nbackend work\n')
+        cache = ParseCache()
+        cache.get_blob(path, PAST_DATE)
+
+        write_log(PAST_DATE, '9-10\nbackend work\n10-12\nfrontend work\n')
+        blob = cache.get_blob(path, PAST_DATE)
+        assert cache.misses == 2
+        assert blob.blob_total == dt.timedelta(hours=3)
+
+    def test_today_is_never_cached(self, log_root, write_log):
+        today = dt.date.today()
+        path = write_log(today, '9-10\nbackend work\n')
+        cache = ParseCache()
+        cache.get_blob(path, today)
+        cache.get_blob(path, today)
+        assert cache.hits == 0
+        assert not cache.dirty
+
+    def test_only_months_asked_for_are_read(self, log_root, write_log):
+        cache = ParseCache()
+        for date in (dt.date(2024, 1, 8), dt.date(2024, 2, 5), PAST_DATE):
+            cache.get_blob(write_log(date, '9-10\nw\n'),
+                           date)
+        cache.save()
+        assert sorted(os.listdir(cache.cache_dir)) == \
+            ['2024-01.pickle', '2024-02.pickle', '2024-03.pickle']
+
+        cache = ParseCache()
+        cache.get_blob(util.beget_filepath(PAST_DATE), PAST_DATE)
+        assert list(cache.shards) == ['2024-03']
+        assert cache.hits == 1
+
+    def test_eviction_bound(self, log_root, write_log):
+        cache = ParseCache(max_shards=2)
+        for month in range(1, 5):
+            date = dt.date(2024, month, 11)
+            path = write_log(date, '9-10\nwork\n')
+            cache.get_blob(path, date)
+            cache.save()
+
+        # Reading a month marks it as used, so it outlives a newer one
+        cache = ParseCache(max_shards=2)
+        cache.get_blob(util.beget_filepath(dt.date(2024, 3, 11)),
+                       dt.date(2024, 3, 11))
+        date = dt.date(2024, 5, 13)
+        cache.get_blob(write_log(date, '9-10\nwork\n'),
+                       date)
+        cache.save()
+        assert sorted(os.listdir(cache.cache_dir)) == \
+            ['2024-03.pickle', '2024-05.pickle']
+
+    def test_corrupt_cache_file_is_ignored(self, log_root, write_log):
+        path = write_log(PAST_DATE, '9-10\nwork\n')
+        cache = ParseCache()
+        os.makedirs(cache.cache_dir)
+        with open(cache.shard_path('2024-03'), 'w') as shard:
+            shard.write('not a pickle')
+        assert cache.get_blob(path, PAST_DATE).blob_total == \
+            dt.timedelta(hours=1)
+        assert cache.misses == 1
+
+    def test_missing_log_path_is_not_created(self, tmp_path, monkeypatch):
+        missing = tmp_path / 'nowhere'
+        monkeypatch.setattr(util, 'LOG_PATH', str(missing))
+        path = tmp_path / 'log03_11.txt'
+        path.write_text('9-10\nwork\n')
+        cache = ParseCache()
+        cache.get_blob(path, PAST_DATE)
+        assert not cache.save()
+        assert not missing.exists()
+
+
+# ---------------------------------------------------------------------------
+# blobify_dates
+# ---------------------------------------------------------------------------
+
+class TestBlobifyDatesCache:
+    def test_only_changed_files_are_parsed(self, log_root, write_log):
+        dates = [dt.date(2024, 3, day) for day in range(11, 16)]
+        for date in dates:
+            write_log(date, '9-11\nbackend work\n')
+        first = blobify_dates(dates)
+
+        write_log(dates[2], '9-12\nbackend work\n')
+        cache = ParseCache()
+        second = blobify_dates(dates, cache)
+        assert (cache.hits, cache.misses) == (4, 1)
+        assert second.blob_total - first.blob_total == dt.timedelta(hours=1)
+
+
+class TestBlobifyDatesParallel:
+    def test_parallel_matches_sequential(self, log_root, write_log):
+        dates = [dt.date(2024, 3, 1) + dt.timedelta(days=n) for n in range(30)]
+        for n, date in enumerate(dates):
+            if date.weekday() < 5:
+                write_log(date,
+                          f'9-{10 + n % 4}\nbackend work {n}\n'
+                          '13-14\nM+O sync\n')
+
+        sequential = blobify_dates(dates, ParseCache(str(log_root / 'seq')),
+                                   jobs=1)
+        parallel = blobify_dates(dates, ParseCache(str(log_root / 'par')),
+                                 jobs=8)
+        summary = [[(b.start, b.stop, b.desc, b.tag) for b in blob.blip_list]
+                   for blob in (sequential, parallel)]
+        assert summary[0] == summary[1]
+        assert parallel.date_counts == sequential.date_counts
+
+    def test_parallel_cold_cache_fills_every_file(self, log_root, write_log):
+        dates = [dt.date(2024, 3, day) for day in range(4, 9)]
+        for date in dates:
+            write_log(date, '9-10\nbackend work\n')
+
+        cache = ParseCache()
+        blobify_dates(dates, cache, jobs=4)
+        assert (cache.hits, cache.misses) == (0, 5)
+
+        cache = ParseCache()
+        blobify_dates(dates, cache, jobs=4)
+        assert (cache.hits, cache.misses) == (5, 0)
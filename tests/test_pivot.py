@@ -0,0 +1,101 @@
+"""Tests for the single-pass PivotTable aggregation engine."""
+import datetime as dt
+import pytest
+
+from pivot import PivotTable, week_tables
+from timeblob import TimeBlip, TimeBlob
+
+
+MON = dt.date(2024, 3, 11)
+TUE = dt.date(2024, 3, 12)
+
+
+def make_blip(date, start_h, end_h, desc):
+    blip = TimeBlip(dt.datetime.combine(date, dt.time(start_h)),
+                    dt.datetime.combine(date, dt.time(end_h)), desc)
+    blip.set_tag(TimeBlip.strip_tag(desc))
+    return blip
+
+
+@pytest.fixture
+def blob():
+    return TimeBlob([
+        make_blip(MON, 9, 11, 'backend refactor'),
+        make_blip(MON, 11, 12, 'frontend review'),
+        make_blip(MON, 13, 14, 'M+O planning'),
+        make_blip(TUE, 9, 12, 'backend tests'),
+        make_blip(TUE, 13, 13, 'devops'),
+    ])
+
+
+class TestPivotTable:
+    def test_cells(self, blob):
+        table = PivotTable.from_blips(blob.blip_list)
+        assert table.cells['backend', MON] == dt.timedelta(hours=2)
+        assert table.cells['backend', TUE] == dt.timedelta(hours=3)
+        assert ('frontend', TUE) not in table.cells
+
+    def test_zero_length_blips_still_have_cells(self, blob):
+        table = PivotTable.from_blips(blob.blip_list)
+        assert table.cells['devops', TUE] == dt.timedelta(0)
+
+    def test_totals_match_blob(self, blob):
+        table = PivotTable.from_blips(blob.blip_list)
+        assert table.blob_total == blob.blob_total
+        assert table.date_set == blob.date_set
+        assert table.total_work_days == blob.total_work_days
+        for date in blob.date_set:
+            assert table.col_totals[date] == blob.sub_blob(date).blob_total
+
+    def test_groups_fold_rows(self, blob):
+        table = PivotTable.from_blips(blob.blip_list,
+                                      [['backend', 'frontend']])
+        assert table.row_totals['backend'] == dt.timedelta(hours=6)
+        assert 'frontend' not in table.row_totals
+        assert table.rows == [['M+O'], ['backend', 'frontend'], ['devops']]
+
+    def test_descs_kept_per_row(self, blob):
+        table = PivotTable.from_blips(blob.blip_list, keep_descs=True)
+        assert table.descs['backend'] == {'refactor', 'tests'}
+        assert table.descs['devops'] == set()
+
+    def test_descs_skipped_by_default(self, blob):
+        assert PivotTable.from_blips(blob.blip_list).descs is None
+
+    def test_accepts_any_iterable(self, blob):
+        table = PivotTable.from_blips(iter(blob.blip_list))
+        assert table.blob_total == blob.blob_total
+
+
+class TestGetTagTotals:
+    def test_totals_per_tag(self, blob):
+        assert blob.get_tag_totals() == {
+            'backend': dt.timedelta(hours=5),
+            'frontend': dt.timedelta(hours=1),
+            'M+O': dt.timedelta(hours=1),
+            'devops': dt.timedelta(0),
+        }
+
+    def test_empty_blob(self):
+        assert TimeBlob().get_tag_totals() == {}
+
+
+class TestWeekTables:
+    def test_one_table_per_iso_week(self, blob):
+        next_mon = MON + dt.timedelta(days=7)
+        blips = [make_blip(next_mon, 9, 10, 'backend sync')] + blob.blip_list
+        tables = week_tables(blips)
+        assert list(tables) == [(2024, 11), (2024, 12)]
+        assert tables[2024, 11].blob_total == blob.blob_total
+        assert tables[2024, 12].cells == {('backend', next_mon):
+                                          dt.timedelta(hours=1)}
+
+    def test_groups_and_descs(self, blob):
+        tables = week_tables(blob.blip_list, [['backend', 'frontend']],
+                             keep_descs=True)
+        table = tables[2024, 11]
+        assert table.row_totals['backend'] == dt.timedelta(hours=6)
+        assert 'review' in table.descs['backend']
+
+    def test_no_blips(self):
+        assert week_tables([]) == {}
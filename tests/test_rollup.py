@@ -0,0 +1,130 @@
+"""Tests for the per-day, per-tag rollup store behind the totals views."""
+import datetime as dt
+import os
+import pytest
+
+import daysum
+import util
+from daysum import blobify_dates, rollup_table
+from parsecache import ParseCache
+from pivot import PivotTable
+from rollup import RollupStore
+
+
+DATES = [dt.date(2024, 2, 26) + dt.timedelta(days=n) for n in range(14)]
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    for n, date in enumerate(DATES):
+        write_log(date, f'9-{10 + n % 3}\nbackend work\n'
+                        '13-14:30\nM+O sync\n15-15\ndevops\n')
+    return log_root
+
+
+@pytest.fixture
+def blob(log_root):
+    return blobify_dates(DATES, ParseCache(str(log_root / 'cache')), jobs=1)
+
+
+# ---------------------------------------------------------------------------
+# RollupStore
+# ---------------------------------------------------------------------------
+
+class TestRollupStore:
+    def test_table_matches_blob(self, blob):
+        store = RollupStore()
+        store.refresh(DATES[0], DATES[-1])
+        table = store.table(DATES)
+        expected = PivotTable.from_blips(blob.blip_list)
+        assert table.cells == expected.cells
+        assert table.col_totals == expected.col_totals
+        assert table.row_totals == expected.row_totals
+        assert table.tag_set == expected.tag_set
+
+    def test_only_changed_days_are_parsed(self, log_root, write_log):
+        store = RollupStore()
+        assert store.refresh(DATES[0], DATES[-1]) == len(DATES)
+        store.save()
+
+        write_log(DATES[4], '9-17\nfrontend work\n')
+        store = RollupStore()
+        assert store.refresh(DATES[0], DATES[-1]) == 1
+        assert store.days[DATES[4]][1] == {'frontend': dt.timedelta(hours=8)}
+
+    def test_removed_day_is_dropped(self, log_root):
+        store = RollupStore()
+        store.refresh(DATES[0], DATES[-1])
+        os.remove(util.beget_filepath(DATES[0]))
+        store.refresh(DATES[0], DATES[-1])
+        assert DATES[0] not in store.days
+
+    def test_changed_days_come_from_the_parse_cache(self, log_root,
+                                                    monkeypatch):
+        import parsecache
+        blobify_dates(DATES, jobs=1)
+
+        def parse(*args):
+            raise AssertionError('parsed a cached file')
+        monkeypatch.setattr(parsecache, 'log_2_blob', parse)
+        assert RollupStore().refresh(DATES[0], DATES[-1]) == len(DATES)
+
+    def test_changed_days_are_loaded_a_year_at_a_time(self, log_root, write_log):
+        write_log(dt.date(2023, 12, 29), '9-10\nbackend work\n')
+        loads = list()
+
+        def load(date_list):
+            loads.append(date_list)
+            return blobify_dates(date_list, jobs=1)
+        store = RollupStore()
+        store.refresh(dt.date(2023, 12, 1), DATES[-1], load=load)
+        assert loads == [[dt.date(2023, 12, 29)], DATES]
+        assert store.days[dt.date(2023, 12, 29)][1] == \
+            {'backend': dt.timedelta(hours=1)}
+
+    def test_today_is_always_refreshed(self, log_root, write_log):
+        today = dt.date.today()
+        write_log(today, '9-10\nbackend work\n')
+        store = RollupStore()
+        store.refresh(today, today)
+        assert store.refresh(today, today) == 1
+
+    def test_week_and_month_totals(self, blob):
+        store = RollupStore()
+        store.refresh(DATES[0], DATES[-1])
+        weeks = store.week_totals()
+        assert sorted(weeks) == [(2024, 9), (2024, 10)]
+        assert weeks[2024, 9]['M+O'] == dt.timedelta(hours=1.5 * 7)
+        months = store.month_totals()
+        assert sorted(months) == [(2024, 2), (2024, 3)]
+        assert sum((sum(tags.values(), dt.timedelta())
+                    for tags in months.values()), dt.timedelta()) == \
+            blob.blob_total
+
+
+# ---------------------------------------------------------------------------
+# Views from rollups
+# ---------------------------------------------------------------------------
+
+class TestRollupViews:
+    def test_report_view_same_output(self, blob, capsys, monkeypatch):
+        monkeypatch.setattr(daysum, 'TODAY', DATES[-1])
+        # Compare what reaches the progress bar rather than its rendering
+        bars = list()
+        monkeypatch.setattr(daysum, 'probar',
+                            lambda *amounts, fd=None: bars.append(amounts))
+        daysum.report_view(blob)
+        from_blob = capsys.readouterr()
+        daysum.report_view(rollup_table(DATES))
+        assert capsys.readouterr() == from_blob
+        assert bars[0] == bars[1]
+
+    def test_tag_view_same_output(self, blob, capsys):
+        groups = [['backend', 'devops']]
+        daysum.tag_view(blob, groups)
+        from_blob = capsys.readouterr()
+        daysum.tag_view(rollup_table(DATES, groups), groups)
+        assert capsys.readouterr() == from_blob
+
+    def test_no_dates(self, log_root):
+        assert rollup_table([]).blob_total == dt.timedelta()
@@ -0,0 +1,87 @@
+"""Startup budget for the `dsum -x` status line path."""
+import datetime as dt
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import util
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+# Import time of the modules `dsum -x` loads beyond interpreter startup, as
+# a multiple of importing argparse and datetime on the same machine. dsum -x
+# measures about 3.5; the heavy view libraries alone add about 6.5 more.
+STARTUP_BUDGET_RATIO = 5
+REFERENCE_IMPORTS = 'import argparse, datetime'
+STARTUP_MODULES = {'encodings', 'site', 'zipimport', 'io', '_signal',
+                   '_frozen_importlib_external', '_codecs', 'codecs'}
+HEAVY_MODULES = {'tabulate', 'progressbar'}
+
+_IMPORTTIME_RE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# Run dsum against the log tree given as the first argument
+DSUM_IN_TREE = ('import sys\n'
+                'import util\n'
+                'util.LOG_PATH = sys.argv.pop(1)\n'
+                'import daysum\n'
+                'daysum.driver()\n')
+
+
+def import_times(log_root, *args, env=None, code=DSUM_IN_TREE):
+    """Return {module: (cumulative_us, depth)} for a dsum run's imports."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code, str(log_root), *args],
+        cwd=REPO_DIR, capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    times = dict()
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            indent = len(match.group(3)) - 1
+            times[match.group(4)] = (int(match.group(2)), indent)
+    return times
+
+
+def status_env():
+    env = dict(os.environ)
+    env.pop('TMUX', None)
+    return env
+
+
+@pytest.fixture
+def log_root(log_root, write_log):
+    """A log tree holding only today's log."""
+    write_log(dt.date.today())
+    return log_root
+
+
+class TestStatusStartup:
+    def test_view_libraries_not_imported(self, log_root):
+        times = import_times(log_root, '-x', env=status_env())
+        assert 'timeblob' in times
+        assert not HEAVY_MODULES & set(times)
+
+    def test_reads_only_the_given_tree(self, log_root):
+        import_times(log_root, '-x', env=status_env())
+        assert os.listdir(log_root / util.CACHE_FOLDER)
+
+    def test_within_startup_budget(self, log_root):
+        def added(times):
+            return sum(cumulative
+                       for module, (cumulative, depth) in times.items()
+                       if depth == 0 and module not in STARTUP_MODULES)
+
+        # Interleaved, so both see the same load on the machine
+        totals, references = list(), list()
+        for _ in range(3):
+            totals.append(added(import_times(log_root, '-x',
+                                             env=status_env())))
+            references.append(added(import_times(log_root,
+                                                 code=REFERENCE_IMPORTS)))
+        ratio = min(totals) / min(references)
+        assert ratio < STARTUP_BUDGET_RATIO, \
+            f'dsum -x imports took {min(totals)}us, {ratio:.1f} times ' \
+            f'{REFERENCE_IMPORTS!r} (budget {STARTUP_BUDGET_RATIO} times)'
@@ -1,8 +1,15 @@
 """Tests for TimeBlip and TimeBlob classes."""
 import datetime as dt
+import gc
+import pickle
+import threading
+import time
+import tracemalloc
 import pytest
 
-from timeblob import TimeBlip, TimeBlob
+from benchmarks.logtree import beget_tree_path, generate_tree
+from logfile import iter_blips
+from timeblob import TAG_TABLE, TagTable, TimeBlip, TimeBlob
 
 
 def make_blip(start_h, start_m, end_h, end_m, desc='work tag', date=None):
@@ -112,3 +119,353 @@ class TestTimeBlob:
         for hour in range(8):
             blob.add_blip(make_blip(hour, 0, hour + 1, 0))
         assert blob.total_work_days == pytest.approx(1.0)
+
+
+# ---------------------------------------------------------------------------
+# Running aggregates
+# ---------------------------------------------------------------------------
+
+class TestTimeBlobAggregates:
+    @pytest.fixture
+    def blob(self):
+        d1 = dt.date(2024, 3, 11)
+        d2 = dt.date(2024, 3, 12)
+        blob = TimeBlob()
+        blob.add_blip(make_blip(9, 0, 10, 0, desc='backend work', date=d1))
+        blob.add_blip(make_blip(10, 0, 11, 0, desc='frontend work', date=d1))
+        blob.add_blip(make_blip(9, 0, 11, 0, desc='backend work', date=d2))
+        return blob
+
+    def test_counts(self, blob):
+        assert blob.date_counts == {dt.date(2024, 3, 11): 2,
+                                    dt.date(2024, 3, 12): 1}
+        assert blob.tag_counts == {'backend': 2, 'frontend': 1}
+
+    def test_constructor_counts_blips(self, blob):
+        rebuilt = TimeBlob(list(blob.blip_list))
+        assert rebuilt.blob_total == dt.timedelta(hours=4)
+        assert rebuilt.tag_counts == blob.tag_counts
+
+    def test_addition_merges_aggregates(self, blob):
+        combined = blob + blob
+        assert combined.blob_total == dt.timedelta(hours=8)
+        assert combined.date_counts[dt.date(2024, 3, 11)] == 4
+        assert combined.tag_counts == {'backend': 4, 'frontend': 2}
+        assert blob.blob_total == dt.timedelta(hours=4)
+
+    def test_mutated_blip_invalidates(self, blob):
+        assert blob.blob_total == dt.timedelta(hours=4)
+        blob.blip_list[0].stop = blob.blip_list[0].stop + dt.timedelta(hours=1)
+        assert blob.blob_total == dt.timedelta(hours=5)
+
+    def test_retagged_blip_invalidates(self, blob):
+        assert blob.tag_counts['frontend'] == 1
+        blob.blip_list[1].set_tag('backend')
+        assert blob.tag_counts == {'backend': 3}
+
+    def test_moved_blip_invalidates(self, blob):
+        assert len(blob.date_set) == 2
+        blip = blob.blip_list[2]
+        blip.start = blip.start - dt.timedelta(days=1)
+        blip.stop = blip.stop - dt.timedelta(days=1)
+        assert blob.date_set == {dt.date(2024, 3, 11)}
+
+    def test_direct_list_append_is_counted(self, blob):
+        blob.blip_list.append(make_blip(13, 0, 14, 0))
+        assert blob.blob_total == dt.timedelta(hours=5)
+
+    def test_derived_kept_until_blips_change(self, blob):
+        def total_hours(blob):
+            return sum((b.tdelta for b in blob.blip_list),
+                       dt.timedelta()) / dt.timedelta(hours=1)
+
+        assert blob.derived(total_hours) == 4
+        blob.add_blip(make_blip(13, 0, 14, 0))
+        assert blob.derived(total_hours) == 5
+        blob.blip_list[0].stop = blob.blip_list[0].stop + dt.timedelta(hours=1)
+        assert blob.derived(total_hours) == 6
+        blob.extend([TimeBlob([make_blip(15, 0, 16, 0)])])
+        assert blob.derived(total_hours) == 7
+
+    def test_unheld_blip_changes_do_not_invalidate(self, blob):
+        assert blob.blob_total == dt.timedelta(hours=4)
+        mutations = TimeBlip.mutations
+        loose = make_blip(9, 0, 10, 0)
+        loose.stop = loose.start
+        assert TimeBlip.mutations == mutations
+        assert blob.blob_total == dt.timedelta(hours=4)
+
+
+# ---------------------------------------------------------------------------
+# Date and tag indexes
+# ---------------------------------------------------------------------------
+
+class TestTimeBlobIndexes:
+    D1 = dt.date(2024, 3, 11)
+    D2 = dt.date(2024, 3, 12)
+    D3 = dt.date(2024, 3, 13)
+
+    @pytest.fixture
+    def blob(self):
+        blob = TimeBlob()
+        for date in (self.D1, self.D2, self.D3):
+            blob.add_blip(make_blip(9, 0, 10, 0, desc='backend work', date=date))
+            blob.add_blip(make_blip(10, 0, 12, 0, desc='frontend work', date=date))
+        return blob
+
+    def test_appending_to_derived_list_leaves_parent_alone(self, blob):
+        sub = blob.sub_blob(self.D2)
+        sub.blip_list.append(make_blip(13, 0, 14, 0, date=self.D2))
+        assert sub.blob_total == dt.timedelta(hours=4)
+        assert blob.blob_total == dt.timedelta(hours=9)
+        assert blob.sub_blob(self.D2).blob_total == dt.timedelta(hours=3)
+        blob.filter_by(['backend']).blip_list.append(
+            make_blip(13, 0, 14, 0, desc='backend', date=self.D1))
+        assert blob.filter_by(['backend']).blob_total == dt.timedelta(hours=3)
+
+    def test_date_range(self, blob):
+        sub = blob.sub_blob(self.D2, self.D3)
+        assert sub.date_set == {self.D2, self.D3}
+        assert sub.blob_total == dt.timedelta(hours=6)
+
+    def test_missing_date_is_empty(self, blob):
+        assert blob.sub_blob(dt.date(2024, 1, 1)).blip_list == []
+
+    def test_filter_by_multiple_tags(self, blob):
+        filtered = blob.filter_by(['frontend', 'backend', 'absent'])
+        assert filtered.blob_total == dt.timedelta(hours=9)
+        assert filtered.tag_set == {'backend', 'frontend'}
+
+    def test_filter_by_leaves_argument_alone(self, blob):
+        tags = ['absent', 'backend']
+        blob.filter_by(tags)
+        assert tags == ['absent', 'backend']
+
+    def test_derived_blob_is_not_changed_by_parent(self, blob):
+        sub = blob.sub_blob(self.D1)
+        blob.add_blip(make_blip(13, 0, 14, 0, desc='backend', date=self.D1))
+        assert sub.blob_total == dt.timedelta(hours=3)
+        assert blob.sub_blob(self.D1).blob_total == dt.timedelta(hours=4)
+
+    def test_parent_is_not_changed_by_derived_blob(self, blob):
+        sub = blob.filter_by(['backend'])
+        sub.add_blip(make_blip(13, 0, 14, 0, desc='backend', date=self.D1))
+        assert sub.blob_total == dt.timedelta(hours=4)
+        assert blob.filter_by(['backend']).blob_total == dt.timedelta(hours=3)
+        assert blob.blob_total == dt.timedelta(hours=9)
+
+    def test_indexes_follow_mutations(self, blob):
+        blip = blob.sub_blob(self.D3).blip_list[0]
+        blip.set_tag('devops')
+        assert blob.filter_by(['devops']).blob_total == dt.timedelta(hours=1)
+
+
+# ---------------------------------------------------------------------------
+# Bulk merging
+# ---------------------------------------------------------------------------
+
+TAGS = ['backend', 'frontend', 'devops']
+
+
+def make_daily_blobs(days, blips_per_day=4):
+    """Build one small blob per consecutive day."""
+    first = dt.date(2020, 1, 1)
+    blobs = []
+    for offset in range(days):
+        date = first + dt.timedelta(days=offset)
+        blobs.append(TimeBlob([
+            make_blip(hour, 0, hour + 1, 0, desc=TAGS[hour % 3] + ' work',
+                      date=date)
+            for hour in range(9, 9 + blips_per_day)]))
+    return blobs
+
+
+class TestTimeBlobMerging:
+    def test_iadd_is_in_place(self):
+        blob = TimeBlob()
+        same = blob
+        blob += make_daily_blobs(1)[0]
+        assert blob is same
+        assert blob.blob_total == dt.timedelta(hours=4)
+
+    def test_iadd_self(self):
+        blob = make_daily_blobs(1)[0]
+        blob += blob
+        assert len(blob.blip_list) == 8
+        assert blob.blob_total == dt.timedelta(hours=8)
+        assert blob.tag_counts == {'backend': 4, 'frontend': 2, 'devops': 2}
+
+    def test_concat_matches_repeated_add(self):
+        blobs = make_daily_blobs(5)
+        added = TimeBlob()
+        for blob in blobs:
+            added = added + blob
+        concatenated = TimeBlob.concat(blobs)
+        assert concatenated.blip_list == added.blip_list
+        assert concatenated.blob_total == added.blob_total
+        assert concatenated.date_counts == added.date_counts
+        assert concatenated.tag_set == added.tag_set
+        assert concatenated.sub_blob(dt.date(2020, 1, 3)).blob_total == \
+            dt.timedelta(hours=4)
+
+    def test_concat_leaves_sources_alone(self):
+        blobs = make_daily_blobs(2)
+        TimeBlob.concat(blobs)
+        assert [len(blob.blip_list) for blob in blobs] == [4, 4]
+
+    def test_extend_day_blob_leaves_parent_alone(self):
+        parent = TimeBlob.concat(make_daily_blobs(2))
+        day = parent.sub_blob(dt.date(2020, 1, 1))
+        day.extend(make_daily_blobs(1))
+        assert parent.sub_blob(dt.date(2020, 1, 1)).blob_total == \
+            dt.timedelta(hours=4)
+
+    def test_concat_scales_linearly(self):
+        """Four times the blobs should take far less than 16x the time."""
+        import time
+
+        def best_time(blobs):
+            best = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                TimeBlob.concat(blobs)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        small = best_time(make_daily_blobs(400))
+        large = best_time(make_daily_blobs(1600))
+        assert large / small < 8
+
+
+# ---------------------------------------------------------------------------
+# Compact representation
+# ---------------------------------------------------------------------------
+
+class DictBlip():
+    """The earlier TimeBlip layout: a __dict__ of datetimes and strings."""
+
+    def __init__(self, start, stop, desc, tag):
+        self.start = start
+        self.stop = stop
+        self.desc = desc
+        self.tag = tag
+        self.dummy = False
+        self.held = True
+
+
+def traced_bytes(build):
+    """Return the bytes still allocated by build() once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, kept
+    finally:
+        tracemalloc.stop()
+
+
+class TestTimeBlipRepresentation:
+    def test_no_instance_dict(self):
+        assert not hasattr(make_blip(9, 0, 10, 0), '__dict__')
+
+    def test_minutes_from_the_date_ordinal(self):
+        blip = make_blip(9, 30, 17, 15)
+        assert blip.ordinal == dt.date(2024, 3, 11).toordinal()
+        assert (blip.begin, blip.end) == (570, 1035)
+        assert blip.in_minutes
+        assert blip.start == dt.datetime(2024, 3, 11, 9, 30)
+        assert blip.stop == dt.datetime(2024, 3, 11, 17, 15)
+
+    def test_of_minutes_matches_datetimes(self):
+        ordinal = dt.date(2024, 3, 11).toordinal()
+        blip = TimeBlip.of_minutes(ordinal, 570, 1035, 'backend work',
+                                   'backend')
+        other = make_blip(9, 30, 17, 15, desc='backend work')
+        assert (blip.start, blip.stop, blip.tdelta, blip.date, blip.tag) == \
+            (other.start, other.stop, other.tdelta, other.date, other.tag)
+
+    def test_seconds_are_kept(self):
+        start = dt.datetime(2024, 3, 11, 9)
+        stop = dt.datetime(2024, 3, 11, 9, 20, 7, 500)
+        blip = TimeBlip(start, stop)
+        assert not blip.in_minutes
+        assert blip.stop == stop
+        assert blip.tdelta == stop - start
+
+    def test_aware_times_are_kept(self):
+        zone = dt.timezone(dt.timedelta(hours=-5))
+        start = dt.datetime(2024, 3, 11, 9, tzinfo=zone)
+        stop = dt.datetime(2024, 3, 11, 15, tzinfo=dt.timezone.utc)
+        blip = TimeBlip(start, stop)
+        assert blip.start == start
+        assert blip.tdelta == stop - start
+
+    @pytest.mark.parametrize('start_h, end_h', [(11, 1), (9, 8), (13, 1)])
+    def test_backward_spans_wrap_as_before(self, start_h, end_h):
+        blip = make_blip(start_h, 0, end_h, 0)
+        tdelta = blip.stop - blip.start
+        assert blip.tdelta == dt.timedelta(seconds=tdelta.seconds - 12 * 3600)
+
+    def test_moving_start_keeps_stop(self):
+        blip = make_blip(9, 0, 10, 0)
+        blip.start = dt.datetime(2024, 3, 10, 23, 0)
+        assert blip.stop == dt.datetime(2024, 3, 11, 10, 0)
+        assert blip.tdelta == dt.timedelta(hours=11)
+        assert blip.date == dt.date(2024, 3, 10)
+
+    def test_tags_are_interned(self):
+        first = make_blip(9, 0, 10, 0, desc='backend one')
+        second = make_blip(10, 0, 11, 0, desc='backend two')
+        assert first.tag_id == second.tag_id == TAG_TABLE.intern('backend')
+
+    def test_interning_from_threads(self):
+        class SlowList(list):
+            """Yield to other threads in the middle of adding a tag."""
+            def append(self, item):
+                time.sleep(0.001)
+                super().append(item)
+
+        table = TagTable()
+        table.tags = SlowList()
+        tags = [f'tag{n}' for n in range(20)]
+        barrier = threading.Barrier(4)
+        ids = list()
+
+        def intern_all():
+            barrier.wait()
+            ids.append([table.intern(tag) for tag in tags])
+
+        threads = [threading.Thread(target=intern_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert ids == [list(range(20))] * 4
+        assert table.tags == tags
+
+    def test_pickles_by_value(self):
+        blip = make_blip(9, 0, 10, 30, desc='backend work')
+        copy = pickle.loads(pickle.dumps(blip))
+        assert (copy.start, copy.stop, copy.desc, copy.tag) == \
+            (blip.start, blip.stop, blip.desc, blip.tag)
+
+    def test_memory_per_blip(self, tmp_path):
+        """Blips of a generated multi-year corpus take far less than before."""
+        dates = generate_tree(str(tmp_path), 2020, years=3, entries_per_day=6)
+        paths = [(beget_tree_path(str(tmp_path), date), date)
+                 for date in dates]
+
+        after, blips = traced_bytes(lambda: list(iter_blips(paths)))
+
+        def dict_blips():
+            # Fresh strings, as the parser made a tag and desc per blip
+            return [DictBlip(blip.start, blip.stop,
+                             blip.desc.encode().decode(),
+                             TimeBlip.strip_tag(blip.desc.encode().decode()))
+                    for blip in blips]
+
+        before, _ = traced_bytes(dict_blips)
+        assert after / len(blips) < 0.7 * before / len(blips)
@@ -0,0 +1,57 @@
+"""Tests for the stage timing spans and counters behind --profile."""
+import io
+import pstats
+import pytest
+
+import timing
+from logfile import log_2_blob
+
+
+@pytest.fixture(autouse=True)
+def reset_timing():
+    yield
+    timing.disable()
+    timing.SPANS.clear()
+    timing.CALLS.clear()
+    timing.COUNTERS.clear()
+
+
+class TestDisabled:
+    def test_spans_are_shared_no_ops(self):
+        assert timing.span('parse') is timing.NULL_SPAN
+
+    def test_nothing_is_recorded(self, sample_log_path, sample_date):
+        log_2_blob(sample_log_path, sample_date)
+        assert timing.SPANS == {}
+        assert timing.COUNTERS == {}
+
+
+class TestEnabled:
+    def test_log_2_blob_stages_and_counters(self, sample_log_path,
+                                            sample_date):
+        timing.enable()
+        blob = log_2_blob(sample_log_path, sample_date)
+        assert timing.CALLS == {'read': 1, 'parse': 1}
+        assert timing.COUNTERS['files opened'] == 1
+        assert timing.COUNTERS['blips created'] == len(blob.blip_list)
+        with open(sample_log_path) as log:
+            assert timing.COUNTERS['lines parsed'] == len(log.readlines())
+
+    def test_enable_starts_from_zero(self):
+        timing.enable()
+        timing.count('files opened', 3)
+        timing.enable()
+        assert timing.COUNTERS == {}
+
+    def test_profile_reports_and_dumps_stats(self, tmp_path, sample_log_path,
+                                             sample_date):
+        out = io.StringIO()
+        stats_path = str(tmp_path / 'dsum.pstats')
+        timing.profile(lambda: log_2_blob(sample_log_path, sample_date),
+                       stats_path, fd=out)
+
+        report = out.getvalue()
+        for name in ('total', 'read', 'parse', 'lines parsed'):
+            assert name in report
+        assert not timing.ENABLED
+        assert pstats.Stats(stats_path).total_calls > 0
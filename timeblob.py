@@ -1,18 +1,106 @@
 """Contain the classes used to organize time log data."""
 from __future__ import annotations
 
+import bisect
 import datetime as dt
 import re
-from typing import List, Set
+import threading
+from typing import Callable, Dict, Iterable, List, Set, TypeVar
 
 STRIP_TAG_RE = re.compile(r'[a-zA-Z_+]*')
 
 HOURS_IN_WDAY = 8
 SECONDS_IN_HOUR = 60 * 60
+MINUTES_IN_DAY = 24 * 60
+
+# Timedeltas of spans in minutes and dates of ordinals, shared by every blip
+# that asks; there are only as many as distinct spans and days
+SPANS: Dict[int, dt.timedelta] = dict()
+DATES: Dict[int, dt.date] = dict()
+
+# Ints above 256 are allocated on every use; blips share these instead for
+# the minutes of a day and the next
+CLOCK_MINUTES = tuple(range(2 * MINUTES_IN_DAY))
+
+T = TypeVar('T')
+
+
+def to_minutes(moment: dt.datetime) -> int:
+    """Return whole minutes since the proleptic Gregorian epoch."""
+    return (moment.toordinal() * MINUTES_IN_DAY
+            + moment.hour * 60 + moment.minute)
+
+
+def clock_minute(minutes: int) -> int:
+    """Return the shared int of a minute of the clock, else minutes itself."""
+    if 0 <= minutes < len(CLOCK_MINUTES):
+        return CLOCK_MINUTES[minutes]
+    return minutes
+
+
+def whole_minute(moment: dt.datetime) -> bool:
+    """Return whether a naive datetime falls on a whole minute."""
+    return not (moment.second or moment.microsecond) and moment.tzinfo is None
+
+
+def from_minutes(minutes: int) -> dt.datetime:
+    """Return the naive datetime of minutes since the Gregorian epoch."""
+    days, minutes = divmod(minutes, MINUTES_IN_DAY)
+    return dt.datetime.fromordinal(days) + dt.timedelta(minutes=minutes)
+
+
+class TagTable():
+    """Intern tag strings as small integer ids shared by every blob.
+
+    Blips are made on the loader threads of blobify_dates, so new tags are
+    added under a lock; known tags are looked up without it.
+    """
+
+    def __init__(self):
+        """Create an empty table."""
+        self.tags: List[str | None] = list()
+        self.ids: Dict[str | None, int] = dict()
+        self.lock = threading.Lock()
+
+    def intern(self, tag: str | None) -> int:
+        """Return the id of a tag, adding it to the table if it is new."""
+        tag_id = self.ids.get(tag)
+        if tag_id is None:
+            with self.lock:
+                # Another thread may have added it while we waited
+                tag_id = self.ids.get(tag)
+                if tag_id is None:
+                    tag_id = len(self.tags)
+                    self.tags.append(tag)
+                    self.ids[tag] = tag_id
+
+        return tag_id
+
+    def __getitem__(self, tag_id: int) -> str | None:
+        """Return the tag string of an id."""
+        return self.tags[tag_id]
+
+
+TAG_TABLE = TagTable()
 
 
 class TimeBlip():
-    """A single timedelta of work with metadata."""
+    """A single timedelta of work with metadata.
+
+    Times are kept as whole minutes from midnight of the start's date
+    ordinal, and the start and stop datetimes are built when read. Times
+    that whole minutes cannot hold (an open-ended entry stopped at the
+    current second, or an aware datetime) keep their datetime as well. The
+    tag is kept as its TAG_TABLE id.
+    """
+
+    __slots__ = ('ordinal', 'begin', 'end', '_start_at', '_stop_at',
+                 'tag_id', 'desc', 'dummy', 'held')
+
+    # Counts changes to the start, stop or tag of blips already held by a
+    # blob. Blobs compare it against the value they last counted at to know
+    # whether their running aggregates are stale.
+    mutations = 0
 
     def __init__(self,
                  start: dt.datetime,
@@ -20,20 +108,112 @@ class TimeBlip():
                  desc: str = None,
                  tag: list() = None):
         """Populate essential timedelta and metadata."""
-        self.start = start
-        self.stop = stop
+        self.held = False
+        self._place(start, stop)
         self.desc = desc
-        self.tag = tag
+        self.tag_id = TAG_TABLE.intern(tag)
         self.dummy = False
 
+    @classmethod
+    def of_minutes(cls,
+                   ordinal: int,
+                   begin: int,
+                   end: int,
+                   desc: str = None,
+                   tag: str = None) -> TimeBlip:
+        """Create a blip from minutes since midnight of a date ordinal."""
+        blip = cls.__new__(cls)
+        blip.held = False
+        blip.ordinal = ordinal
+        blip.begin = clock_minute(begin)
+        blip.end = clock_minute(end)
+        blip._start_at = None
+        blip._stop_at = None
+        blip.desc = desc
+        blip.tag_id = TAG_TABLE.intern(tag)
+        blip.dummy = False
+        return blip
+
+    def __reduce__(self):
+        """Pickle by value, since tag ids only hold within one process."""
+        return (TimeBlip, (self.start, self.stop, self.desc, self.tag))
+
+    def _place(self, start: dt.datetime, stop: dt.datetime):
+        """Store the start and stop as minutes from the start's midnight."""
+        self.ordinal = start.toordinal()
+        self.begin = clock_minute(start.hour * 60 + start.minute)
+        self.end = clock_minute((stop.toordinal() - self.ordinal)
+                                * MINUTES_IN_DAY + stop.hour * 60 + stop.minute)
+        self._start_at = None if whole_minute(start) else start
+        self._stop_at = None if whole_minute(stop) else stop
+
+    def _changed(self):
+        """Note a change to a blip whose blob keeps running aggregates."""
+        if self.held:
+            TimeBlip.mutations += 1
+
+    @property
+    def start(self) -> dt.datetime:
+        """Return the start time."""
+        if self._start_at is not None:
+            return self._start_at
+        return dt.datetime.fromordinal(self.ordinal) + \
+            dt.timedelta(minutes=self.begin)
+
+    @start.setter
+    def start(self, start: dt.datetime):
+        self._changed()
+        self._place(start, self.stop)
+
+    @property
+    def stop(self) -> dt.datetime:
+        """Return the stop time."""
+        if self._stop_at is not None:
+            return self._stop_at
+        return dt.datetime.fromordinal(self.ordinal) + \
+            dt.timedelta(minutes=self.end)
+
+    @stop.setter
+    def stop(self, stop: dt.datetime):
+        self._changed()
+        self._place(self.start, stop)
+
+    @property
+    def tag(self) -> str | None:
+        """Return the tag string."""
+        return TAG_TABLE.tags[self.tag_id]
+
+    @tag.setter
+    def tag(self, tag):
+        self._changed()
+        self.tag_id = TAG_TABLE.intern(tag)
+
+    @property
+    def in_minutes(self) -> bool:
+        """Return whether whole minutes hold the start and stop exactly."""
+        return self._start_at is None and self._stop_at is None
+
     @property
     def date(self) -> dt.date:
         """Return the date of the blob."""
-        return self.start.date()
+        date = DATES.get(self.ordinal)
+        if date is None:
+            date = DATES[self.ordinal] = dt.date.fromordinal(self.ordinal)
+        return date
 
     @property
     def tdelta(self) -> dt.timedelta:
         """Return the calculated stop - start time."""
+        if self._start_at is None and self._stop_at is None:
+            span = self.end - self.begin
+            if span < 0:
+                # Make all timedeltas be < 12 hours.
+                span = span % MINUTES_IN_DAY - MINUTES_IN_DAY // 2
+            tdelta = SPANS.get(span)
+            if tdelta is None:
+                tdelta = SPANS[span] = dt.timedelta(minutes=span)
+            return tdelta
+
         tdelta = self.stop - self.start
         if tdelta.days < 0:
             # Make all timedeltas be < 12 hours.
@@ -53,7 +233,15 @@ class TimeBlip():
 
 
 class TimeBlob():
-    """A loosely correlated group of TimeBlips."""
+    """A loosely correlated group of TimeBlips.
+
+    The total and per-date and per-tag buckets of blips are kept up to date
+    as blips are added, so reading aggregates or slicing by date or tag does
+    not rescan every blip. They are rebuilt on the next read if a held
+    blip's start, stop or tag changes, or if blip_list is modified directly.
+    Blobs returned by sub_blob and filter_by get their own copy of a bucket,
+    so either side may append to its blip_list.
+    """
 
     def __init__(self,
                  blip_list: List[TimeBlip] = None,
@@ -62,19 +250,55 @@ class TimeBlob():
         self.blip_list: List[TimeBlip] = blip_list if blip_list else list()
         self.tag_set: Set[str] = tag_set if tag_set else set()
 
-        # Initialize the tag_set if blip_list is populated
-        if self.blip_list:
-            for blip in self.blip_list:
-                self.tag_set.add(blip.tag)
+        # Initialize the tag_set and aggregates if blip_list is populated
+        self._recount()
+        for blip in self.blip_list:
+            self.tag_set.add(blip.tag)
+
+    def _recount(self):
+        """Rebuild the running aggregates and indexes from blip_list."""
+        self._total = dt.timedelta()
+        self._date_index: Dict[dt.date, List[TimeBlip]] = dict()
+        self._tag_index: Dict[str, List[TimeBlip]] = dict()
+        self._dates: frozenset | None = None
+        self._sorted_dates: List[dt.date] | None = None
+        self._derived: Dict[Callable, object] = dict()
+        self._counted = 0
+        self._epoch = TimeBlip.mutations
 
-    @property
-    def blob_total(self) -> dt.timedelta:
-        """Calculate the total of all blips."""
-        blob_sum = dt.timedelta()
         for blip in self.blip_list:
-            blob_sum += blip.tdelta
+            self._count(blip)
+        self._counted = len(self.blip_list)
+
+    def _bucket(self, index: Dict, key) -> List[TimeBlip]:
+        """Return the bucket for key, ready to be appended to."""
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = list()
+            if index is self._date_index:
+                self._dates = None
+                self._sorted_dates = None
+
+        return bucket
+
+    def _count(self, blip: TimeBlip):
+        """Fold a single blip into the running aggregates and indexes."""
+        self._total += blip.tdelta
+        self._bucket(self._date_index, blip.date).append(blip)
+        self._bucket(self._tag_index, blip.tag).append(blip)
+        blip.held = True
+
+    def _validate(self):
+        """Recount the aggregates if blips changed behind the blob's back."""
+        if (self._epoch != TimeBlip.mutations
+                or self._counted != len(self.blip_list)):
+            self._recount()
 
-        return blob_sum
+    @property
+    def blob_total(self) -> dt.timedelta:
+        """Return the total of all blips."""
+        self._validate()
+        return self._total
 
     @property
     def total_work_days(self) -> float:
@@ -86,65 +310,132 @@ class TimeBlob():
 
     @property
     def date_set(self) -> Set[dt.date]:
-        """Return a list of all dates represented in blip list."""
-        # Read all blips and get dates
-        date_set = set()
-        for blip in self.blip_list:
-            date_set.add(blip.start.date())
-        return date_set
+        """Return a set of all dates represented in blip list."""
+        self._validate()
+        if self._dates is None:
+            self._dates = frozenset(self._date_index)
+        return self._dates
+
+    @property
+    def date_counts(self) -> Dict[dt.date, int]:
+        """Return the number of blips on each date."""
+        self._validate()
+        return {date: len(bucket)
+                for date, bucket in self._date_index.items()}
+
+    @property
+    def tag_counts(self) -> Dict[str, int]:
+        """Return the number of blips carrying each tag."""
+        self._validate()
+        return {tag: len(bucket) for tag, bucket in self._tag_index.items()}
 
     def __add__(self, other_blob):
         """Allow addition of Blobs."""
-        blips = self.blip_list + other_blob.blip_list
-        tags = self.tag_set.union(other_blob.tag_set)
-        return TimeBlob(blips, tags)
+        return TimeBlob.concat([self, other_blob])
+
+    def __iadd__(self, other_blob):
+        """Add another blob's blips to this one in place."""
+        return self.extend([other_blob])
+
+    @classmethod
+    def concat(cls, blobs: Iterable[TimeBlob]) -> TimeBlob:
+        """Return a new blob holding the blips of every blob, in order."""
+        return cls().extend(blobs)
+
+    def extend(self, blobs: Iterable[TimeBlob]) -> TimeBlob:
+        """Append the blips of several blobs in time linear in their size."""
+        self._validate()
+        self._derived = dict()
+        for other_blob in blobs:
+            self.tag_set |= other_blob.tag_set
+            if type(other_blob) is not TimeBlob:
+                for blip in other_blob.blip_list:
+                    self.blip_list.append(blip)
+                    self._count(blip)
+                    self._counted += 1
+                continue
+
+            # Merge the other blob's aggregates and buckets wholesale
+            other_blob._validate()
+            self._total += other_blob._total
+            for date, bucket in list(other_blob._date_index.items()):
+                self._bucket(self._date_index, date).extend(bucket)
+            for tag, bucket in list(other_blob._tag_index.items()):
+                self._bucket(self._tag_index, tag).extend(bucket)
+            self.blip_list.extend(other_blob.blip_list)
+            self._counted = len(self.blip_list)
+
+        return self
 
     def add_blip(self, blip: TimeBlip):
         """Add the blip to the list and perform accounting actions."""
+        self._validate()
+        self._derived = dict()
         self.tag_set.add(blip.tag)
         self.blip_list.append(blip)
+        self._count(blip)
+        self._counted += 1
 
-    # def print_total(self):
-    #     """Print the grand total to stdout."""
-    #     print(self.blob_total)
+    def derived(self, build: Callable[[TimeBlob], T]) -> T:
+        """Return build(self), kept until the blips of the blob change."""
+        self._validate()
+        value = self._derived.get(build)
+        if value is None:
+            value = self._derived[build] = build(self)
 
-    def get_tag_totals(self):
+        return value
+
+    def get_tag_totals(self) -> Dict[str, dt.timedelta]:
         """Get the totals of each tag."""
-        tag_to_total = dict()
-        for tag in self.tag_set:
-            # print(f'{tag:>20}', end='')
-            tag_total = dt.timedelta()
-            for blip in self.blip_list:
-                if blip.tag == tag:
-                    tag_total += blip.tdelta
-            tag_to_total.update(tag=tag_total)
-            # print(f'    {str(tag_total):>8}')
+        self._validate()
+        tag_to_total = dict.fromkeys(self.tag_set, dt.timedelta())
+        for tag, bucket in self._tag_index.items():
+            total = dt.timedelta()
+            for blip in bucket:
+                total += blip.tdelta
+            tag_to_total[tag] = total
         return tag_to_total
 
     def sub_blob(self,
                  start_date: dt.date,
                  end_date: dt.date = None) -> TimeBlob:
         """Return a new blob with only blips in a date range [inclusive]."""
+        self._validate()
         # Return a single day's blips if only one arg is given
-        if not end_date:
-            end_date = start_date
-        # Iterate and choose correct blips
-        new_list = [blip for blip in self.blip_list
-                    if start_date <= blip.date <= end_date]
+        if not end_date or end_date == start_date:
+            bucket = self._date_index.get(start_date)
+            return TimeBlob(list(bucket)) if bucket else TimeBlob()
+
+        # Pick the date buckets in range out of the sorted dates
+        if self._sorted_dates is None:
+            self._sorted_dates = sorted(self._date_index)
+        first = bisect.bisect_left(self._sorted_dates, start_date)
+        last = bisect.bisect_right(self._sorted_dates, end_date)
+        dates = self._sorted_dates[first:last]
+        if len(dates) == 1:
+            return TimeBlob(list(self._date_index[dates[0]]))
+
+        new_list = list()
+        for date in dates:
+            new_list += self._date_index[date]
 
         return TimeBlob(new_list)
 
     def filter_by(self, tags: List[str]) -> TimeBlob:
         """Return a sub blob with only certain tags."""
+        self._validate()
         # Check tag_list for desired tags
-        for tag in tags:
-            if tag not in self.tag_set:
-                tags.remove(tag)
+        buckets = [self._tag_index[tag] for tag in dict.fromkeys(tags)
+                   if tag in self._tag_index]
         # Return an empty Blob if tags are not present in self
-        if not tags:
+        if not buckets:
             return TimeBlob()
-        # Search through blip_list for tagged entries
-        filtered_blips = [blip for blip in self.blip_list if blip.tag in tags]
+        if len(buckets) == 1:
+            return TimeBlob(list(buckets[0]))
+
+        # Return a new Blob with only tagged entries, grouped by tag
+        filtered_blips = list()
+        for bucket in buckets:
+            filtered_blips += bucket
 
-        # Return a new Blob with only tagged entries
         return TimeBlob(filtered_blips)
@@ -0,0 +1,108 @@
+"""Time the stages of a daysum run and count the work done in them.
+
+Spans and counters are no-ops until enable() is called, so the stages can
+stay instrumented at next to no cost; `dsum --profile` turns them on.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict
+
+ENABLED = False
+
+SPANS: Dict[str, float] = dict()  # Seconds spent in each named stage
+CALLS: Dict[str, int] = dict()
+COUNTERS: Dict[str, int] = dict()
+
+# Files are loaded on several threads, so guard the totals
+LOCK = threading.Lock()
+NULL_SPAN = nullcontext()
+
+
+class Span():
+    """Add the wall time spent inside a with block to a named stage."""
+
+    def __init__(self, name: str):
+        """Name the stage to add to."""
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> Span:
+        """Start the clock."""
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the clock and add the time to the stage."""
+        elapsed = time.perf_counter() - self.start
+        with LOCK:
+            SPANS[self.name] = SPANS.get(self.name, 0.0) + elapsed
+            CALLS[self.name] = CALLS.get(self.name, 0) + 1
+
+
+def span(name: str):
+    """Return a context manager timing a stage, if timing is enabled."""
+    if not ENABLED:
+        return NULL_SPAN
+
+    return Span(name)
+
+
+def count(name: str, amount: int = 1):
+    """Add to a named counter, if timing is enabled."""
+    if ENABLED:
+        with LOCK:
+            COUNTERS[name] = COUNTERS.get(name, 0) + amount
+
+
+def enable():
+    """Start timing spans and counting, from zero."""
+    global ENABLED
+    SPANS.clear()
+    CALLS.clear()
+    COUNTERS.clear()
+    ENABLED = True
+
+
+def disable():
+    """Stop timing spans and counting."""
+    global ENABLED
+    ENABLED = False
+
+
+def report(fd=None):
+    """Print the time of each stage and the counters, to stderr by default.
+
+    Stages nest (parsing happens while loading, and a streamed view reads
+    while rendering), so their times overlap rather than add up to total.
+    Stages run on loader threads add up the time of every thread.
+    """
+    fd = fd or sys.stderr
+    print(f'{"stage":<16}{"seconds":>10}{"calls":>8}', file=fd)
+    for name, seconds in SPANS.items():
+        print(f'{name:<16}{seconds:>10.4f}{CALLS[name]:>8}', file=fd)
+    for name, amount in COUNTERS.items():
+        print(f'{name:<16}{amount:>18}', file=fd)
+
+
+def profile(func: Callable, pstats_path: str | None = None, fd=None):
+    """Run func with timing enabled, then report; dump cProfile stats too."""
+    enable()
+    profiler = None
+    if pstats_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        with span('total'):
+            return func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(pstats_path)
+        disable()
+        report(fd)
@@ -1,7 +1,10 @@
 """Contain general use functions for daysum programs."""
 import datetime as dt
+import os
+import pickle
 import re
 import sys
+from typing import Dict, Tuple
 
 # FILENAME = f'log'
 LOG_PATH = '/home/samkel/journal'
@@ -9,6 +12,8 @@ LOG_PATH = '/home/samkel/journal'
 PRINT_DESCRIPTION = 0
 
 FOLDER_SUFFIX = '_time_sheet'
+CACHE_FOLDER = '.cache'
+SOCKET_FILE = 'dsum.sock'
 
 ISO_FMT_RE = re.compile(r'(19|20)\d{2}-[01]\d-[0-3]\d')  # YYYY-MM-DD
 BACK_COMPAT_RE = re.compile(r'log([01]\d)_([0-3]\d).txt')  # MM_DD
@@ -38,14 +43,192 @@ def error_handler(error_str: str | None = None, exception: Exception | None = No
     sys.exit(exit_code)
 
 
+def beget_folder(date: dt.date) -> str:
+    """Generate the path of the month folder holding a date's log file."""
+    return f'{LOG_PATH}/{date.strftime(r"%Y/%b")}{FOLDER_SUFFIX}'
+
+
 def beget_filepath(date: dt.date):
     """Generate full filepath of log file for select date."""
-    specific_path = f'{LOG_PATH}/{date.strftime(r"%Y/%b")}{FOLDER_SUFFIX}/'
+    specific_path = f'{beget_folder(date)}/'
     filename = BACK_COMPAT_FILE.format(month=date.month, day=date.day)
 
     return f'{specific_path}{filename}'
 
 
+def beget_folder_date(filename: str, year: int, month: int) -> dt.date | None:
+    """Beget the date of a log file name found in a year's month folder.
+
+    Both the log{MM}_{DD}.txt and log{YYYY-MM-DD}.txt names are recognized.
+    Files naming another month than their folder's are not that folder's.
+    """
+    begotten_date = None
+    mm_dd_match = BACK_COMPAT_RE.fullmatch(filename)
+    if mm_dd_match:
+        try:
+            begotten_date = dt.date(year, int(mm_dd_match.group(1)),
+                                    int(mm_dd_match.group(2)))
+        except ValueError:
+            return None
+    elif filename.startswith('log') and filename.endswith('.txt'):
+        iso_match = ISO_FMT_RE.fullmatch(filename[3:-4])
+        if iso_match:
+            try:
+                begotten_date = dt.date.fromisoformat(iso_match.group(0))
+            except ValueError:
+                return None
+
+    if begotten_date and (begotten_date.year, begotten_date.month) \
+            != (year, month):
+        return None
+
+    return begotten_date
+
+
+def month_range(start_date: dt.date, end_date: dt.date):
+    """Yield the first day of every month in a date range [inclusive]."""
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        yield dt.date(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def scan_folder(month_date: dt.date) -> Dict[dt.date, os.DirEntry]:
+    """List the log files of a month folder, keyed by date.
+
+    When a day has both names, the log{MM}_{DD}.txt file that beget_filepath
+    (and so dlog) uses wins.
+    """
+    found: Dict[dt.date, os.DirEntry] = dict()
+    try:
+        with os.scandir(beget_folder(month_date)) as entries:
+            for entry in entries:
+                date = beget_folder_date(entry.name, month_date.year,
+                                         month_date.month)
+                if date is None:
+                    continue
+                if date in found and not BACK_COMPAT_RE.fullmatch(entry.name):
+                    continue
+                if entry.is_file():
+                    found[date] = entry
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+
+    return found
+
+
+def discover_logs(start_date: dt.date,
+                  end_date: dt.date) -> Dict[dt.date, str]:
+    """Return the path of every existing log file in a date range [inclusive].
+
+    Each month folder in the range is listed once rather than probing every
+    calendar day.
+    """
+    found: Dict[dt.date, str] = dict()
+    for month_date in month_range(start_date, end_date):
+        for date, entry in sorted(scan_folder(month_date).items()):
+            if start_date <= date <= end_date:
+                found[date] = entry.path
+
+    return found
+
+
+def beget_cache_dir() -> str:
+    """Generate the path of the directory holding derived log data."""
+    return f'{LOG_PATH}/{CACHE_FOLDER}'
+
+
+def beget_socket_path() -> str:
+    """Generate the path of the Unix socket served by `dsum --serve`."""
+    return f'{beget_cache_dir()}/{SOCKET_FILE}'
+
+
+def write_atomic(file_path: str, data: bytes) -> bool:
+    """Replace a derived data file in one step; return False on failure.
+
+    The parent directory is created only if its own parent exists, so a
+    missing LOG_PATH is never conjured into existence by a cache write.
+    """
+    parent = os.path.dirname(file_path)
+    try:
+        os.mkdir(parent)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+    return True
+
+
+def load_versioned(file_path: str, version: int) -> tuple | None:
+    """Return what save_versioned wrote, or None if it cannot be used.
+
+    Derived data can always be rebuilt from the logs, so a file that is
+    missing, unreadable or of another version is treated as absent.
+    """
+    try:
+        with open(file_path, 'rb') as pickle_file:
+            saved_version, *payload = pickle.load(pickle_file)
+    except (OSError, EOFError, ValueError, TypeError,
+            AttributeError, pickle.UnpicklingError):
+        return None
+
+    if saved_version != version:
+        return None
+    return tuple(payload)
+
+
+def save_versioned(file_path: str, version: int, *payload) -> bool:
+    """Pickle payload under a version number with write_atomic."""
+    return write_atomic(file_path, pickle.dumps(
+        (version, *payload), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def stat_signature(file_path: str) -> Tuple[int, int] | None:
+    """Return the (mtime, size) of a file, or None if it does not exist.
+
+    Readers take it before reading the file, so a concurrent edit can only
+    make what they derive look stale.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def is_settled(date: dt.date) -> bool:
+    """Return whether what is derived from a date's log can be kept.
+
+    Open-ended entries are measured against the current time, so the logs
+    of today and later change without their file changing.
+    """
+    return date < dt.date.today()
+
+
+def is_current(date: dt.date,
+               signature: Tuple[int, int] | None,
+               known: Tuple[int, int] | None) -> bool:
+    """Return whether data kept for a log file with a known signature holds.
+
+    signature is the stat_signature of the file now.
+    """
+    return signature is not None and signature == known and is_settled(date)
+
+
 def beget_date(filename) -> dt.date:
     """Beget a date object based on parsed filename."""
     # Search for ISO format